@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
-from .models import User
+from .models import User, LoginAudit, OutgoingEmail, UserImport
 
 
 @admin.register(User)
@@ -36,3 +36,29 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
+
+@admin.register(UserImport)
+class UserImportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'file', 'status', 'processed_rows', 'created_count', 'failed_count', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'finished_at', 'last_error')
+
+
+@admin.register(LoginAudit)
+class LoginAuditAdmin(admin.ModelAdmin):
+    list_display = ('event', 'email', 'user', 'ip_address', 'created_at')
+    list_filter = ('event',)
+    search_fields = ('email', 'ip_address')
+    ordering = ('-created_at',)
+    raw_id_fields = ('user',)
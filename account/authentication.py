@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import LazyObject, empty
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class ClaimsUser(LazyObject):
+    """
+    A user backed by the claims of a validated access token.
+
+    Attributes stamped into the token (see
+    ``account.serializers.auth.token.set_user_claims``) are answered straight
+    from the token. Anything else - ``email``, ``check_password()``,
+    ``save()`` ... - loads the real ``User`` row on first access and proxies
+    to it from then on.
+
+    ``is_email_verified`` is only trusted when it is ``True``: a user who
+    verified their email after the token was issued still carries ``False``,
+    so that case is confirmed against the database.
+    """
+
+    claim_fields = ('role', 'is_email_verified', 'auth_provider', 'is_active')
+
+    def __init__(self, token):
+        self.__dict__['_token'] = token
+        super().__init__()
+
+    def _setup(self):
+        User = get_user_model()
+        user_id = self._token[api_settings.USER_ID_CLAIM]
+        try:
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        self._wrapped = user
+
+    def __getattr__(self, name):
+        if self._wrapped is empty and name in self.claim_fields and name in self._token:
+            value = self._token[name]
+            if name != 'is_email_verified' or value is True:
+                return value
+        return super().__getattr__(name)
+
+    @property
+    def id(self):
+        if self._wrapped is empty:
+            return self._token[api_settings.USER_ID_CLAIM]
+        return self._wrapped.id
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    @property
+    def is_loaded(self):
+        return self._wrapped is not empty
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        if self._wrapped is empty:
+            return f"<ClaimsUser: {self.id}>"
+        return f"<ClaimsUser: {self._wrapped!r}>"
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not fetch the ``User`` row per request.
+
+    The returned ``ClaimsUser`` only hits the database when a view touches a
+    field that is not carried in the token, so permission checks in
+    ``account.permissions`` run entirely on claims.
+
+    Like simplejwt's ``CHECK_USER_IS_ACTIVE``, inactive users are refused, going
+    by the ``is_active`` claim; tokens issued before that claim existed load
+    the row instead. A user deactivated after the token was issued keeps
+    access until it expires, but cannot refresh or re-issue it.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = ClaimsUser(validated_token)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,207 @@
+import hashlib
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+
+from utils.bloom import BloomFilter
+from utils.cache import is_shared
+from utils.health import warming_up
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TRUST_CACHE': None,        # None: only a cache shared by every host; True for a file cache on one host
+    'CAPACITY': 100_000,
+    'ERROR_RATE': 0.001,
+    'SYNC_INTERVAL': 30,        # seconds between incremental syncs from the DB
+    'SYNC_OVERLAP': 60,         # seconds re-read by each sync, for transactions that commit late
+    'REBUILD_INTERVAL': 3600,   # seconds between full rebuilds (drops deleted emails)
+    'MAX_DELETED': 1000,        # deletions seen by this worker that force an early rebuild
+}
+
+
+def email_index_settings():
+    return {**DEFAULTS, **getattr(settings, 'EMAIL_INDEX', {})}
+
+
+class EmailIndex:
+    """
+    Per-worker index of registered emails (lowercased).
+
+    A Bloom filter streamed from the user table answers "definitely not
+    taken" for the signup form's email check and for registration without a
+    query. Users created or given a new email by other workers are seen
+    through a short-lived marker in the shared cache, and rows updated since
+    the last sync are pulled in every ``SYNC_INTERVAL`` seconds in case a
+    marker was lost. A possible hit is confirmed with the indexed
+    ``LOWER(email)`` lookup, so false positives - including deleted users,
+    dropped at the next rebuild - only cost that query.
+
+    The cache must be shared by all workers on every host (Redis, not
+    ``LocMemCache`` or a file-based cache) for misses to be trusted;
+    otherwise every check falls through to the database. A deployment on a
+    single host can set TRUST_CACHE to trust its file-based cache. The
+    unique constraint stays the last word for registration.
+    """
+
+    marker_prefix = 'email-taken:'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._synced_from = None
+        self._synced_at = 0.0
+        self._built_at = 0.0
+        self._deleted = 0
+        self.stats = {'checks': 0, 'filter_hits': 0, 'marker_hits': 0, 'db_lookups': 0, 'rebuilds': 0}
+
+    @property
+    def config(self):
+        return email_index_settings()
+
+    @property
+    def cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    @staticmethod
+    def normalize(email):
+        return email.strip().lower()
+
+    def marker_key(self, email):
+        return self.marker_prefix + hashlib.sha256(email.encode()).hexdigest()
+
+    def is_trusted(self):
+        """Whether a miss can be trusted without asking the database."""
+        config = self.config
+        if not config['ENABLED']:
+            return False
+        if config['TRUST_CACHE'] is not None:
+            return config['TRUST_CACHE']
+        return is_shared(self.cache)
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+            self._synced_from = None
+            self._synced_at = self._built_at = 0.0
+            self._deleted = 0
+
+    def rebuild(self):
+        """Build a fresh filter from every user's email."""
+        # readiness fails until the first filter is built; later rebuilds replace one in use
+        with warming_up('email-index') if self._filter is None else nullcontext():
+            config = self.config
+            started = timezone.now()
+            rows = get_user_model().objects.values_list('email', flat=True)
+            bloom = BloomFilter(max(config['CAPACITY'], rows.count() * 2), config['ERROR_RATE'])
+            for email in rows.iterator(chunk_size=5000):
+                bloom.add(email.lower())
+
+            with self._lock:
+                self._filter = bloom
+                self._synced_from = started - timedelta(seconds=config['SYNC_OVERLAP'])
+                self._synced_at = self._built_at = time.monotonic()
+                self._deleted = 0
+                self.stats['rebuilds'] += 1
+
+        logger.info(f"Rebuilt email index with {len(bloom)} emails")
+
+    def sync(self):
+        """Pull emails of users created or changed since the last build or sync."""
+        started = timezone.now()
+        emails = (
+            get_user_model().objects
+            .filter(updated_at__gte=self._synced_from)
+            .order_by()     # the default ordering would scan user_created_id_idx instead of user_updated_at_idx
+            .values_list('email', flat=True)
+        )
+        with self._lock:
+            for email in emails.iterator(chunk_size=5000):
+                email = email.lower()
+                if email not in self._filter:
+                    self._filter.add(email)
+            self._synced_from = started - timedelta(seconds=self.config['SYNC_OVERLAP'])
+            self._synced_at = time.monotonic()
+
+    def _refresh_if_due(self):
+        config = self.config
+        now = time.monotonic()
+        if (
+            self._filter is None
+            or self._filter.is_saturated
+            or self._deleted > config['MAX_DELETED']
+            or now - self._built_at > config['REBUILD_INTERVAL']
+        ):
+            self.rebuild()
+        elif now - self._synced_at > config['SYNC_INTERVAL']:
+            self.sync()
+
+    def might_exist(self, email):
+        """
+        ``False`` means no user has this email. ``True`` means the caller
+        must confirm with the database.
+        """
+        if not self.is_trusted():
+            return True
+
+        email = self.normalize(email)
+        self.stats['checks'] += 1
+        self._refresh_if_due()
+
+        if email in self._filter:
+            self.stats['filter_hits'] += 1
+            return True
+
+        if self.cache.get(self.marker_key(email)):
+            self.stats['marker_hits'] += 1
+            return True
+
+        return False
+
+    def exists(self, email):
+        if not self.might_exist(email):
+            return False
+
+        self.stats['db_lookups'] += 1
+        email = self.normalize(email)
+        return get_user_model().objects.filter(email__lower=email).exists()
+
+    def add(self, *emails):
+        """Record new emails locally and for every other worker."""
+        emails = [self.normalize(email) for email in emails]
+        with self._lock:
+            if self._filter is not None:
+                self._filter.update(email for email in emails if email not in self._filter)
+
+        if not emails or not self.is_trusted():
+            return
+
+        # the marker only has to outlive a few syncs, by then every worker
+        # has the email in its filter
+        timeout = self.config['SYNC_INTERVAL'] * 4
+        try:
+            self.cache.set_many({self.marker_key(email): 1 for email in emails}, timeout=timeout)
+        except Exception:
+            logger.exception("Failed to publish email index markers")
+
+    def __contains__(self, email):
+        """Whether this worker's filter has ``email``, without refreshing it."""
+        return self._filter is not None and self.normalize(email) in self._filter
+
+    def discard(self, email):
+        """A user was deleted; Bloom filters cannot forget, so count it towards a rebuild."""
+        with self._lock:
+            self._deleted += 1
+
+
+email_index = EmailIndex()
@@ -11,3 +11,24 @@ class Roles(models.TextChoices):
 class AuthProvider(models.TextChoices):
     EMAIL = 'email', _('Email')
     GOOGLE = 'google', _('Google')
+
+
+class EmailStatus(models.TextChoices):
+    PENDING = 'pending', _('Pending')
+    SENDING = 'sending', _('Sending')
+    SENT = 'sent', _('Sent')
+    DEAD = 'dead', _('Dead')
+
+
+class ImportStatus(models.TextChoices):
+    PENDING = 'pending', _('Pending')
+    RUNNING = 'running', _('Running')
+    DONE = 'done', _('Done')
+    FAILED = 'failed', _('Failed')
+
+
+class LoginEvent(models.TextChoices):
+    LOGIN = 'login', _('Login')
+    REFRESH = 'refresh', _('Token Refresh')
+    LOGOUT = 'logout', _('Logout')
+    LOGIN_FAILED = 'login_failed', _('Failed Login')
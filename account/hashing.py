@@ -0,0 +1,214 @@
+"""
+Password hashing on a bounded process pool.
+
+PBKDF2 keeps a CPU busy for hundreds of milliseconds per call. Running it in
+a small ``ProcessPoolExecutor`` keeps that work off the request worker, and
+the pool's depth limit turns a login burst into fast 503 responses instead
+of a queue that starves every other endpoint.
+
+``User.set_password`` / ``check_password`` / ``acheck_password`` delegate
+here, so ``authenticate()``, ``create_user()`` and every serializer that
+touches passwords use the pool without changes at the call sites.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from utils.metrics import password_hash_duration
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_WORKERS': 2,
+    'MAX_QUEUE': 16,    # jobs allowed to wait behind the busy workers
+    'TIMEOUT': 5,       # seconds to wait for a result before giving up
+}
+
+
+def hashing_settings():
+    return {**DEFAULTS, **getattr(settings, 'PASSWORD_HASHING_POOL', {})}
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Server is busy, please try again shortly.')
+    default_code = 'hashing_unavailable'
+    wait = 1    # rendered as Retry-After by DRF's exception handler
+
+
+def _init_worker():
+    # Under the spawn/forkserver start methods the child starts from a
+    # fresh interpreter; hashers only need settings, not the app registry.
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+def _verify_password(password, encoded):
+    return hashers.verify_password(password, encoded)
+
+
+class PasswordHashingPool:
+    """
+    A lazily started ``ProcessPoolExecutor`` with a hard limit on the number
+    of jobs queued or running at once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self.stats = {'submitted': 0, 'rejected': 0, 'timeouts': 0, 'seconds': 0.0}
+
+    @property
+    def config(self):
+        return hashing_settings()
+
+    @property
+    def enabled(self):
+        return self.config['ENABLED']
+
+    def _get_executor(self):
+        # A pool inherited across fork (e.g. gunicorn --preload) is unusable
+        # in the child, so the pool is tied to the process that created it.
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                config = self.config
+                self._executor = ProcessPoolExecutor(
+                    max_workers=config['MAX_WORKERS'],
+                    initializer=_init_worker,
+                )
+                self._slots = threading.BoundedSemaphore(config['MAX_WORKERS'] + config['MAX_QUEUE'])
+                self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, fn, *args):
+        """
+        Queue ``fn(*args)`` on the pool, or raise ``HashingUnavailable`` right
+        away if the pool is already at its depth limit.
+        """
+        executor = self._get_executor()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            self.stats['rejected'] += 1
+            logger.warning("Password hashing pool saturated, rejecting request")
+            raise HashingUnavailable()
+
+        self.stats['submitted'] += 1
+        started = time.perf_counter()
+
+        def done(future):
+            slots.release()
+            seconds = time.perf_counter() - started
+            self.stats['seconds'] += seconds
+            password_hash_duration.observe(seconds)
+
+        future = executor.submit(fn, *args)
+        future.add_done_callback(done)
+        return future
+
+    def run(self, fn, *args):
+        if not self.enabled:
+            with password_hash_duration.time():
+                return fn(*args)
+
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.config['TIMEOUT'])
+        except FutureTimeoutError:
+            self.stats['timeouts'] += 1
+            raise HashingUnavailable()
+
+    async def arun(self, fn, *args):
+        if not self.enabled:
+            with password_hash_duration.time():
+                return await asyncio.to_thread(fn, *args)
+
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.config['TIMEOUT'])
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise HashingUnavailable()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = PasswordHashingPool()
+atexit.register(hashing_pool.shutdown)
+
+
+def make_password(password):
+    """Pool-backed ``django.contrib.auth.hashers.make_password``."""
+    if password is None:
+        return hashers.make_password(None)
+    return hashing_pool.run(_make_password, password)
+
+
+async def amake_password(password):
+    if password is None:
+        return hashers.make_password(None)
+    return await hashing_pool.arun(_make_password, password)
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Pool-backed ``django.contrib.auth.hashers.check_password``. Unusable and
+    missing hashes still go through the pool so their timing matches a real
+    check.
+    """
+    is_correct, must_update = hashing_pool.run(_verify_password, password, encoded)
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
+
+
+async def acheck_password(password, encoded, setter=None):
+    is_correct, must_update = await hashing_pool.arun(_verify_password, password, encoded)
+    if setter and is_correct and must_update:
+        await setter(password)
+    return is_correct
+
+
+def bulk_hashing_executor(max_workers=None):
+    """
+    A separate pool for offline bulk work such as user imports. Unlike
+    ``hashing_pool`` it uses every core and has no depth limit; use it as a
+    context manager together with ``make_passwords()``.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=_init_worker)
+
+
+def make_passwords(executor, passwords):
+    """Hash ``passwords`` on ``executor``, in order; ``None`` gives an unusable password."""
+    passwords = list(passwords)
+    to_hash = [password for password in passwords if password is not None]
+    chunksize = max(1, len(to_hash) // ((os.cpu_count() or 1) * 4))
+    hashed = iter(executor.map(_make_password, to_hash, chunksize=chunksize))
+    return [hashers.make_password(None) if password is None else next(hashed) for password in passwords]
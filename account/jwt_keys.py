@@ -0,0 +1,166 @@
+"""
+Token signing keys and the published JWKS.
+
+With an asymmetric SIMPLE_JWT['ALGORITHM'] (RS256, EdDSA, ...), tokens are
+signed with the first key in JWT_KEYS['PRIVATE_KEYS'] and carry its ``kid``
+header; the other keys only verify. To rotate, put the new key first and drop
+the old one once every token it signed has expired (REFRESH_TOKEN_LIFETIME).
+These algorithms need the ``cryptography`` package.
+
+The public halves are served at ``/.well-known/jwks.json`` so other services
+verify tokens locally instead of calling back. The body and its ETag are
+built once per process - keys only change with a deploy.
+
+HS* algorithms keep signing with SIMPLE_JWT['SIGNING_KEY'] and publish an
+empty key set.
+"""
+import base64
+import hashlib
+import json
+
+import jwt
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt import settings as simplejwt_settings
+
+
+DEFAULTS = {
+    'PRIVATE_KEYS': [],     # PEM strings or paths to PEM files, newest (signing) first
+    'JWKS_MAX_AGE': 300,    # seconds other services may cache the key set
+}
+
+# members that identify a key, per RFC 7638
+THUMBPRINT_MEMBERS = {'RSA': ('e', 'kty', 'n'), 'EC': ('crv', 'kty', 'x', 'y'), 'OKP': ('crv', 'kty', 'x')}
+
+
+def jwt_keys_settings():
+    return {**DEFAULTS, **getattr(settings, 'JWT_KEYS', {})}
+
+
+def is_symmetric(algorithm):
+    return algorithm.startswith('HS')
+
+
+def thumbprint(jwk):
+    """RFC 7638 key id: base64url SHA-256 of the key's required members."""
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk['kty']]}
+    digest = hashlib.sha256(json.dumps(members, separators=(',', ':'), sort_keys=True).encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def read_pem(key):
+    if key.lstrip().startswith('-----'):
+        return key
+    with open(key) as f:
+        return f.read()
+
+
+class KeyRing:
+    """The signing key, the public keys by ``kid`` and the prebuilt JWKS body."""
+
+    def __init__(self, algorithm, private_keys=()):
+        self.algorithm = algorithm
+        self.signing_key = self.signing_kid = None
+        self.public_keys = {}
+        jwks = []
+
+        if not is_symmetric(algorithm):
+            if not private_keys:
+                raise ImproperlyConfigured(f"SIMPLE_JWT['ALGORITHM'] = {algorithm!r} needs JWT_KEYS['PRIVATE_KEYS']")
+            try:
+                jws_algorithm = jwt.PyJWS().get_algorithm_by_name(algorithm)
+            except NotImplementedError as e:
+                raise ImproperlyConfigured(f"{algorithm} signing requires the cryptography package") from e
+
+            for key in private_keys:
+                private_key = jws_algorithm.prepare_key(read_pem(key))
+                public_key = private_key.public_key()
+                jwk = jws_algorithm.to_jwk(public_key, as_dict=True)
+                kid = thumbprint(jwk)
+                if self.signing_key is None:
+                    self.signing_key, self.signing_kid = private_key, kid
+                self.public_keys[kid] = public_key
+                jwks.append({**jwk, 'kid': kid, 'use': 'sig', 'alg': algorithm})
+
+        self.jwks = json.dumps({'keys': jwks}, separators=(',', ':')).encode()
+        self.etag = '"%s"' % hashlib.sha256(self.jwks).hexdigest()[:32]
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """simplejwt's backend, signing with the key ring's active key and verifying by ``kid``."""
+
+    def __init__(self, key_ring, **kwargs):
+        super().__init__(key_ring.algorithm, **kwargs)
+        self.key_ring = key_ring
+
+    @property
+    def prepared_signing_key(self):
+        return self.key_ring.signing_key
+
+    def get_verifying_key(self, token):
+        # called inside decode()'s try block, so a malformed header becomes TokenBackendError
+        kid = jwt.get_unverified_header(token).get('kid')
+        try:
+            return self.key_ring.public_keys[kid]
+        except KeyError:
+            raise TokenBackendError(_("Token is invalid"))
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            self.key_ring.signing_key,
+            algorithm=self.algorithm,
+            headers={'kid': self.key_ring.signing_kid},
+            json_encoder=self.json_encoder,
+        )
+
+
+_key_rings = {}
+_backends = {}
+
+
+def key_ring():
+    algorithm = simplejwt_settings.api_settings.ALGORITHM
+    private_keys = tuple(jwt_keys_settings()['PRIVATE_KEYS'])
+    ring_key = (algorithm, private_keys)
+    if ring_key not in _key_rings:
+        _key_rings[ring_key] = KeyRing(algorithm, private_keys)
+    return _key_rings[ring_key]
+
+
+def token_backend():
+    """The backend every token class in ``account.tokens`` signs and verifies with."""
+    # looked up on each call: simplejwt replaces api_settings when SIMPLE_JWT changes
+    api_settings = simplejwt_settings.api_settings
+    algorithm = api_settings.ALGORITHM
+    backend_key = (algorithm, api_settings.SIGNING_KEY, tuple(jwt_keys_settings()['PRIVATE_KEYS']))
+    if backend_key not in _backends:
+        if is_symmetric(algorithm):
+            _backends[backend_key] = TokenBackend(
+                algorithm,
+                api_settings.SIGNING_KEY,
+                api_settings.VERIFYING_KEY,
+                api_settings.AUDIENCE,
+                api_settings.ISSUER,
+                api_settings.JWK_URL,
+                api_settings.LEEWAY,
+                api_settings.JSON_ENCODER,
+            )
+        else:
+            _backends[backend_key] = KeyRingTokenBackend(
+                key_ring(),
+                audience=api_settings.AUDIENCE,
+                issuer=api_settings.ISSUER,
+                leeway=api_settings.LEEWAY,
+                json_encoder=api_settings.JSON_ENCODER,
+            )
+    return _backends[backend_key]
@@ -0,0 +1,118 @@
+"""
+Brute-force lockout for the password login endpoints.
+
+Failed logins are counted per submitted email and per client IP in the
+shared cache. Once a counter reaches its threshold the key is locked for
+BASE_LOCKOUT seconds, doubling with every further failure up to
+MAX_LOCKOUT. A locked attempt is answered with 429 before ``authenticate()``
+runs, so it never reaches the password hasher.
+
+Each key costs two small cache entries - a failure count and a lock expiry -
+whatever the attack volume, and both expire on their own. Counters are kept
+for any submitted email, registered or not, and the 429 body is the same for
+account and IP locks, so a lockout says nothing about whether an account
+exists.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'ACCOUNT_THRESHOLD': 5,     # failures per email before it is locked
+    'IP_THRESHOLD': 20,         # failures per client IP before it is locked
+    'BASE_LOCKOUT': 30,         # seconds, doubled for every failure past the threshold
+    'MAX_LOCKOUT': 3600,
+    'FAILURE_WINDOW': 3600,     # seconds a failure counter lives after its first failure
+}
+
+
+def lockout_settings():
+    return {**DEFAULTS, **getattr(settings, 'LOGIN_LOCKOUT', {})}
+
+
+class LoginLocked(Throttled):
+    default_detail = _('Too many failed login attempts. Try again later.')
+    default_code = 'login_locked'
+
+
+class LoginLockout:
+
+    failures_prefix = 'login-failures:'
+    locked_prefix = 'login-locked:'
+
+    @property
+    def config(self):
+        return lockout_settings()
+
+    @property
+    def cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    @staticmethod
+    def account_key(email):
+        return hashlib.sha256((email or '').strip().lower().encode()).hexdigest()
+
+    def keys(self, request, email):
+        """``(scope, key)`` pairs for the submitted email and the client IP."""
+        return [('account', self.account_key(email)), ('ip', BaseThrottle().get_ident(request))]
+
+    def check(self, request, email):
+        """Raise ``LoginLocked`` if the email or the client IP is locked."""
+        if not self.config['ENABLED']:
+            return
+        locked_keys = [self.locked_prefix + f'{scope}:{key}' for scope, key in self.keys(request, email)]
+        try:
+            locked = self.cache.get_many(locked_keys)
+        except Exception:
+            logger.exception("Failed to read login lockouts")
+            return
+        if locked:
+            wait = max(locked.values()) - time.time()
+            if wait > 0:
+                metrics.login_lockout_rejections.inc()
+                raise LoginLocked(wait=wait)
+
+    def record_failure(self, request, email):
+        config = self.config
+        if not config['ENABLED']:
+            return
+        try:
+            for scope, key in self.keys(request, email):
+                failures_key = self.failures_prefix + f'{scope}:{key}'
+                self.cache.add(failures_key, 0, timeout=config['FAILURE_WINDOW'])
+                failures = self.cache.incr(failures_key)
+
+                threshold = config[f'{scope.upper()}_THRESHOLD']
+                if failures >= threshold:
+                    seconds = min(config['BASE_LOCKOUT'] * 2 ** min(failures - threshold, 32), config['MAX_LOCKOUT'])
+                    self.cache.set(self.locked_prefix + f'{scope}:{key}', time.time() + seconds, timeout=seconds)
+                    metrics.login_lockouts.inc(scope=scope)
+                    logger.warning(f"Login locked for {seconds}s after {failures} failures ({scope})")
+        except Exception:
+            logger.exception("Failed to record a failed login")
+
+    def record_success(self, request, email):
+        """A correct password clears the email's counter; the IP's keeps counting."""
+        if not self.config['ENABLED']:
+            return
+        scope, key = self.keys(request, email)[0]
+        try:
+            self.cache.delete(self.failures_prefix + f'{scope}:{key}')
+        except Exception:
+            logger.exception("Failed to clear login failures")
+
+
+login_lockout = LoginLockout()
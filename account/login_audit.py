@@ -0,0 +1,174 @@
+"""
+Buffered login audit trail and coalesced ``last_login``.
+
+Logins, token refreshes, logouts and failed logins are appended to a
+bounded in-memory ring buffer per worker - no query on the request path -
+and written with one ``bulk_create`` once FLUSH_SIZE events are waiting or
+FLUSH_INTERVAL seconds have passed. Flushes run from ``request_finished``
+of a request that recorded an event, after its response has been sent, so
+other endpoints never pay for them; from a background FlushTimer
+(utils/background.py) every FLUSH_INTERVAL, so a quiet worker does not sit
+on its events; and once more when the worker exits (all started in
+``uruserver/wsgi.py`` and ``asgi.py``). If the database falls behind, the
+oldest buffered events are dropped (and counted) rather than growing the
+buffer.
+
+Successful logins and refreshes also mark the user's ``last_login``, written
+at most once per LAST_LOGIN_INTERVAL per user and worker, in one UPDATE per
+flush.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+
+from account.enums import LoginEvent
+from account.models import LoginAudit
+from utils import metrics
+from utils.background import FlushTimer
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'BUFFER_SIZE': 10000,           # events kept per worker while the database is unreachable
+    'FLUSH_SIZE': 500,
+    'FLUSH_INTERVAL': 5,            # seconds
+    'LAST_LOGIN_INTERVAL': 300,     # seconds between last_login writes for one user
+}
+
+SEEN_EVENTS = (LoginEvent.LOGIN, LoginEvent.REFRESH)
+
+# set by record(); only requests that recorded an event take part in flushing
+_recorded = ContextVar('login_audit_recorded', default=False)
+
+
+def login_audit_settings():
+    return {**DEFAULTS, **getattr(settings, 'LOGIN_AUDIT', {})}
+
+
+class LoginAuditBuffer:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events = deque(maxlen=login_audit_settings()['BUFFER_SIZE'])
+        self._last_login = {}       # user id -> time, waiting to be written
+        self._last_login_at = {}    # user id -> monotonic time of the last write
+        self._flushed_at = time.monotonic()
+        self.timer = FlushTimer('login-audit', self.flush, lambda: self.config['FLUSH_INTERVAL'])
+
+    @property
+    def config(self):
+        return login_audit_settings()
+
+    def __len__(self):
+        return len(self._events)
+
+    def reset(self):
+        with self._lock:
+            self._events = deque(maxlen=self.config['BUFFER_SIZE'])
+            self._last_login, self._last_login_at = {}, {}
+            self._flushed_at = time.monotonic()
+
+    def record(self, event, request, user_id=None, email=''):
+        config = self.config
+        if not config['ENABLED']:
+            return
+        now, monotonic = timezone.now(), time.monotonic()
+        entry = (
+            event, user_id, (email or '')[:255],
+            BaseThrottle().get_ident(request) or None,
+            request.META.get('HTTP_USER_AGENT', '')[:255],
+            now,
+        )
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                metrics.login_audit_dropped.inc()
+            self._events.append(entry)
+            if event in SEEN_EVENTS and user_id is not None:
+                if monotonic - self._last_login_at.get(user_id, float('-inf')) >= config['LAST_LOGIN_INTERVAL']:
+                    self._last_login_at[user_id] = monotonic
+                    self._last_login[user_id] = now
+        _recorded.set(True)
+        metrics.login_audit_events.inc(event=event)
+        self.timer.ensure_running()
+
+    def is_due(self):
+        config = self.config
+        return len(self._events) >= config['FLUSH_SIZE'] or (
+            (self._events or self._last_login)
+            and time.monotonic() - self._flushed_at >= config['FLUSH_INTERVAL']
+        )
+
+    def flush(self):
+        """Write everything buffered so far. Returns the number of events written."""
+        if not self._flush_lock.acquire(blocking=False):
+            return 0    # another thread is flushing
+        try:
+            with self._lock:
+                events, self._events = list(self._events), deque(maxlen=self.config['BUFFER_SIZE'])
+                last_login, self._last_login = self._last_login, {}
+                self._flushed_at = time.monotonic()
+                self._forget_seen_users()
+            if not events and not last_login:
+                return 0
+
+            try:
+                User = get_user_model()
+                # a user may have deleted their account since the event was recorded;
+                # ids taken from token claims are strings
+                user_ids = {entry[1] for entry in events} - {None}
+                users = {
+                    str(pk): pk for pk in User.objects.filter(pk__in=user_ids).values_list('pk', flat=True)
+                } if user_ids else {}
+                LoginAudit.objects.bulk_create(
+                    [
+                        LoginAudit(event=event, user_id=users.get(str(user_id)), email=email,
+                                   ip_address=ip, user_agent=user_agent, created_at=created_at)
+                        for event, user_id, email, ip, user_agent, created_at in events
+                    ],
+                    batch_size=self.config['FLUSH_SIZE'],
+                )
+                if last_login:
+                    User.objects.filter(pk__in=last_login).update(last_login=Case(
+                        *[When(pk=pk, then=Value(at)) for pk, at in last_login.items()],
+                        output_field=DateTimeField(),
+                    ))
+            except Exception:
+                logger.exception(f"Failed to write {len(events)} login audit events")
+                metrics.login_audit_dropped.inc(len(events))
+                return 0
+            return len(events)
+        finally:
+            self._flush_lock.release()
+
+    def begin_request(self):
+        """Forget work queued outside a request; only the request's own counts towards flushing."""
+        _recorded.set(False)
+
+    def flush_if_due(self):
+        """Flush if the current request recorded an event and a batch is due."""
+        if not _recorded.get():
+            return False
+        _recorded.set(False)
+        if not self.is_due():
+            return False
+        self.flush()
+        return True
+
+    def _forget_seen_users(self):
+        # users outside the interval would be written anyway; keeps the map bounded
+        cutoff = time.monotonic() - self.config['LAST_LOGIN_INTERVAL']
+        self._last_login_at = {pk: at for pk, at in self._last_login_at.items() if at > cutoff}
+
+
+login_audit = LoginAuditBuffer()
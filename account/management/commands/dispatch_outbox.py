@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from account.outbox import dispatch_batch, outbox_settings
+from utils.mail import email_pool
+
+
+class Command(BaseCommand):
+    """
+    run:
+    python manage.py dispatch_outbox            # drain everything that is due, then exit
+    python manage.py dispatch_outbox --loop     # keep polling (e.g. as a sidecar process)
+    """
+    help = 'Deliver queued emails from the outbox in batches, with retries and dead-lettering'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails claimed per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting when idle')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the outbox is idle')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or outbox_settings()['BATCH_SIZE']
+        totals = {'sent': 0, 'retried': 0, 'dead': 0}
+
+        while True:
+            result = dispatch_batch(batch_size)
+            for key, value in result.items():
+                totals[key] += value
+
+            if sum(result.values()) < batch_size:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        stats = email_pool.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']}, retried {totals['retried']}, dead-lettered {totals['dead']}"
+        ))
+        self.stdout.write(
+            f"Connections opened {stats['connections_opened']} (reconnects {stats['reconnects']}), "
+            f"handshake {stats['handshake_seconds']:.3f}s, send {stats['send_seconds']:.3f}s"
+        )
@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from account.export import CONTENT_TYPES, stream_users
+
+
+class Command(BaseCommand):
+    """
+    run:
+    python manage.py export_users --format csv --output users.csv
+    python manage.py export_users --format ndjson | gzip > users.ndjson.gz
+    """
+    help = 'Stream all users as NDJSON or CSV with flat memory use'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(CONTENT_TYPES), default='ndjson')
+        parser.add_argument('--output', default='-', help='File to write, "-" for stdout')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        chunks = stream_users(options['format'], chunk_size=options['chunk_size'])
+        if options['output'] == '-':
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+            return
+
+        with open(options['output'], 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported users to {options['output']}"))
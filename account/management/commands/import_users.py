@@ -0,0 +1,62 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.models import UserImport
+from account.user_import import UserImporter, claim_pending, create_job, error_report
+
+
+class Command(BaseCommand):
+    """
+    run:
+    python manage.py import_users students.csv                      # import a file
+    python manage.py import_users --resume 12                       # continue an interrupted import
+    python manage.py import_users --pending                         # run imports uploaded through the API
+    python manage.py import_users students.csv --report errors.csv  # also write rejected rows
+    """
+    help = 'Bulk import users from CSV with parallel password hashing and chunked inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='CSV file with an email column')
+        parser.add_argument('--resume', type=int, metavar='JOB_ID', help='Continue an unfinished import')
+        parser.add_argument('--pending', action='store_true', help='Run every import queued through the API')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows per transaction')
+        parser.add_argument('--workers', type=int, default=None, help='Hashing processes (default: one per core)')
+        parser.add_argument('--report', help='Write the rejected rows of the import to this CSV file')
+
+    def handle(self, *args, **options):
+        if sum(bool(option) for option in (options['path'], options['resume'], options['pending'])) != 1:
+            raise CommandError('Give exactly one of a CSV path, --resume JOB_ID or --pending')
+
+        if options['pending']:
+            jobs = claim_pending()
+        elif options['resume']:
+            try:
+                jobs = [UserImport.objects.get(pk=options['resume'])]
+            except UserImport.DoesNotExist:
+                raise CommandError(f"Import {options['resume']} does not exist")
+        else:
+            if not os.path.exists(options['path']):
+                raise CommandError(f"{options['path']} does not exist")
+            with open(options['path'], 'rb') as f:
+                jobs = [create_job(f, os.path.basename(options['path']))]
+
+        for job in jobs:
+            self.stdout.write(f"Import {job.pk}: starting at row {job.processed_rows + 1}")
+            try:
+                UserImporter(job, chunk_size=options['chunk_size'], workers=options['workers']).run()
+            except Exception as e:
+                raise CommandError(
+                    f"Import {job.pk} stopped after row {job.processed_rows}: {e}. "
+                    f"Continue with --resume {job.pk}"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"Import {job.pk}: {job.created_count} created, {job.failed_count} rejected"
+            ))
+            if options['report']:
+                self.write_report(job, options['report'])
+
+    def write_report(self, job, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            f.writelines(error_report(job))
+        self.stdout.write(f"Rejected rows written to {path}")
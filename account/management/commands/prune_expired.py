@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.pruning import estimate, prune, pruning_settings, targets
+from utils.locks import advisory_lock
+
+
+class Command(BaseCommand):
+    """
+    run:
+    python manage.py prune_expired                  # e.g. hourly from cron, on every node
+    python manage.py prune_expired --dry-run        # rows and chunks each target would take
+    python manage.py prune_expired --only outstanding_tokens --chunk-size 5000 --sleep 0
+    """
+    help = 'Delete expired tokens, expired email changes and abandoned unverified users in small chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Count what would be deleted, delete nothing')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows deleted per transaction')
+        parser.add_argument('--sleep', type=float, default=None, help='Seconds to sleep between chunks')
+        parser.add_argument('--only', action='append', default=None, help='Prune only this target (repeatable)')
+
+    def handle(self, *args, **options):
+        config = pruning_settings()
+        chunk_size = options['chunk_size'] or config['CHUNK_SIZE']
+        sleep = config['SLEEP'] if options['sleep'] is None else options['sleep']
+        selected = targets()
+        if options['only']:
+            unknown = set(options['only']) - set(selected)
+            if unknown:
+                raise CommandError(f"Unknown target(s): {', '.join(sorted(unknown))}; "
+                                   f"choose from {', '.join(selected)}")
+            selected = {name: queryset for name, queryset in selected.items() if name in options['only']}
+
+        if options['dry_run']:
+            for name, queryset in selected.items():
+                result = estimate(queryset, chunk_size)
+                self.stdout.write(
+                    f"{name}: {result['rows']} rows in {result['chunks']} chunks "
+                    f"(at least {max(result['chunks'] - 1, 0) * sleep:.1f}s of sleeps)"
+                )
+            return
+
+        with advisory_lock('prune_expired', timeout=config['LOCK_TIMEOUT']) as acquired:
+            if not acquired:
+                self.stdout.write("Another node is pruning; skipped")
+                return
+
+            for name, queryset in selected.items():
+                started = time.monotonic()
+                deleted = {}
+                for chunk in prune(name, queryset, chunk_size, sleep):
+                    for label, count in chunk.items():
+                        deleted[label] = deleted.get(label, 0) + count
+                elapsed = time.monotonic() - started
+                rows = sum(deleted.values())
+                detail = ', '.join(f"{label} {count}" for label, count in sorted(deleted.items()))
+                self.stdout.write(self.style.SUCCESS(
+                    f"{name}: deleted {rows} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)"
+                    + (f" - {detail}" if detail else "")
+                ))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_email_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.CharField(blank=True, default='', max_length=255)),
+                ('event', models.CharField(choices=[('login', 'Login'), ('refresh', 'Token Refresh'), ('logout', 'Logout'), ('login_failed', 'Failed Login')], max_length=20)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user_agent', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Login Audit',
+                'verbose_name_plural': 'Login Audit',
+                'indexes': [models.Index(fields=['user', '-created_at'], name='login_audit_user_idx'), models.Index(fields=['ip_address', '-created_at'], name='login_audit_ip_idx')],
+            },
+        ),
+    ]
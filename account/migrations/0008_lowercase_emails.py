@@ -0,0 +1,23 @@
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    """Store emails registered before normalize_email lowercased them in canonical form."""
+    User = apps.get_model('account', 'User')
+    mixed_case = User.objects.annotate(lowered=Lower('email')).exclude(email=Lower('email'))
+    for pk, lowered in mixed_case.values_list('pk', 'lowered').iterator():
+        # keep both rows if another account already has the lowercase address
+        if not User.objects.filter(email=lowered).exists():
+            User.objects.filter(pk=pk).update(email=lowered)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_user_updated_at_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+    ]
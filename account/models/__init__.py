@@ -1,4 +1,7 @@
 from .user import User
 from .email import PendingEmailChange
+from .outbox import OutgoingEmail
+from .user_import import UserImport, UserImportError
+from .login_audit import LoginAudit
 
-__all__ = ['User', 'PendingEmailChange']
+__all__ = ['User', 'PendingEmailChange', 'OutgoingEmail', 'UserImport', 'UserImportError', 'LoginAudit']
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 
 from django.conf import settings
 from django.utils import timezone
@@ -24,11 +25,12 @@ class PendingEmailChange(models.Model):
         indexes = [
             models.Index(fields=['token']),
             models.Index(fields=['expires_at']),
+            models.Index(Lower('new_email'), name='pending_new_email_lower_idx'),
         ]
 
     def clean(self):
         # Validate that new_email isn't already in use by another user
-        if UserModel.objects.filter(email=self.new_email).exists():
+        if UserModel.objects.filter(email__lower=self.new_email.lower()).exists():
             raise ValidationError({'new_email': 'This email is already in use by another account'})
 
     def save(self, *args, **kwargs):
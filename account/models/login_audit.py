@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db import models
+
+from ..enums import LoginEvent
+
+
+class LoginAudit(models.Model):
+    """
+    One login, token refresh, logout or failed login. Written in batches by
+    account/login_audit.py, so rows appear a few seconds after the event.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    email = models.CharField(max_length=255, blank=True, default='')    # as typed, for failed logins
+    event = models.CharField(max_length=20, choices=LoginEvent.choices)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Login Audit"
+        verbose_name_plural = "Login Audit"
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='login_audit_user_idx'),
+            models.Index(fields=['ip_address', '-created_at'], name='login_audit_ip_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.user_id or self.email} at {self.created_at}"
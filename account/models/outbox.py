@@ -0,0 +1,51 @@
+from django.db import models
+from django.utils import timezone
+
+from ..enums import EmailStatus
+
+
+class OutgoingEmail(models.Model):
+    """
+    An email waiting in the outbox. Rows are written inside the request's
+    transaction and delivered by ``manage.py dispatch_outbox``.
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(null=True, blank=True)
+    from_email = models.CharField(max_length=255, null=True, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.CharField(max_length=255, null=True, blank=True)
+
+    status = models.CharField(max_length=10, choices=EmailStatus.choices, default=EmailStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # when the row is next due; while SENDING it is the end of the claim lease
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Outgoing Email"
+        verbose_name_plural = "Outgoing Emails"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
+
+    def as_email_data(self):
+        """The ``data`` dict accepted by ``Util.send_email``."""
+        return {
+            'subject': self.subject,
+            'body': self.body,
+            'to_email': self.to,
+            'from_email': self.from_email,
+            'reply_to': self.reply_to,
+            'cc': self.cc,
+            'bcc': self.bcc,
+            'html_body': self.html_body,
+        }
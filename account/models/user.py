@@ -1,9 +1,35 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils.translation import gettext_lazy as _
+from .. import hashing
 from ..enums import AuthProvider, Roles
 
+# ``email__lower=...`` compiles to LOWER(email) = %s, which the functional
+# indexes on User and PendingEmailChange serve. Prefer it over ``__iexact``
+# (UPPER(...) on PostgreSQL, LIKE on SQLite), which no index can use.
+models.EmailField.register_lookup(Lower)
+
+
 class UserManager(BaseUserManager):
+    @classmethod
+    def normalize_email(cls, email):
+        # store the canonical, all-lowercase form
+        return super().normalize_email(email).lower()
+
+    def get_by_natural_key(self, email):
+        # authenticate() passes the address as typed; LOWER(email) is indexed
+        try:
+            return self.get(email__lower=email.lower())
+        except self.model.MultipleObjectsReturned:
+            # addresses that differ only in case, registered before they were stored
+            # lowercase: the one typed exactly, else the canonical one
+            users = {user.email: user for user in self.filter(email__lower=email.lower())}
+            user = users.get(email) or users.get(email.lower())
+            if user is None:
+                raise self.model.DoesNotExist
+            return user
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('Email is required')
@@ -90,6 +116,14 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = "User"
         verbose_name_plural = "Users"
         ordering = ['-created_at']
+        indexes = [
+            # keyset pagination of the user list (utils.pagination.KeysetPagination)
+            models.Index(fields=['-created_at', '-id'], name='user_created_id_idx'),
+            # case-insensitive lookups (email__lower)
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            # incremental syncs of the email index (account.email_index)
+            models.Index(fields=['updated_at'], name='user_updated_at_idx'),
+        ]
 
     def __str__(self):
         return self.email
@@ -106,6 +140,30 @@ class User(AbstractBaseUser, PermissionsMixin):
         """Return the short name for the user."""
         return self.first_name
 
+    def set_password(self, raw_password):
+        """Hash on the password hashing pool (see account.hashing)."""
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """Verify on the password hashing pool (see account.hashing)."""
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return hashing.check_password(raw_password, self.password, setter)
+
+    async def acheck_password(self, raw_password):
+        """See check_password()."""
+        async def setter(raw_password):
+            self.password = await hashing.amake_password(raw_password)
+            self._password = None
+            await self.asave(update_fields=["password"])
+
+        return await hashing.acheck_password(raw_password, self.password, setter)
+
     def has_perm(self, perm, obj=None):
         """
         Return True if the user has the specified permission.
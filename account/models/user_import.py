@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.db import models
+
+from ..enums import ImportStatus
+
+
+class UserImport(models.Model):
+    """
+    A bulk import of users from a CSV file (see account/user_import.py).
+
+    ``processed_rows`` is committed together with every inserted chunk, so an
+    interrupted import resumes right after the last chunk that made it in.
+    """
+    file = models.FileField(upload_to='user_imports/')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+
+    status = models.CharField(max_length=10, choices=ImportStatus.choices, default=ImportStatus.PENDING)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "User Import"
+        verbose_name_plural = "User Imports"
+
+    def __str__(self):
+        return f"Import {self.pk} ({self.status}, {self.processed_rows} rows)"
+
+
+class UserImportError(models.Model):
+    """A CSV row that was rejected, with the reasons."""
+    job = models.ForeignKey(UserImport, on_delete=models.CASCADE, related_name='row_errors')
+    row = models.PositiveIntegerField()     # 1-based, not counting the header
+    email = models.CharField(max_length=255, blank=True, default='')
+    errors = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['row']
+        verbose_name = "User Import Error"
+        verbose_name_plural = "User Import Errors"
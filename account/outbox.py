@@ -0,0 +1,147 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from account.enums import EmailStatus
+from account.models import OutgoingEmail
+from utils.mail import email_pool
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 30,     # seconds before the first retry, doubled per attempt
+    'BACKOFF_MAX': 3600,
+    'LEASE': 300,           # seconds a claimed batch stays reserved for its dispatcher
+}
+
+
+def outbox_settings():
+    return {**DEFAULTS, **getattr(settings, 'EMAIL_OUTBOX', {})}
+
+
+def _as_list(value):
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def enqueue(data):
+    """
+    Store an email for the dispatcher. ``data`` has the same keys as
+    ``Util.send_email``. Call inside the transaction that produced the email
+    so the row only becomes visible if that transaction commits.
+    """
+    if not all(key in data for key in ['subject', 'body', 'to_email']):
+        raise ValueError("Missing required email fields")
+
+    return OutgoingEmail.objects.create(
+        subject=data['subject'],
+        body=data['body'],
+        html_body=data.get('html_body'),
+        from_email=data.get('from_email'),
+        to=_as_list(data['to_email']),
+        cc=_as_list(data.get('cc')),
+        bcc=_as_list(data.get('bcc')),
+        reply_to=data.get('reply_to'),
+    )
+
+
+def backoff(attempts):
+    config = outbox_settings()
+    return timedelta(seconds=min(config['BACKOFF_MAX'], config['BACKOFF_BASE'] * 2 ** (attempts - 1)))
+
+
+def claim_batch(batch_size):
+    """
+    Reserve up to ``batch_size`` due emails. Rows left in SENDING by a
+    dispatcher that died are picked up again once their lease runs out.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=outbox_settings()['LEASE'])
+
+    with transaction.atomic():
+        rows = list(
+            OutgoingEmail.objects
+            .filter(status__in=[EmailStatus.PENDING, EmailStatus.SENDING], next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        OutgoingEmail.objects.filter(pk__in=[row.pk for row in rows]).update(
+            status=EmailStatus.SENDING,
+            next_attempt_at=lease_until,
+        )
+    return rows
+
+
+def dispatch_batch(batch_size=None):
+    """
+    Deliver one batch over a pooled email connection (see utils/mail.py).
+
+    Returns:
+        dict: counts of ``sent``, ``retried`` and ``dead`` rows
+    """
+    # imported here: account.utils imports this module
+    from account.utils import Util
+
+    config = outbox_settings()
+    rows = claim_batch(batch_size or config['BATCH_SIZE'])
+    result = {'sent': 0, 'retried': 0, 'dead': 0}
+    if not rows:
+        return result
+
+    errors = {}
+    messages = []
+    for row in rows:
+        try:
+            messages.append((row, Util.build_email(row.as_email_data())))
+        except Exception as e:
+            errors[row.pk] = e
+
+    try:
+        outcomes = email_pool.send_messages(message for _, message in messages)
+    except Exception as e:
+        # could not connect at all - nothing in this batch went out
+        outcomes = [e] * len(messages)
+    for (row, _), outcome in zip(messages, outcomes):
+        if outcome is not None:
+            errors[row.pk] = outcome
+
+    sent_ids = [row.pk for row in rows if row.pk not in errors]
+    result['sent'] = OutgoingEmail.objects.filter(pk__in=sent_ids).update(
+        status=EmailStatus.SENT,
+        attempts=F('attempts') + 1,
+        sent_at=timezone.now(),
+        last_error='',
+    )
+
+    for row in rows:
+        error = errors.get(row.pk)
+        if error is None:
+            continue
+
+        attempts = row.attempts + 1
+        if attempts >= config['MAX_ATTEMPTS']:
+            status, next_attempt_at = EmailStatus.DEAD, timezone.now()
+            result['dead'] += 1
+            logger.error(f"Outgoing email {row.pk} moved to dead letters after {attempts} attempts: {error}")
+        else:
+            status, next_attempt_at = EmailStatus.PENDING, timezone.now() + backoff(attempts)
+            result['retried'] += 1
+            logger.warning(f"Outgoing email {row.pk} failed (attempt {attempts}): {error}")
+
+        OutgoingEmail.objects.filter(pk=row.pk).update(
+            status=status,
+            attempts=attempts,
+            next_attempt_at=next_attempt_at,
+            last_error=str(error),
+        )
+
+    return result
@@ -0,0 +1,100 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 3600,
+}
+
+# the only fields UserProfileSerializer reads; saves limited to other fields
+# (e.g. last_login on every login) leave the cache alone
+PROFILE_FIELDS = frozenset({'id', 'email', 'first_name', 'last_name', 'role', 'updated_at'})
+
+
+def profile_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'PROFILE_CACHE', {})}
+
+
+class ProfileCache:
+    """
+    Rendered ``GET /auth/profile/`` bodies, so a hit costs one cache round
+    trip and no query or serializer.
+
+    Two keys per user: the current version (the ``updated_at`` of the last
+    save, written by the User post_save signal) and the body with the version
+    it was rendered from. A body is served only if its version is current,
+    and stored only if the row it was rendered from carries the current
+    version, so a read racing a save - an uncommitted transaction, a lagging
+    replica - cannot put a stale profile back in the cache.
+    """
+
+    version_prefix = 'profile-version:'
+    body_prefix = 'profile:'
+    deleted = 'deleted'
+
+    def __init__(self):
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    @property
+    def config(self):
+        return profile_cache_settings()
+
+    @property
+    def cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    @staticmethod
+    def version_of(user):
+        return user.updated_at.isoformat()
+
+    def get(self, user_id):
+        """The cached body for ``user_id``, or ``None``."""
+        if not self.config['ENABLED']:
+            return None
+        version_key, body_key = self.version_prefix + str(user_id), self.body_prefix + str(user_id)
+        try:
+            found = self.cache.get_many([version_key, body_key])
+        except Exception:
+            logger.exception("Profile cache lookup failed")
+            found = {}
+
+        version, entry = found.get(version_key), found.get(body_key)
+        if version is not None and entry is not None and entry[0] == version:
+            self.stats['hits'] += 1
+            return entry[1]
+        self.stats['misses'] += 1
+        return None
+
+    def set(self, user, body):
+        """Store ``body``, rendered from ``user`` as just loaded from the database."""
+        config = self.config
+        if not config['ENABLED']:
+            return
+        version = self.version_of(user)
+        version_key = self.version_prefix + str(user.pk)
+        try:
+            # a missing version (first request, eviction) starts at this row's
+            self.cache.add(version_key, version, config['TIMEOUT'])
+            if self.cache.get(version_key) != version:
+                return
+            self.cache.set(self.body_prefix + str(user.pk), (version, body), config['TIMEOUT'])
+            self.stats['stores'] += 1
+        except Exception:
+            logger.exception("Profile cache store failed")
+
+    def invalidate(self, user, deleted=False):
+        config = self.config
+        version = self.deleted if deleted else self.version_of(user)
+        try:
+            self.cache.set(self.version_prefix + str(user.pk), version, config['TIMEOUT'])
+        except Exception:
+            logger.exception("Profile cache invalidation failed")
+
+
+profile_cache = ProfileCache()
@@ -0,0 +1,104 @@
+"""
+Pruning of rows that are no longer needed:
+
+- outstanding refresh tokens past ``expires_at``, with their blacklist rows
+- pending email changes past ``expires_at``
+- users who never verified their email, UNVERIFIED_USER_AGE seconds after
+  registering, unless they logged in since then; staff are never pruned,
+  nor are imported users, whose email counts as verified
+  (account/user_import.py)
+
+Rows are deleted in primary-key order, CHUNK_SIZE at a time, each chunk in
+its own short transaction with SLEEP seconds between chunks, so neither the
+tables nor replication are held up for long. The ``prune_expired`` command
+runs every target under an advisory lock (utils/locks.py), so it can be
+started from cron on every node.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from account.models import PendingEmailChange
+from utils import metrics
+
+
+DEFAULTS = {
+    'CHUNK_SIZE': 1000,
+    'SLEEP': 0.1,                           # seconds between chunks
+    'UNVERIFIED_USER_AGE': 7 * 24 * 3600,   # seconds
+    'LOCK_TIMEOUT': 3600,                   # seconds; only used without database advisory locks
+}
+
+
+def pruning_settings():
+    return {**DEFAULTS, **getattr(settings, 'TABLE_PRUNING', {})}
+
+
+def targets(now=None):
+    """The querysets to prune, in the order they are pruned."""
+    now = now or timezone.now()
+    registered_before = now - timedelta(seconds=pruning_settings()['UNVERIFIED_USER_AGE'])
+    leeway = api_settings.LEEWAY
+    if not isinstance(leeway, timedelta):
+        leeway = timedelta(seconds=leeway)
+
+    return {
+        # tokens first: deleting them removes their blacklist rows by cascade,
+        # and leaves fewer rows to unlink when a user is deleted
+        'outstanding_tokens': OutstandingToken.objects.filter(expires_at__lt=now - leeway),
+        'pending_email_changes': PendingEmailChange.objects.filter(expires_at__lt=now),
+        'unverified_users': get_user_model().objects.filter(
+            Q(last_login__isnull=True) | Q(last_login__lt=registered_before),
+            is_email_verified=False,
+            is_staff=False,
+            is_superuser=False,
+            created_at__lt=registered_before,
+        ),
+    }
+
+
+def estimate(queryset, chunk_size=None):
+    """Rows ``queryset`` would delete now, and the chunks that takes."""
+    chunk_size = chunk_size or pruning_settings()['CHUNK_SIZE']
+    rows = queryset.count()
+    return {'rows': rows, 'chunks': -(-rows // chunk_size)}
+
+
+def prune(name, queryset, chunk_size=None, sleep=None):
+    """
+    Delete the rows of ``queryset`` chunk by chunk.
+
+    Yields:
+        dict: rows deleted by each chunk, by model label - cascaded
+        deletes included
+    """
+    config = pruning_settings()
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+    sleep = config['SLEEP'] if sleep is None else sleep
+    queryset = queryset.order_by()
+    last_pk = None
+
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(chunk.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return
+
+        with transaction.atomic():
+            # filtered again: a row may no longer match, e.g. a user verified in between
+            _, deleted = queryset.filter(pk__in=pks).delete()
+        metrics.pruned_rows.inc(sum(deleted.values()), target=name)
+        yield deleted
+
+        if len(pks) < chunk_size:
+            return
+        last_pk = pks[-1]
+        if sleep:
+            time.sleep(sleep)
@@ -1,20 +1,19 @@
-from rest_framework.renderers import JSONRenderer
-import json
 from rest_framework.exceptions import ErrorDetail
 
+from utils.renderers import EnvelopeJSONRenderer
 
-class UserRenderer(JSONRenderer):
-    charset = 'utf-8'
 
-    def render(self, data, accepted_media_type=None, renderer_context=None):
-        response = ''
+class UserRenderer(EnvelopeJSONRenderer):
+    """
+    Account views. A response is an error if any top-level list starts with
+    an ErrorDetail; the payload is then wrapped unchanged. Output is
+    ASCII-escaped and ``None`` renders as ``null``.
+    """
+    ensure_ascii = True
+    empty_body = b'null'
+    error_types = list
 
-        if data is not None and isinstance(data, dict):
-            if any(isinstance(v[0], ErrorDetail) for v in data.values() if isinstance(v, list)):
-                response = json.dumps({'errors': data})
-            else:
-                response = json.dumps(data)
-        else:
-            response = json.dumps(data)
-
-        return response
\ No newline at end of file
+    def error_value(self, value):
+        if isinstance(value, list) and value and isinstance(value[0], ErrorDetail):
+            return value
+        return None
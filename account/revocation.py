@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from utils.bloom import BloomFilter
+from utils.cache import is_shared
+from utils.health import warming_up
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TRUST_CACHE': None,        # None: only a cache shared by every host; True for a file cache on one host
+    'CAPACITY': 100_000,
+    'ERROR_RATE': 0.001,
+    'SYNC_INTERVAL': 30,        # seconds between incremental syncs from the DB
+    'REBUILD_INTERVAL': 3600,   # seconds between full rebuilds (drops expired JTIs)
+}
+
+
+def revocation_settings():
+    return {**DEFAULTS, **getattr(settings, 'TOKEN_REVOCATION_FILTER', {})}
+
+
+class RevocationIndex:
+    """
+    Per-worker index of blacklisted refresh token JTIs.
+
+    A Bloom filter built from ``BlacklistedToken`` answers "definitely not
+    blacklisted" without touching the database. Revocations made by other
+    workers are seen through a short-lived marker in the shared cache, and
+    new blacklist rows are pulled in by primary key every ``SYNC_INTERVAL``
+    seconds in case a marker was lost. A filter or marker hit is confirmed
+    with the exact database lookup, so false positives only cost a query.
+
+    The cache must be shared by all workers on every host (Redis, not
+    ``LocMemCache`` or a file-based cache) for misses to be trusted;
+    otherwise every check falls through to the database. A deployment on a
+    single host can set TRUST_CACHE to trust its file-based cache.
+    """
+
+    marker_prefix = 'revoked-jti:'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._synced_at = 0.0
+        self._built_at = 0.0
+        self.stats = {'checks': 0, 'filter_hits': 0, 'marker_hits': 0, 'db_lookups': 0, 'rebuilds': 0}
+
+    @property
+    def config(self):
+        return revocation_settings()
+
+    @property
+    def cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    def is_trusted(self):
+        """Whether a miss can be trusted without asking the database."""
+        config = self.config
+        if not config['ENABLED']:
+            return False
+        if config['TRUST_CACHE'] is not None:
+            return config['TRUST_CACHE']
+        return is_shared(self.cache)
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+            self._last_id = 0
+            self._synced_at = self._built_at = 0.0
+
+    def rebuild(self):
+        """Build a fresh filter from every unexpired blacklisted token."""
+        # readiness fails until the first filter is built; later rebuilds replace one in use
+        with warming_up('revocation-filter') if self._filter is None else nullcontext():
+            config = self.config
+            rows = (
+                BlacklistedToken.objects
+                .filter(token__expires_at__gt=timezone.now())
+                .values_list('id', 'token__jti')
+            )
+            capacity = max(config['CAPACITY'], rows.count() * 2)
+            bloom = BloomFilter(capacity, config['ERROR_RATE'])
+            last_id = 0
+            for pk, jti in rows.iterator(chunk_size=5000):
+                bloom.add(jti)
+                last_id = max(last_id, pk)
+
+            with self._lock:
+                self._filter = bloom
+                self._last_id = max(self._last_id, last_id)
+                self._synced_at = self._built_at = time.monotonic()
+                self.stats['rebuilds'] += 1
+
+        logger.info(f"Rebuilt token revocation filter with {len(bloom)} JTIs")
+
+    def sync(self):
+        """Pull blacklist rows created since the last build or sync."""
+        rows = (
+            BlacklistedToken.objects
+            .filter(id__gt=self._last_id)
+            .order_by('id')
+            .values_list('id', 'token__jti')
+        )
+        with self._lock:
+            for pk, jti in rows:
+                self._filter.add(jti)
+                self._last_id = max(self._last_id, pk)
+            self._synced_at = time.monotonic()
+
+    def _refresh_if_due(self):
+        config = self.config
+        now = time.monotonic()
+        if (
+            self._filter is None
+            or self._filter.is_saturated
+            or now - self._built_at > config['REBUILD_INTERVAL']
+        ):
+            self.rebuild()
+        elif now - self._synced_at > config['SYNC_INTERVAL']:
+            self.sync()
+
+    def might_be_revoked(self, jti):
+        """
+        ``False`` means the JTI is definitely not blacklisted. ``True`` means
+        the caller must confirm with the database.
+        """
+        if not self.is_trusted():
+            return True
+
+        self.stats['checks'] += 1
+        self._refresh_if_due()
+
+        if jti in self._filter:
+            self.stats['filter_hits'] += 1
+            return True
+
+        if self.cache.get(self.marker_prefix + jti):
+            self.stats['marker_hits'] += 1
+            return True
+
+        return False
+
+    def is_revoked(self, jti):
+        if not self.might_be_revoked(jti):
+            return False
+
+        self.stats['db_lookups'] += 1
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def add(self, jti, expires_at=None):
+        """Record a new revocation locally and for every other worker."""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+        if not self.is_trusted():
+            return
+
+        # The marker only has to outlive a few syncs: by then every worker
+        # has the JTI in its filter. It also covers rows that commit with a
+        # lower id than one a sync has already seen.
+        timeout = self.config['SYNC_INTERVAL'] * 4
+        if expires_at is not None:
+            timeout = min(timeout, max(1, int((expires_at - timezone.now()).total_seconds())))
+        try:
+            self.cache.set(self.marker_prefix + jti, 1, timeout=timeout)
+        except Exception:
+            logger.exception("Failed to publish token revocation marker")
+
+
+revocation_index = RevocationIndex()
@@ -1,6 +1,6 @@
 from .login import UserLoginSerializer
 from .register import UserRegistrationSerializer
-from .token import CustomTokenObtainPairSerializer
+from .token import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 from .user_delete_account import UserDeleteAccountSerializer
 
-__all__ = ["UserLoginSerializer", "UserRegistrationSerializer", "CustomTokenObtainPairSerializer", "UserDeleteAccountSerializer"]
\ No newline at end of file
+__all__ = ["UserLoginSerializer", "UserRegistrationSerializer", "CustomTokenObtainPairSerializer", "CustomTokenRefreshSerializer", "UserDeleteAccountSerializer"]
\ No newline at end of file
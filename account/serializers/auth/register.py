@@ -2,6 +2,9 @@ from rest_framework import serializers
 
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from account.email_index import email_index
 
 User = get_user_model()
 
@@ -11,18 +14,33 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         model = User
         fields = ['email', 'first_name', 'last_name', 'password', ]
         extra_kwargs = {
+            'email': {
+                'validators': [],  # uniqueness is checked by validate_email()
+            },
             'password': {
                 'write_only': True,
                 'min_length': 8,  # Enforce minimum length
             }
         }
 
+    @staticmethod
+    def email_taken_message():
+        return User._meta.get_field('email').error_messages['unique']
+
+    def validate_email(self, value):
+        # most signups use a new address: the email index answers without a query
+        if email_index.exists(User.objects.normalize_email(value)):
+            raise serializers.ValidationError(self.email_taken_message())
+        return value
+
     def validate_password(self, value):
         validate_password(value)
         return value
-    
-    def create(self, validated_data):
-        return User.objects.create_user(**validated_data)
-
-
 
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(**validated_data)
+        except IntegrityError:
+            # registered by a concurrent request after validate_email()
+            raise serializers.ValidationError({'email': [self.email_taken_message()]})
@@ -1,11 +1,72 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from account.tokens import RefreshToken
+
+
+def set_user_claims(token, user):
+    """
+    Stamp the claims that ``account.authentication.ClaimsUser`` answers
+    without a database query.
+    """
+    token['role'] = user.role
+    token['full_name'] = user.get_full_name()
+    token['is_email_verified'] = user.is_email_verified
+    token['auth_provider'] = user.auth_provider
+    token['is_active'] = user.is_active
+    return token
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token['role'] = user.role
-        token['full_name'] = user.get_full_name()
-        return token
-        
\ No newline at end of file
+        return set_user_claims(token, user)
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Same as simplejwt's refresh, but re-stamps the user claims from the row it
+    already loads, so role or verification changes reach the next access token
+    instead of being copied forward from the old refresh token.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        User = get_user_model()
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first() if user_id else None
+
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                _("No active account found for the given token."),
+                "no_active_account",
+            )
+
+        self.user = user
+        set_user_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    pass
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data['refresh'] = str(refresh)
+
+        return data
@@ -15,7 +15,7 @@ class UserDeleteAccountSerializer(serializers.Serializer):
         password = attrs['password']
 
         try:
-            user = User.objects.get(email__iexact=email)
+            user = User.objects.get(email__lower=email)
         except User.DoesNotExist:
             raise serializers.ValidationError({'email': 'User with this email does not exist'})
         
@@ -11,7 +11,7 @@ class SendPasswordResetEmailSerializer(serializers.Serializer):
         """Validate email format and existence without leaking information"""
         try:
             # Perform case-insensitive matching
-            self.user = User.objects.get(email__iexact=value)
+            self.user = User.objects.get(email__lower=value.lower())
         except User.DoesNotExist:
             # Don't reveal whether email exists in the system
             pass
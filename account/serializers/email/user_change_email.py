@@ -46,6 +46,7 @@ import logging
 from django.utils.crypto import get_random_string
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
+from account.email_index import email_index
 from account.models import PendingEmailChange
 
 
@@ -76,11 +77,11 @@ class UserChangeEmailSerializer(serializers.Serializer):
         User = get_user_model()
         
         # Check if email exists in verified accounts
-        if User.objects.filter(email__iexact=new_email, is_email_verified=True).exists():
+        if email_index.might_exist(new_email) and User.objects.filter(email__lower=new_email, is_email_verified=True).exists():
             raise serializers.ValidationError({"email": "This email is already in use."})
 
         # Check if another user has a pending change for this email
-        if PendingEmailChange.objects.filter(new_email__iexact=new_email).exclude(user=user).exists():
+        if PendingEmailChange.objects.filter(new_email__lower=new_email).exclude(user=user).exists():
             raise serializers.ValidationError({
                 "email": "This email address is currently being verified by another user."
             })
@@ -107,9 +108,9 @@ class UserChangeEmailSerializer(serializers.Serializer):
                     expiration_hours=24
                 )
 
-            # Send verification email
-            self._send_verification_email(user, pending_change)
-            
+                # Queue the verification email with the pending change
+                self._send_verification_email(user, pending_change)
+
             return pending_change
 
         except ValidationError as e:
@@ -133,7 +134,7 @@ class UserChangeEmailSerializer(serializers.Serializer):
         User = get_user_model()
         # Delete unverified users with this email
         unverified_users = User.objects.filter(
-            email__iexact=email, 
+            email__lower=email.lower(),
             is_email_verified=False
         )
         
@@ -1,3 +1,4 @@
 from .user import UserSerializer
+from .user_import import UserImportRowSerializer, UserImportSerializer, UserImportErrorSerializer
 
-__all__ = ["UserSerializer"]
+__all__ = ["UserSerializer", "UserImportRowSerializer", "UserImportSerializer", "UserImportErrorSerializer"]
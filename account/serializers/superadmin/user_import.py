@@ -0,0 +1,51 @@
+from rest_framework import serializers
+from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
+
+from account.enums import Roles
+from account.models import UserImport, UserImportError
+
+User = get_user_model()
+
+
+class UserImportRowSerializer(serializers.Serializer):
+    """One CSV row of a bulk import. A blank password gives an unusable one."""
+    email = serializers.EmailField(max_length=255)
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    role = serializers.ChoiceField(choices=[Roles.STUDENT, Roles.TEACHER], required=False, default=Roles.STUDENT)
+    password = serializers.CharField(min_length=8, required=False, allow_blank=True, default='', trim_whitespace=False)
+
+    def validate_email(self, value):
+        return User.objects.normalize_email(value)
+
+    def validate_password(self, value):
+        if value:
+            validate_password(value)
+        return value
+
+
+class UserImportErrorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserImportError
+        fields = ['row', 'email', 'errors']
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    row_errors = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserImport
+        fields = [
+            'id', 'file', 'status', 'processed_rows', 'created_count', 'failed_count',
+            'last_error', 'created_at', 'finished_at', 'row_errors',
+        ]
+        read_only_fields = [
+            'id', 'status', 'processed_rows', 'created_count', 'failed_count',
+            'last_error', 'created_at', 'finished_at',
+        ]
+        extra_kwargs = {'file': {'write_only': True}}
+
+    def get_row_errors(self, obj):
+        # a preview; the full report is streamed by the errors endpoint
+        return UserImportErrorSerializer(obj.row_errors.all()[:100], many=True).data
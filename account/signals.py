@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from account.email_index import email_index
+from account.login_audit import login_audit
+from account.profile_cache import PROFILE_FIELDS, profile_cache
+from account.revocation import revocation_index
+from account.token_ledger import token_ledger
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def record_revoked_token(sender, instance, created, **kwargs):
+    if created:
+        revocation_index.add(instance.token.jti, instance.token.expires_at)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_cached_profile(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not PROFILE_FIELDS.intersection(update_fields):
+        return
+    profile_cache.invalidate(instance)
+
+
+@receiver(post_save, sender=get_user_model())
+def index_user_email(sender, instance, created, update_fields=None, **kwargs):
+    # most saves keep the email; only publish one that may be new
+    if created or 'email' in (update_fields or ()) or (update_fields is None and instance.email not in email_index):
+        email_index.add(instance.email)
+
+
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_profile(sender, instance, **kwargs):
+    profile_cache.invalidate(instance, deleted=True)
+
+
+@receiver(post_delete, sender=get_user_model())
+def unindex_user_email(sender, instance, **kwargs):
+    email_index.discard(instance.email)
+
+
+@receiver(request_started)
+def begin_buffered_writes(sender, **kwargs):
+    login_audit.begin_request()
+    token_ledger.begin_request()
+
+
+@receiver(request_finished)
+def flush_login_audit(sender, **kwargs):
+    # runs after the response has been sent; Django's own close_old_connections
+    # receiver may already have run, so release the connection again
+    if login_audit.flush_if_due():
+        close_old_connections()
+
+
+@receiver(request_finished)
+def flush_token_ledger(sender, **kwargs):
+    # after the response, like flush_login_audit
+    if token_ledger.flush_if_due():
+        close_old_connections()
@@ -0,0 +1,109 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import AccessToken
+import json
+
+from account.authentication import ClaimsUser
+from account.enums import Roles
+from account.utils import Util
+
+User = get_user_model()
+
+
+class ClaimsJWTAuthenticationTests(APITestCase):
+    """
+    Role-only endpoints authenticate without touching the User table
+
+    Fields missing from the token are loaded lazily from the database
+
+    A stale is_email_verified=False claim is confirmed against the database
+
+    Refresh re-stamps claims from the current User row
+
+    Deactivated users can neither use an is_active=False token nor refresh or re-issue an old one
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='claims@example.com',
+            password='strongpassword123',
+            first_name='Claims',
+            last_name='User',
+            role=Roles.SUPERADMIN,
+            is_email_verified=True,
+        )
+        self.tokens = Util.get_tokens_for_user(self.user)
+
+    def authenticate(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_role_permission_runs_without_queries(self):
+        self.authenticate(self.tokens['access'])
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/account/superadmin/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_profile_loads_user_lazily(self):
+        self.authenticate(self.tokens['access'])
+        response = self.client.get(reverse('profile'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], self.user.email)
+
+    def test_profile_update_through_claims_user(self):
+        self.authenticate(self.tokens['access'])
+        response = self.client.patch(reverse('profile'), {'first_name': 'Jane'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Jane')
+
+    def test_unverified_claim_is_confirmed_against_database(self):
+        self.user.is_email_verified = False
+        self.user.save()
+        token = AccessToken(self.tokens['access'])
+        token['is_email_verified'] = False
+
+        self.user.is_email_verified = True
+        self.user.save()
+
+        claims_user = ClaimsUser(token)
+        self.assertEqual(claims_user.role, Roles.SUPERADMIN)
+        self.assertFalse(claims_user.is_loaded)
+        self.assertTrue(claims_user.is_email_verified)
+        self.assertTrue(claims_user.is_loaded)
+
+    def test_refresh_restamps_role(self):
+        self.user.role = Roles.STUDENT
+        self.user.save()
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.tokens['refresh']}, format='json')
+        data = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(data['access'])['role'], Roles.STUDENT)
+
+        self.authenticate(data['access'])
+        response = self.client.get('/api/account/superadmin/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_inactive_claim_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        inactive = Util.get_tokens_for_user(self.user)
+
+        self.authenticate(inactive['access'])
+        self.assertEqual(self.client.get(reverse('profile')).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(reverse('token_verify')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_cannot_renew(self):
+        self.user.is_active = False
+        self.user.save()
+
+        self.authenticate(self.tokens['access'])
+        self.assertEqual(self.client.post(reverse('token_verify')).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,120 @@
+import json
+import tempfile
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from account.email_index import EmailIndex, email_index
+
+User = get_user_model()
+
+SHARED_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='email-index-cache-'),
+    }
+}
+
+
+@override_settings(CACHES=SHARED_CACHE, EMAIL_INDEX={'TRUST_CACHE': True})
+class EmailIndexTests(APITestCase):
+    """
+    An unregistered email is answered without a query, by check-email and by registration
+
+    A registered email (any case) is confirmed with the indexed lookup
+
+    Users registered by another worker are seen through the shared marker, email changes through the signal
+
+    Deleted users stay possible hits until the next rebuild; a process- or host-local cache is not trusted unless TRUST_CACHE is set
+    """
+
+    def setUp(self):
+        email_index.reset()
+        email_index.cache.clear()
+        self.user = User.objects.create_user(email='taken@example.com', password='strongpassword123')
+        email_index.rebuild()
+
+    @contextmanager
+    def assertUserQueries(self, count):
+        # only count user lookups
+        with CaptureQueriesContext(connection) as context:
+            yield
+        lookups = [query['sql'] for query in context.captured_queries if 'account_user' in query['sql']]
+        self.assertEqual(len(lookups), count, lookups)
+
+    def check_email(self, email):
+        response = self.client.generic(
+            'GET', reverse('check-email'), json.dumps({'email': email}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['exists']
+
+    def test_unregistered_email_skips_database(self):
+        with self.assertUserQueries(0):
+            self.assertFalse(self.check_email('free@example.com'))
+
+    def test_registered_email_is_confirmed(self):
+        with self.assertUserQueries(1):
+            self.assertTrue(self.check_email('Taken@Example.com'))
+
+    def test_registration(self):
+        payload = {'email': 'new@example.com', 'first_name': 'New', 'last_name': 'User', 'password': 'strongpassword123'}
+        lookups = email_index.stats['db_lookups']
+        response = self.client.post(reverse('registration'), payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(email_index.stats['db_lookups'], lookups)
+        self.assertIn('new@example.com', email_index)
+
+        response = self.client.post(reverse('registration'), {**payload, 'email': 'NEW@example.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['email'], ['A user with that email already exists.'])
+
+    def test_registration_by_other_worker(self):
+        other_worker = EmailIndex()
+        other_worker.rebuild()
+
+        User.objects.create_user(email='elsewhere@example.com', password='strongpassword123')
+
+        self.assertTrue(other_worker.exists('elsewhere@example.com'))
+        self.assertEqual(other_worker.stats['marker_hits'], 1)
+
+    def test_sync_picks_up_rows_without_markers(self):
+        other_worker = EmailIndex()
+        other_worker.rebuild()
+        User.objects.bulk_create([User(email='bulk@example.com')])
+
+        other_worker.sync()
+
+        self.assertIn('bulk@example.com', other_worker)
+        with CaptureQueriesContext(connection) as context:
+            other_worker.sync()
+        plan = connection.cursor().execute(f"EXPLAIN QUERY PLAN {context.captured_queries[0]['sql']}").fetchall()
+        self.assertIn('user_updated_at_idx', str(plan))
+
+    def test_email_change(self):
+        self.user.email = 'changed@example.com'
+        self.user.save()
+
+        self.assertTrue(email_index.exists('changed@example.com'))
+
+    def test_deleted_user_needs_rebuild(self):
+        self.user.delete()
+
+        self.assertTrue(email_index.might_exist('taken@example.com'))
+        self.assertFalse(email_index.exists('taken@example.com'))
+        email_index.rebuild()
+        self.assertNotIn('taken@example.com', email_index)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, EMAIL_INDEX={})
+    def test_local_cache_falls_back_to_database(self):
+        self.assertFalse(email_index.is_trusted())
+        with override_settings(CACHES=SHARED_CACHE):
+            self.assertFalse(email_index.is_trusted())     # a file cache is local to its host
+        with self.assertNumQueries(1):
+            self.assertFalse(email_index.exists('free@example.com'))
@@ -0,0 +1,68 @@
+from importlib import import_module
+
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from account.models import PendingEmailChange
+from account.serializers.email.send_password_reset_email import SendPasswordResetEmailSerializer
+
+User = get_user_model()
+
+
+class EmailLookupIndexTests(TestCase):
+    """
+    Case-insensitive email lookups are served by the functional LOWER(email) indexes
+
+    Emails are stored lowercased and still found whatever case the client sends, also when logging in
+
+    Mixed-case emails stored before that are lowercased by migration 0008, unless the lowercase address is taken
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='Mixed.Case@Example.COM', password=None)
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=plan)
+
+    def test_email_is_stored_lowercased(self):
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, 'mixed.case@example.com')
+
+    def test_user_lookup_uses_index(self):
+        self.assertUsesIndex(User.objects.filter(email__lower='mixed.case@example.com'), 'user_email_lower_idx')
+
+    def test_pending_change_lookup_uses_index(self):
+        self.assertUsesIndex(
+            PendingEmailChange.objects.filter(new_email__lower='new@example.com'), 'pending_new_email_lower_idx'
+        )
+
+    def test_lookup_ignores_case(self):
+        serializer = SendPasswordResetEmailSerializer(data={'email': 'MIXED.case@example.com'})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.user, self.user)
+
+    def test_login_with_mixed_case(self):
+        payload = {'email': 'John.Doe@Example.com', 'password': 'StrongPassword123'}
+        self.assertEqual(self.client.post(reverse('registration'), payload, format='json').status_code, 201)
+
+        self.assertEqual(self.client.post(reverse('login'), payload, format='json').status_code, 200)
+        self.assertEqual(self.client.post(reverse('token_obtain_pair'), payload, format='json').status_code, 200)
+
+    def test_mixed_case_rows_are_lowercased(self):
+        lowercase_emails = import_module('account.migrations.0008_lowercase_emails').lowercase_emails
+        legacy = User.objects.create_user(email='legacy@example.com', password='StrongPassword123')
+        twin = User.objects.create_user(email='twin@example.com', password=None)
+        User.objects.filter(pk=legacy.pk).update(email='Legacy@Example.com')
+        twin_upper = User.objects.create_user(email='x@example.com', password='StrongPassword123')
+        User.objects.filter(pk=twin_upper.pk).update(email='Twin@Example.com')
+
+        lowercase_emails(django_apps, None)
+
+        self.assertEqual(User.objects.get(pk=legacy.pk).email, 'legacy@example.com')
+        self.assertEqual(User.objects.get(pk=twin_upper.pk).email, 'Twin@Example.com')
+        self.assertEqual(User.objects.get_by_natural_key('Twin@Example.com'), twin_upper)
+        self.assertEqual(User.objects.get_by_natural_key('TWIN@example.com'), twin)
@@ -0,0 +1,110 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from account.enums import EmailStatus
+from account.models import OutgoingEmail
+from account.outbox import dispatch_batch
+from account.utils import Util
+
+User = get_user_model()
+
+
+class EmailOutboxTests(APITestCase):
+    """
+    Registration queues its verification email instead of sending it, and stores neither user nor email if it fails
+
+    The dispatcher delivers queued emails through the configured backend
+
+    Failed deliveries are retried with backoff and dead-lettered after MAX_ATTEMPTS
+
+    An email that cannot be queued inside a transaction raises, and leaves the transaction usable
+    """
+
+    def queue(self, **extra):
+        data = {'subject': 'Hello', 'body': 'Body', 'to_email': 'someone@example.com', **extra}
+        self.assertTrue(Util.send_email(data))
+        return OutgoingEmail.objects.latest('id')
+
+    def test_registration_queues_email(self):
+        response = self.client.post(reverse('registration'), {
+            'email': 'outbox@example.com',
+            'password': 'StrongPassword123',
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutgoingEmail.objects.get()
+        self.assertEqual(queued.to, ['outbox@example.com'])
+        self.assertEqual(queued.status, EmailStatus.PENDING)
+
+    def test_failed_registration_stores_nothing(self):
+        response = self.client.post(reverse('registration'), {
+            'email': 'outbox@example.com',
+            'password': 'StrongPassword123',
+        }, format='json', HTTP_X_FRONTEND_BASE_URL='https://evil.example.net')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email='outbox@example.com').exists())
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_dispatch_command_delivers(self):
+        self.queue(cc='cc@example.com')
+        self.queue(to_email=['a@example.com', 'b@example.com'])
+
+        out = StringIO()
+        call_command('dispatch_outbox', stdout=out)
+
+        self.assertIn('Sent 2', out.getvalue())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].cc, ['cc@example.com'])
+        self.assertFalse(OutgoingEmail.objects.exclude(status=EmailStatus.SENT).exists())
+
+    @override_settings(EMAIL_OUTBOX={'MAX_ATTEMPTS': 2, 'BACKOFF_BASE': 60})
+    def test_failures_back_off_then_dead_letter(self):
+        email = self.queue()
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=ValueError('smtp down')):
+            self.assertEqual(dispatch_batch(), {'sent': 0, 'retried': 1, 'dead': 0})
+            email.refresh_from_db()
+            self.assertEqual(email.status, EmailStatus.PENDING)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+            # not due yet
+            self.assertEqual(dispatch_batch(), {'sent': 0, 'retried': 0, 'dead': 0})
+
+            OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(dispatch_batch(), {'sent': 0, 'retried': 0, 'dead': 1})
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, EmailStatus.DEAD)
+        self.assertEqual(email.attempts, 2)
+        self.assertIn('smtp down', email.last_error)
+
+    def test_expired_lease_is_reclaimed(self):
+        email = self.queue()
+        OutgoingEmail.objects.filter(pk=email.pk).update(status=EmailStatus.SENDING, next_attempt_at=timezone.now())
+
+        self.assertEqual(dispatch_batch()['sent'], 1)
+
+    def test_queue_failure(self):
+        with transaction.atomic():
+            with patch.object(OutgoingEmail.objects, 'create', side_effect=DatabaseError('disk full')):
+                with self.assertRaises(DatabaseError):
+                    Util.send_email({'subject': 'S', 'body': 'B', 'to_email': 'x@example.com'})
+            self.assertFalse(OutgoingEmail.objects.exists())     # the transaction is still usable
+
+    @override_settings(EMAIL_OUTBOX={'ENABLED': False})
+    def test_disabled_outbox_sends_directly(self):
+        self.assertTrue(Util.send_email({'subject': 'Now', 'body': 'Body', 'to_email': 'x@example.com'}))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutgoingEmail.objects.count(), 0)
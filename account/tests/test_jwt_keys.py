@@ -0,0 +1,120 @@
+import json
+from unittest import skipUnless
+
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from jwt.algorithms import has_crypto
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from account.utils import Util
+
+if has_crypto:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+User = get_user_model()
+
+
+def private_pem(key):
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+
+
+def signing(algorithm, *keys):
+    return override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, 'ALGORITHM': algorithm}, JWT_KEYS={'PRIVATE_KEYS': keys})
+
+
+class JWKSTests(APITestCase):
+    """
+    HS256 publishes an empty key set; the body is served with an ETag and answers If-None-Match with 304
+
+    GET on token/verify/ checks the token from its claims, without queries or new tokens
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='StrongPassword123')
+
+    def test_symmetric_key_is_not_published(self):
+        response = self.client.get(reverse('jwks'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), {'keys': []})
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+        response = self.client.get(reverse('jwks'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_verify_only(self):
+        access = Util.get_tokens_for_user(self.user)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('token_verify'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user_id'], str(self.user.pk))
+        self.assertNotIn('token', response.data)
+
+
+@skipUnless(has_crypto, 'asymmetric signing needs the cryptography package')
+class AsymmetricSigningTests(APITestCase):
+    """
+    Tokens are signed with the first key and carry its kid; the JWKS lets another service verify them
+
+    Rotation: tokens from a key moved down the list still verify, and stop once it is removed
+
+    EdDSA works the same way
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.old_key = private_pem(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        cls.new_key = private_pem(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='StrongPassword123')
+
+    def obtain(self):
+        response = self.client.post(
+            reverse('token_obtain_pair'), {'email': 'user@example.com', 'password': 'StrongPassword123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['access']
+
+    def verify(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return self.client.get(reverse('token_verify')).status_code
+
+    def test_offline_verification(self):
+        with signing('RS256', self.old_key):
+            access = self.obtain()
+            jwks = json.loads(self.client.get(reverse('jwks')).content)
+            self.assertEqual(self.verify(access), status.HTTP_200_OK)
+
+        [key] = jwks['keys']
+        self.assertEqual(jwt.get_unverified_header(access)['kid'], key['kid'])
+        claims = jwt.decode(access, jwt.PyJWK(key).key, algorithms=['RS256'])
+        self.assertEqual(claims['user_id'], str(self.user.pk))
+
+    def test_rotation(self):
+        with signing('RS256', self.old_key):
+            old_access = self.obtain()
+
+        with signing('RS256', self.new_key, self.old_key):
+            new_access = self.obtain()
+            self.assertEqual(self.verify(old_access), status.HTTP_200_OK)
+            self.assertEqual(len(json.loads(self.client.get(reverse('jwks')).content)['keys']), 2)
+
+        with signing('RS256', self.new_key):
+            self.assertEqual(self.verify(new_access), status.HTTP_200_OK)
+            self.assertEqual(self.verify(old_access), status.HTTP_401_UNAUTHORIZED)
+
+    def test_eddsa(self):
+        with signing('EdDSA', private_pem(ed25519.Ed25519PrivateKey.generate())):
+            access = self.obtain()
+            self.assertEqual(self.verify(access), status.HTTP_200_OK)
+            self.assertEqual(json.loads(self.client.get(reverse('jwks')).content)['keys'][0]['crv'], 'Ed25519')
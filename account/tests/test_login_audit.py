@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from account.enums import LoginEvent
+from account.login_audit import login_audit
+from account.models import LoginAudit
+from utils import metrics
+
+User = get_user_model()
+
+
+class LoginAuditTests(APITestCase):
+    """
+    Logins, refreshes, logouts and failed logins are buffered and written in one batch
+
+    Nothing is written during the request; the flush runs on request_finished once FLUSH_INTERVAL has passed
+
+    A quiet worker's background timer flushes every FLUSH_INTERVAL; with nothing buffered it does not query
+
+    last_login is written at most once per LAST_LOGIN_INTERVAL per user
+
+    A full buffer drops the oldest events and counts them
+    """
+
+    def setUp(self):
+        cache.clear()   # failed logins below count towards the lockout
+        login_audit.reset()
+        self.password = 'StrongPassword123'
+        self.user = User.objects.create_user(email='user@example.com', password=self.password)
+
+    def login(self, password=None):
+        return self.client.post(
+            reverse('login'), {'email': 'user@example.com', 'password': password or self.password}, format='json')
+
+    def test_events_are_buffered(self):
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login('wrong-password').status_code, status.HTTP_401_UNAUTHORIZED)
+        tokens = self.client.post(
+            reverse('token_obtain_pair'), {'email': 'user@example.com', 'password': self.password}, format='json').data
+        tokens = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']}, format='json').data
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        response = self.client.post(reverse('logout'), {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+
+        self.assertFalse(LoginAudit.objects.exists())
+        self.assertEqual(login_audit.flush(), 5)
+
+        events = list(LoginAudit.objects.order_by('created_at', 'pk').values_list('event', 'user_id'))
+        self.assertEqual(events, [
+            (LoginEvent.LOGIN, self.user.pk),
+            (LoginEvent.LOGIN_FAILED, None),
+            (LoginEvent.LOGIN, self.user.pk),
+            (LoginEvent.REFRESH, self.user.pk),
+            (LoginEvent.LOGOUT, self.user.pk),
+        ])
+        failed = LoginAudit.objects.get(event=LoginEvent.LOGIN_FAILED)
+        self.assertEqual((failed.email, failed.ip_address), ('user@example.com', '127.0.0.1'))
+
+    @override_settings(LOGIN_AUDIT={'FLUSH_INTERVAL': 0})
+    def test_flushed_after_response(self):
+        self.login()
+
+        self.assertEqual(LoginAudit.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(len(login_audit), 0)
+
+    def test_last_login_is_coalesced(self):
+        self.login()
+        self.login()
+        with self.assertNumQueries(3):      # user check, one INSERT for both events, one UPDATE
+            login_audit.flush()
+        self.user.refresh_from_db()
+        first = self.user.last_login
+        self.assertIsNotNone(first)
+
+        self.login()
+        with self.assertNumQueries(2):
+            login_audit.flush()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, first)
+
+    @override_settings(LOGIN_AUDIT={'LAST_LOGIN_INTERVAL': 0})
+    def test_last_login_interval(self):
+        self.login()
+        login_audit.flush()
+        self.user.refresh_from_db()
+        first = self.user.last_login
+
+        self.login()
+        login_audit.flush()
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.last_login, first)
+
+    @override_settings(LOGIN_AUDIT={'BUFFER_SIZE': 2})
+    def test_full_buffer_drops_oldest(self):
+        login_audit.reset()
+        dropped = sum(metrics.login_audit_dropped.values.values())
+
+        for _ in range(3):
+            self.login('wrong-password')
+
+        self.assertEqual(sum(metrics.login_audit_dropped.values.values()) - dropped, 1)
+        self.assertEqual(login_audit.flush(), 2)
+
+    def test_deleted_user(self):
+        self.login()
+        User.objects.filter(pk=self.user.pk).delete()
+
+        self.assertEqual(login_audit.flush(), 1)
+        self.assertEqual(LoginAudit.objects.get().user_id, None)
+
+    @override_settings(LOGIN_AUDIT={'FLUSH_INTERVAL': 7})
+    def test_timer_flushes_quiet_worker(self):
+        self.assertEqual(login_audit.timer.interval(), 7)
+        with self.assertNumQueries(0):
+            self.assertEqual(login_audit.timer.flush(), 0)
+
+        self.login()
+        self.assertEqual(login_audit.timer.flush(), 1)
+        self.assertEqual(LoginAudit.objects.count(), 1)
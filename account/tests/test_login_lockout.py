@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from account.lockout import login_lockout
+
+User = get_user_model()
+
+LOCKOUT = {'ACCOUNT_THRESHOLD': 3, 'IP_THRESHOLD': 5, 'BASE_LOCKOUT': 30, 'MAX_LOCKOUT': 100}
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'login-lockout'}},
+    LOGIN_LOCKOUT=LOCKOUT,
+)
+class LoginLockoutTests(APITestCase):
+    """
+    An email is locked after ACCOUNT_THRESHOLD failures; locked attempts get 429 without hashing
+
+    Lockouts grow exponentially up to MAX_LOCKOUT, and a correct password resets the email's counter
+
+    Unknown emails are locked the same way as registered ones, with the same response
+
+    A client IP is locked after IP_THRESHOLD failures across emails
+
+    The token endpoint shares the counters
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.password = 'StrongPassword123'
+        User.objects.create_user(email='user@example.com', password=self.password)
+
+    def login(self, email='user@example.com', password='wrong-password', url='login'):
+        return self.client.post(reverse(url), {'email': email, 'password': password}, format='json')
+
+    def test_locked_attempts_skip_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with patch('account.hashing.hashing_pool.run') as run:
+            response = self.login(password=self.password)
+
+        run.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_exponential_backoff(self):
+        for _ in range(3):
+            self.login()
+
+        for seconds in (60, 100):
+            cache.delete(login_lockout.locked_prefix + 'account:' + login_lockout.account_key('user@example.com'))
+            self.login()
+            self.assertEqual(self.login()['Retry-After'], str(seconds))
+
+    def test_success_resets_counter(self):
+        for _ in range(2):
+            self.login()
+        self.assertEqual(self.login(password=self.password).status_code, status.HTTP_200_OK)
+
+        for _ in range(2):
+            self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unknown_email_is_locked_alike(self):
+        for email in ('user@example.com', 'nobody@example.com'):
+            for _ in range(3):
+                self.login(email=email)
+        known, unknown = self.login(), self.login(email='nobody@example.com')
+
+        self.assertEqual(known.status_code, unknown.status_code)
+        self.assertEqual(known.content, unknown.content)
+
+    def test_ip_lockout(self):
+        for n in range(5):
+            self.login(email=f'user{n}@example.com')
+
+        self.assertEqual(self.login(email='other@example.com').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(
+            self.login(password=self.password, url='token_obtain_pair').status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+
+    def test_token_endpoint(self):
+        for _ in range(3):
+            self.assertEqual(self.login(url='token_obtain_pair').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.assertEqual(self.login(password=self.password).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,64 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+from account import hashing
+from account.hashing import HashingUnavailable, PasswordHashingPool
+
+User = get_user_model()
+
+
+class PasswordHashingPoolTests(APITestCase):
+    """
+    Passwords set and checked through the User model are hashed on the pool
+
+    A saturated pool rejects new work immediately with a 503
+
+    The async API gives the same answers as the sync one
+    """
+
+    def setUp(self):
+        self.password = 'StrongPassword123'
+        self.user = User.objects.create_user(email='pool@example.com', password=self.password)
+
+    def test_user_password_round_trip(self):
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(self.user.check_password(self.password))
+        self.assertFalse(self.user.check_password('WrongPassword'))
+
+    def test_async_check_password(self):
+        self.assertTrue(asyncio.run(hashing.acheck_password(self.password, self.user.password)))
+        self.assertFalse(asyncio.run(hashing.acheck_password('WrongPassword', self.user.password)))
+
+    @override_settings(PASSWORD_HASHING_POOL={'MAX_WORKERS': 1, 'MAX_QUEUE': 0})
+    def test_saturated_pool_rejects_immediately(self):
+        pool = PasswordHashingPool()
+        try:
+            busy = pool.submit(time.sleep, 0.5)
+
+            started = time.perf_counter()
+            with self.assertRaises(HashingUnavailable):
+                pool.submit(time.sleep, 0)
+            self.assertLess(time.perf_counter() - started, 0.1)
+            self.assertEqual(pool.stats['rejected'], 1)
+
+            busy.result()
+            pool.submit(time.sleep, 0).result()
+        finally:
+            pool.shutdown()
+
+    def test_login_returns_503_when_saturated(self):
+        with patch.object(hashing.hashing_pool, 'submit', side_effect=HashingUnavailable):
+            response = self.client.post(reverse('login'), {
+                'email': 'pool@example.com',
+                'password': self.password,
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
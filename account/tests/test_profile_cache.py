@@ -0,0 +1,109 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from account.models import PendingEmailChange
+from account.profile_cache import profile_cache
+from account.utils import Util
+
+User = get_user_model()
+
+
+class ProfileCacheTests(APITestCase):
+    """
+    Repeated profile GETs are served from the cache without queries, with the same body
+
+    Profile updates, email change verification and password changes invalidate the cached body
+
+    Saves that do not touch profile fields (last_login) keep it; deleting the user drops it
+
+    A body rendered from an older row version is never stored or served
+    """
+
+    def setUp(self):
+        cache.clear()
+        profile_cache.stats.update(hits=0, misses=0, stores=0)
+        self.user = User.objects.create_user(
+            email='cached@example.com',
+            password='strongpassword123',
+            first_name='Cached',
+            last_name='User',
+            is_email_verified=True,
+        )
+        self.url = reverse('profile')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {Util.get_tokens_for_user(self.user)['access']}")
+
+    def get_profile(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_hit_ratio(self):
+        first = self.get_profile()
+        with self.assertNumQueries(0):
+            for _ in range(9):
+                response = self.get_profile()
+
+        self.assertEqual(response.content, first.content)
+        self.assertEqual(response['Content-Type'], first['Content-Type'])
+        self.assertEqual(profile_cache.stats, {'hits': 9, 'misses': 1, 'stores': 1})
+
+    def test_profile_update_invalidates(self):
+        self.get_profile()
+        self.client.patch(self.url, {'first_name': 'Jane'}, format='json')
+
+        self.assertEqual(json.loads(self.get_profile().content)['first_name'], 'Jane')
+
+    def test_email_change_invalidates(self):
+        self.get_profile()
+        pending = PendingEmailChange.create_for_user(user=self.user, new_email='new@example.com', expiration_hours=24)
+        self.client.get(reverse('verify-email-change', kwargs={'token': pending.token}))
+
+        self.assertEqual(json.loads(self.get_profile().content)['email'], 'new@example.com')
+
+    def test_password_change_invalidates(self):
+        self.get_profile()
+        version = cache.get(f'profile-version:{self.user.pk}')
+        response = self.client.post(reverse('change-password'), {
+            'old_password': 'strongpassword123',
+            'new_password': 'NewPassword456',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(cache.get(f'profile-version:{self.user.pk}'), version)
+
+    def test_unrelated_save_keeps_cache(self):
+        self.get_profile()
+        self.user.save(update_fields=['last_login'])
+
+        with self.assertNumQueries(0):
+            self.get_profile()
+
+    def test_delete_drops_cache(self):
+        self.get_profile()
+        self.user.delete()
+
+        self.assertIsNone(profile_cache.get(self.user.pk))
+
+    def test_stale_render_is_not_stored(self):
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.first_name = 'Fresh'
+        self.user.save()
+
+        # a read that loaded the row before the save finishes after it
+        profile_cache.set(stale, b'{"first_name": "Cached"}')
+
+        self.assertIsNone(profile_cache.get(self.user.pk))
+        self.assertEqual(json.loads(self.get_profile().content)['first_name'], 'Fresh')
+
+    @override_settings(PROFILE_CACHE={'ENABLED': False})
+    def test_disabled(self):
+        self.get_profile()
+        response = self.get_profile()
+
+        self.assertEqual(response.data['email'], self.user.email)
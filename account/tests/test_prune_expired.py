@@ -0,0 +1,125 @@
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from account.models import PendingEmailChange
+from account.pruning import prune, targets
+from account.user_import import UserImporter, create_job
+from utils.locks import advisory_lock
+
+User = get_user_model()
+
+
+class PruneExpiredTests(TestCase):
+    """
+    Expired tokens (with their blacklist rows) and expired email changes are deleted, live ones kept
+
+    Unverified users are deleted once old enough, unless staff or recently logged in; imported users are kept
+
+    Rows are deleted in chunks of CHUNK_SIZE
+
+    --dry-run only counts; a run is skipped while another node holds the lock
+    """
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.user = User.objects.create_user(email='verified@example.com', password='StrongPassword123',
+                                             is_email_verified=True)
+
+    def token(self, expires_in, blacklisted=False):
+        token = OutstandingToken.objects.create(
+            user=self.user, jti=uuid.uuid4().hex, token='x', expires_at=self.now + expires_in,
+        )
+        if blacklisted:
+            BlacklistedToken.objects.create(token=token)
+        return token
+
+    def unverified(self, email, age, **extra):
+        user = User.objects.create_user(email=email, password='StrongPassword123', **extra)
+        User.objects.filter(pk=user.pk).update(created_at=self.now - age)
+        return user
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('prune_expired', *args, '--sleep', '0', stdout=out)
+        return out.getvalue()
+
+    def test_expired_tokens_and_email_changes(self):
+        expired = self.token(timedelta(days=-1), blacklisted=True)
+        live = self.token(timedelta(days=1), blacklisted=True)
+        PendingEmailChange.objects.create(user=self.user, new_email='new@example.com', token='t' * 64,
+                                          expires_at=self.now - timedelta(minutes=1))
+
+        output = self.run_command()
+
+        self.assertIn('outstanding_tokens: deleted 2 rows', output)
+        self.assertFalse(OutstandingToken.objects.filter(pk=expired.pk).exists())
+        self.assertEqual(list(BlacklistedToken.objects.values_list('token', flat=True)), [live.pk])
+        self.assertFalse(PendingEmailChange.objects.exists())
+
+    def test_unverified_users(self):
+        abandoned = self.unverified('abandoned@example.com', timedelta(days=30))
+        self.unverified('recent@example.com', timedelta(days=1))
+        self.unverified('staff@example.com', timedelta(days=30), is_staff=True)
+        active = self.unverified('active@example.com', timedelta(days=30))
+        User.objects.filter(pk=active.pk).update(last_login=self.now - timedelta(days=1))
+        User.objects.filter(pk=self.user.pk).update(created_at=self.now - timedelta(days=30))
+
+        self.run_command('--only', 'unverified_users')
+
+        self.assertFalse(User.objects.filter(pk=abandoned.pk).exists())
+        self.assertEqual(User.objects.count(), 4)
+
+    def test_imported_users_are_kept(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        with override_settings(MEDIA_ROOT=media):
+            job = create_job(SimpleUploadedFile('users.csv', b'email\nimported@example.com\n'), 'users.csv')
+            UserImporter(job, workers=1).run()
+        User.objects.filter(email='imported@example.com').update(created_at=self.now - timedelta(days=30))
+
+        self.run_command('--only', 'unverified_users')
+
+        self.assertTrue(User.objects.filter(email='imported@example.com').exists())
+
+    def test_chunks(self):
+        for _ in range(5):
+            self.token(timedelta(days=-1))
+
+        chunks = list(prune('outstanding_tokens', targets()['outstanding_tokens'], chunk_size=2, sleep=0))
+
+        self.assertEqual([sum(chunk.values()) for chunk in chunks], [2, 2, 1])
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_dry_run(self):
+        for _ in range(3):
+            self.token(timedelta(days=-1))
+
+        output = self.run_command('--dry-run', '--chunk-size', '2')
+
+        self.assertIn('outstanding_tokens: 3 rows in 2 chunks', output)
+        self.assertEqual(OutstandingToken.objects.count(), 3)
+
+    def test_skipped_while_locked(self):
+        self.token(timedelta(days=-1))
+
+        with advisory_lock('prune_expired') as acquired:
+            self.assertTrue(acquired)
+            self.assertIn('skipped', self.run_command())
+
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.run_command()
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_unknown_target(self):
+        with self.assertRaises(CommandError):
+            self.run_command('--only', 'sessions')
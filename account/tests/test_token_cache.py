@@ -0,0 +1,89 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.backends import TokenBackend
+
+from account.token_cache import decoded_tokens
+from account.tokens import AccessToken
+from utils import metrics
+
+User = get_user_model()
+
+
+class DecodedTokenCacheTests(APITestCase):
+    """
+    A repeated access token is accepted without decoding it again
+
+    Entries end with the token's exp, a new signing key, or LRU eviction at MAX_ENTRIES
+
+    A tampered token never matches a cached one
+    """
+
+    def setUp(self):
+        decoded_tokens.clear()
+        self.user = User.objects.create_user(email='user@example.com', password='StrongPassword123')
+
+    def access(self, lifetime=None):
+        token = AccessToken.for_user(self.user)
+        if lifetime is not None:
+            token.set_exp(lifetime=lifetime)
+        return str(token)
+
+    def verify(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return self.client.get(reverse('token_verify')).status_code
+
+    def evictions(self, reason):
+        return metrics.token_cache_evictions.values.get((('reason', reason),), 0)
+
+    def test_repeated_token_is_not_decoded(self):
+        access = self.access()
+
+        with patch.object(TokenBackend, 'decode', autospec=True, side_effect=TokenBackend.decode) as decode:
+            for _ in range(3):
+                self.assertEqual(self.verify(access), status.HTTP_200_OK)
+
+        self.assertEqual(decode.call_count, 1)
+
+    def test_expired_token_is_evicted(self):
+        access = self.access(lifetime=timedelta(seconds=1))
+        evicted = self.evictions('expired')
+        self.assertEqual(self.verify(access), status.HTTP_200_OK)
+
+        time.sleep(1.1)
+
+        self.assertEqual(self.verify(access), status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.evictions('expired') - evicted, 1)
+        self.assertEqual(len(decoded_tokens), 0)
+
+    def test_new_signing_key_drops_entries(self):
+        access = self.access()
+        self.assertEqual(self.verify(access), status.HTTP_200_OK)
+
+        with override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, 'SIGNING_KEY': 'rotated'}):
+            self.assertEqual(self.verify(access), status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(ACCESS_TOKEN_CACHE={'MAX_ENTRIES': 2})
+    def test_lru_eviction(self):
+        first, second, third = self.access(), self.access(), self.access()
+        evicted = self.evictions('size')
+        for access in (first, second, first, third):
+            self.verify(access)
+
+        self.assertEqual(self.evictions('size') - evicted, 1)
+        self.assertIsNotNone(decoded_tokens.get(first, AccessToken().get_token_backend()))
+        self.assertIsNone(decoded_tokens.get(second, AccessToken().get_token_backend()))
+
+    def test_tampered_token(self):
+        access = self.access()
+        self.verify(access)
+        header, payload, signature = access.split('.')
+
+        self.assertEqual(self.verify(f'{header}.{payload}.{signature[:-4]}AAAA'), status.HTTP_401_UNAUTHORIZED)
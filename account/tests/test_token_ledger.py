@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from account.revocation import RevocationIndex, revocation_index
+from account.token_ledger import token_ledger
+from account.tokens import RefreshToken
+from account.utils import Util
+
+User = get_user_model()
+
+
+class TokenLedgerTests(APITestCase):
+    """
+    Outstanding rows from logins are queued and written in one batch
+
+    A rotated refresh token is blacklisted at once, for this worker and others, even while its outstanding row is queued
+
+    Rows are flushed after the response once FLUSH_INTERVAL has passed, and queued again if the write fails
+
+    With the ledger disabled rows are written inline
+    """
+
+    def setUp(self):
+        token_ledger.reset()
+        revocation_index.reset()
+        self.user = User.objects.create_user(email='ledger@example.com', password='strongpassword123')
+
+    def refresh(self, token):
+        return self.client.post(reverse('token_refresh'), {'refresh': token}, format='json')
+
+    def test_logins_are_batched(self):
+        for _ in range(3):
+            Util.get_tokens_for_user(self.user)
+        self.assertFalse(OutstandingToken.objects.exists())
+
+        with self.assertNumQueries(2):      # user check, one INSERT
+            self.assertEqual(token_ledger.flush(), 3)
+
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 3)
+
+    def test_rotation_blacklists_at_once(self):
+        tokens = Util.get_tokens_for_user(self.user)
+        other_worker = RevocationIndex()
+        other_worker.rebuild()
+
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, status.HTTP_200_OK)
+
+        jti = RefreshToken(tokens['refresh'], verify=False)['jti']
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=jti).exists())
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(other_worker.is_revoked(jti))
+
+        # the queued row of the rotated token is already in the table; only the new token's is added
+        token_ledger.flush()
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 2)
+
+    @override_settings(TOKEN_LEDGER={'FLUSH_INTERVAL': 0})
+    def test_flushed_after_response(self):
+        tokens = Util.get_tokens_for_user(self.user)
+
+        self.refresh(tokens['refresh'])
+
+        self.assertEqual(len(token_ledger), 0)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 2)
+
+    def test_failed_write_is_queued_again(self):
+        Util.get_tokens_for_user(self.user)
+
+        with patch.object(OutstandingToken.objects, 'bulk_create', side_effect=RuntimeError('db down')):
+            self.assertEqual(token_ledger.flush(), 0)
+        self.assertEqual(len(token_ledger), 1)
+
+        self.assertEqual(token_ledger.flush(), 1)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(TOKEN_LEDGER={'ENABLED': False})
+    def test_disabled_writes_inline(self):
+        Util.get_tokens_for_user(self.user)
+
+        self.assertEqual(len(token_ledger), 0)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 1)
@@ -0,0 +1,93 @@
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+
+from account.revocation import RevocationIndex, revocation_index
+from account.tokens import RefreshToken
+from account.utils import Util
+from utils.bloom import BloomFilter
+
+User = get_user_model()
+
+SHARED_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='revocation-cache-'),
+    }
+}
+
+
+class BloomFilterTests(APITestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        items = [f'jti-{i}' for i in range(1000)]
+        bloom.update(items)
+
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f'other-{i}' in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+
+@override_settings(CACHES=SHARED_CACHE, TOKEN_REVOCATION_FILTER={'TRUST_CACHE': True})
+class RevocationIndexTests(APITestCase):
+    """
+    A refresh token that was never blacklisted is checked without a query
+
+    Blacklisting through logout is seen by this worker and by other workers
+
+    A process-local or host-local cache is not trusted unless TRUST_CACHE is set, and falls back to the database
+    """
+
+    def setUp(self):
+        revocation_index.reset()
+        revocation_index.cache.clear()
+        self.user = User.objects.create_user(
+            email='revoke@example.com',
+            password='strongpassword123',
+            is_email_verified=True,
+        )
+        self.tokens = Util.get_tokens_for_user(self.user)
+
+    def test_unrevoked_token_skips_database(self):
+        revocation_index.rebuild()
+        with self.assertNumQueries(0):
+            RefreshToken(self.tokens['refresh'])
+
+    def test_logout_revokes_token(self):
+        revocation_index.rebuild()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        response = self.client.post(reverse('logout'), {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+
+        with self.assertRaises(TokenError):
+            RefreshToken(self.tokens['refresh'])
+
+    def test_revocation_seen_by_other_worker(self):
+        other_worker = RevocationIndex()
+        other_worker.rebuild()
+
+        RefreshToken(self.tokens['refresh']).blacklist()
+
+        jti = RefreshToken(self.tokens['refresh'], verify=False)['jti']
+        self.assertTrue(other_worker.is_revoked(jti))
+        self.assertEqual(other_worker.stats['marker_hits'], 1)
+
+    def test_rotated_refresh_token_is_rejected(self):
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, TOKEN_REVOCATION_FILTER={})
+    def test_local_cache_falls_back_to_database(self):
+        self.assertFalse(revocation_index.is_trusted())
+        with override_settings(CACHES=SHARED_CACHE):
+            self.assertFalse(revocation_index.is_trusted())     # a file cache is local to its host
+        with self.assertNumQueries(1):
+            RefreshToken(self.tokens['refresh'])
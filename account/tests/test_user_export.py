@@ -0,0 +1,108 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from account.enums import Roles
+from account import export
+from account.export import EXPORT_FIELDS, astream_users, stream_users
+from account.serializers.superadmin import UserSerializer
+from account.tokens import AccessToken
+
+User = get_user_model()
+
+
+class UserExportTests(APITestCase):
+    """
+    Superadmins can stream all users as NDJSON or CSV; under ASGI the body is an async iterator read chunk by chunk
+
+    Exported rows match what UserSerializer returns
+
+    Other users cannot export
+
+    The export_users command writes the same data to a file
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email='admin@example.com', password=None, role=Roles.SUPERADMIN)
+        for n in range(5):
+            User.objects.create_user(email=f'user{n}@example.com', password=None, first_name=f'Zoë {n}')
+
+    def export(self, export_format):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('user-export', kwargs={'export_format': export_format}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_matches_serializer(self):
+        body = self.export('ndjson')
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        expected = [dict(UserSerializer(user).data) for user in User.objects.order_by('id')]
+        self.assertEqual(rows, expected)
+
+    def test_csv(self):
+        body = self.export('csv')
+
+        rows = list(csv.reader(body.splitlines()))
+        self.assertEqual(rows[0], EXPORT_FIELDS)
+        self.assertEqual([row[1] for row in rows[1:]], list(User.objects.order_by('id').values_list('email', flat=True)))
+        self.assertEqual(rows[2][2], 'Zoë 0')
+
+    def test_small_chunks(self):
+        chunks = list(stream_users('ndjson', chunk_size=2))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(chunk.count(b'\n') for chunk in chunks), User.objects.count())
+
+    async def test_asgi_streams_async(self):
+        response = await self.async_client.get(
+            reverse('user-export', kwargs={'export_format': 'csv'}),
+            headers={'Authorization': f'Bearer {AccessToken.for_user(self.admin)}'},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8')
+        self.assertEqual(len(body.splitlines()), await User.objects.acount() + 1)
+
+    async def test_async_stream_is_incremental(self):
+        read = []
+
+        def counted_rows(*args):
+            for row in export_rows(*args):
+                read.append(row)
+                yield row
+
+        export_rows = export.export_rows
+        with patch.object(export, 'export_rows', counted_rows):
+            chunks = astream_users('ndjson', chunk_size=2)
+            first = await anext(chunks)
+            self.assertEqual((first.count(b'\n'), len(read)), (2, 2))
+            rest = [chunk async for chunk in chunks]
+
+        self.assertEqual([chunk.count(b'\n') for chunk in rest], [2, 2])
+        self.assertEqual(len(read), 6)
+
+    def test_requires_superadmin(self):
+        self.client.force_authenticate(user=User.objects.get(email='user0@example.com'))
+        response = self.client.get(reverse('user-export', kwargs={'export_format': 'csv'}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'users.csv')
+            call_command('export_users', format='csv', output=path, stderr=StringIO())
+            with open(path, encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+
+        self.assertEqual(len(rows), User.objects.count() + 1)
@@ -0,0 +1,149 @@
+import csv
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from account.enums import ImportStatus, Roles
+from account.user_import import UserImporter, create_job
+
+User = get_user_model()
+
+
+def csv_bytes(rows, header=('email', 'first_name', 'last_name', 'role', 'password')):
+    out = StringIO()
+    writer = csv.writer(out)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return out.getvalue().encode('utf-8')
+
+
+class UserImportTests(APITestCase):
+    """
+    Valid rows are created in chunks; invalid, duplicate and existing emails are reported per row
+
+    Passwords are hashed; blank passwords give an unusable password
+
+    An interrupted import resumes after its last committed chunk
+
+    Superadmins queue imports through the API and the command runs them
+    """
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        User.objects.create_user(email='taken@example.com', password=None)
+
+    def job(self, rows, **kwargs):
+        return create_job(SimpleUploadedFile('users.csv', csv_bytes(rows, **kwargs)), 'users.csv')
+
+    def test_import_with_row_errors(self):
+        job = self.job([
+            ['a@example.com', 'Ann', 'A', 'teacher', 'Sup3r-Secret-Pw'],
+            ['b@EXAMPLE.com', 'Bob', 'B', '', ''],
+            ['not-an-email', 'Bad', 'Row', '', ''],
+            ['c@example.com', '', '', 'superadmin', ''],
+            ['a@example.com', 'Dup', '', '', ''],
+            ['taken@example.com', '', '', '', ''],
+            ['d@example.com', '', '', '', 'short'],
+        ])
+        UserImporter(job, chunk_size=3, workers=1).run()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportStatus.DONE)
+        self.assertEqual((job.processed_rows, job.created_count, job.failed_count), (7, 2, 5))
+        self.assertEqual(
+            [(error.row, list(error.errors)) for error in job.row_errors.all()],
+            [(3, ['email']), (4, ['role']), (5, ['email']), (6, ['email']), (7, ['password'])],
+        )
+
+        teacher = User.objects.get(email='a@example.com')
+        self.assertEqual(teacher.role, Roles.TEACHER)
+        self.assertTrue(teacher.check_password('Sup3r-Secret-Pw'))
+        self.assertTrue(teacher.is_email_verified)
+        student = User.objects.get(email='b@example.com')
+        self.assertEqual(student.role, Roles.STUDENT)
+        self.assertFalse(student.has_usable_password())
+
+    def test_resume_after_failure(self):
+        job = self.job([[f'user{n}@example.com', '', '', '', ''] for n in range(5)])
+        importer = UserImporter(job, chunk_size=2, workers=1)
+        original = importer.import_chunk
+        calls = []
+
+        def fail_on_second_chunk(executor, chunk):
+            calls.append(chunk)
+            if len(calls) == 2:
+                raise RuntimeError('worker killed')
+            original(executor, chunk)
+
+        with patch.object(importer, 'import_chunk', side_effect=fail_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                importer.run()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_rows, job.created_count), (ImportStatus.FAILED, 2, 2))
+
+        UserImporter(job, chunk_size=2, workers=1).run()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_rows, job.created_count, job.failed_count), (ImportStatus.DONE, 5, 5, 0))
+
+    def test_missing_email_column(self):
+        job = self.job([['Ann']], header=('first_name',))
+        with self.assertRaises(ValueError):
+            UserImporter(job, workers=1).run()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportStatus.FAILED)
+
+    def test_command_with_report(self):
+        path = os.path.join(self.media, 'students.csv')
+        report = os.path.join(self.media, 'errors.csv')
+        with open(path, 'wb') as f:
+            f.write(csv_bytes([['e@example.com', '', '', '', ''], ['bad', '', '', '', '']]))
+
+        call_command('import_users', path, '--workers', '1', '--report', report, stdout=StringIO())
+
+        self.assertTrue(User.objects.filter(email='e@example.com').exists())
+        with open(report, encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual([row[:2] for row in rows], [['row', 'email'], ['2', 'bad']])
+
+        with self.assertRaises(CommandError):
+            call_command('import_users', stdout=StringIO())
+
+    def test_api_queues_and_command_runs_pending(self):
+        admin = User.objects.create_user(email='admin@example.com', password=None, role=Roles.SUPERADMIN)
+        self.client.force_authenticate(user=admin)
+        upload = SimpleUploadedFile('school.csv', csv_bytes([['f@example.com', '', '', '', ''], ['bad', '', '', '', '']]))
+
+        response = self.client.post(reverse('user-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], ImportStatus.PENDING)
+        job_id = response.data['id']
+
+        call_command('import_users', '--pending', '--workers', '1', stdout=StringIO())
+
+        response = self.client.get(reverse('user-import-detail', kwargs={'job_id': job_id}))
+        self.assertEqual(response.data['status'], ImportStatus.DONE)
+        self.assertEqual(response.data['created_count'], 1)
+        self.assertEqual(response.data['row_errors'][0]['row'], 2)
+
+        response = self.client.get(reverse('user-import-errors', kwargs={'job_id': job_id}))
+        self.assertIn(b'2,bad,', b''.join(response.streaming_content))
+
+    def test_api_requires_superadmin(self):
+        self.client.force_authenticate(user=User.objects.get(email='taken@example.com'))
+        response = self.client.post(reverse('user-import'), {}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
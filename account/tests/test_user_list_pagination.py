@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from utils.pagination import KeysetPagination
+
+User = get_user_model()
+
+
+@override_settings(CURSOR_PAGINATION={'PAGE_SIZE': 3, 'MAX_PAGE_SIZE': 5})
+class UserListPaginationTests(APITestCase):
+    """
+    The user list is paginated newest first, with a cursor instead of page numbers
+
+    Users sharing a created_at are neither skipped nor repeated across pages
+
+    Clients may ask for a page size up to MAX_PAGE_SIZE
+
+    No COUNT(*) is run, the next page is a range scan of user_created_id_idx, and invalid cursors are rejected
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for n in range(8):
+            User.objects.create_user(email=f'user{n}@example.com', password=None)
+        # pairs of users with identical timestamps, newest pair first
+        for n, user in enumerate(User.objects.order_by('id')):
+            User.objects.filter(pk=user.pk).update(created_at=now - timedelta(minutes=n // 2))
+        cls.expected = list(User.objects.order_by('-created_at', '-id').values_list('email', flat=True))
+
+    def walk(self, url):
+        emails, previous = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            emails.extend(user['email'] for user in response.data['results'])
+            previous.append(response.data['previous'])
+            url = response.data['next']
+        return emails, previous
+
+    def test_walks_every_user_once_in_order(self):
+        emails, previous = self.walk(reverse('user-list'))
+
+        self.assertEqual(emails, self.expected)
+        self.assertIsNone(previous[0])
+        self.assertTrue(all(previous[1:]))
+
+    def test_previous_link_returns_the_earlier_page(self):
+        first = self.client.get(reverse('user-list')).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+
+        self.assertEqual([u['email'] for u in back['results']], self.expected[:3])
+        self.assertEqual([u['email'] for u in second['results']], self.expected[3:6])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('user-list'), {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get(reverse('user-list'), {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_no_count_query(self):
+        first = self.client.get(reverse('user-list')).data
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first['next'])
+
+        sql = ' '.join(query['sql'] for query in queries.captured_queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_next_page_uses_index_range(self):
+        paginator = KeysetPagination()
+        user = User.objects.order_by('-created_at', '-id')[2]
+        position = paginator._get_position_from_instance(user, paginator.ordering)
+
+        plan = paginator.filter_after(User.objects.order_by(*paginator.ordering), position, False)[:4].explain()
+
+        self.assertIn('SEARCH account_user USING INDEX user_created_id_idx (created_at<?)', plan)
+        self.assertNotIn('TEMP B-TREE', plan)     # rows come in index order, no sort
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('user-list'), {'cursor': 'cD1ub3QtYS1kYXRl'})  # p=not-a-date
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,89 @@
+"""
+Per-worker LRU of verified access token payloads.
+
+A page load sends the same access token to several endpoints. The first
+request decodes it and checks its signature as usual; the payload is then
+kept, keyed by a digest of the raw token, until the token's ``exp``. Later
+requests with the same token skip the signature check, but still run
+``AccessToken.verify()`` - expiry, token type and any revocation check added
+there apply to every request.
+
+Entries remember the backend that verified them, so a key rotation or a new
+SIGNING_KEY drops them. Evictions are counted in token_cache_evictions by
+reason (size, expired, rotated).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from utils import metrics
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 10000,
+}
+
+
+def token_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'ACCESS_TOKEN_CACHE', {})}
+
+
+class DecodedTokenCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # digest -> (exp, backend, payload)
+
+    @property
+    def config(self):
+        return token_cache_settings()
+
+    @staticmethod
+    def key(raw):
+        if isinstance(raw, str):
+            raw = raw.encode()
+        return hashlib.sha256(raw).digest()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, raw, backend):
+        """A copy of the payload verified for ``raw`` by ``backend``, or ``None``."""
+        if not self.config['ENABLED']:
+            return None
+        key = self.key(raw)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                metrics.token_cache_misses.inc()
+                return None
+            exp, verified_by, payload = entry
+            if exp <= time.time() or verified_by is not backend:
+                del self._entries[key]
+                metrics.token_cache_evictions.inc(reason='expired' if verified_by is backend else 'rotated')
+                metrics.token_cache_misses.inc()
+                return None
+            self._entries.move_to_end(key)
+        metrics.token_cache_hits.inc()
+        return dict(payload)
+
+    def set(self, raw, backend, payload):
+        config = self.config
+        if not config['ENABLED']:
+            return
+        with self._lock:
+            self._entries[self.key(raw)] = (payload['exp'], backend, dict(payload))
+            while len(self._entries) > config['MAX_ENTRIES']:
+                self._entries.popitem(last=False)
+                metrics.token_cache_evictions.inc(reason='size')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+decoded_tokens = DecodedTokenCache()
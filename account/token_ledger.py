@@ -0,0 +1,156 @@
+"""
+Write-behind batching of ``OutstandingToken`` rows.
+
+Every login inserts an outstanding row for the new refresh token, and every
+refresh rotation inserts one for the rotated token. ``account.tokens.RefreshToken``
+hands these rows to the per-worker ledger instead, which writes them with
+``bulk_create`` once FLUSH_SIZE rows are waiting or FLUSH_INTERVAL seconds
+have passed: after a response that queued rows, and from a background
+FlushTimer (utils/background.py) so a quiet worker does not sit on them.
+Rows a failed write could not store are queued again, and the buffer is
+drained when the worker exits.
+
+Blacklisting is not deferred: ``RefreshToken.blacklist()`` writes the
+``BlacklistedToken`` row at once (creating the outstanding row if it is
+still queued), so a revoked token is refused by every worker as soon as
+that commits. A row still in the ledger only matters to listings of a
+user's outstanding tokens, which may lag by up to FLUSH_INTERVAL.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from utils import metrics
+from utils.background import FlushTimer
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'FLUSH_SIZE': 200,
+    'FLUSH_INTERVAL': 1,    # seconds
+}
+
+
+# set when a request queues rows; only those requests take part in flushing
+_queued = ContextVar('token_ledger_queued', default=False)
+
+
+def token_ledger_settings():
+    return {**DEFAULTS, **getattr(settings, 'TOKEN_LEDGER', {})}
+
+
+class TokenLedger:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._outstanding = {}      # jti -> OutstandingToken fields
+        self._flushed_at = time.monotonic()
+        self.timer = FlushTimer('token-ledger', self.flush, lambda: self.config['FLUSH_INTERVAL'])
+
+    @property
+    def config(self):
+        return token_ledger_settings()
+
+    @property
+    def enabled(self):
+        return self.config['ENABLED']
+
+    def __len__(self):
+        return len(self._outstanding)
+
+    def reset(self):
+        with self._lock:
+            self._outstanding = {}
+            self._flushed_at = time.monotonic()
+
+    def outstand(self, token, user_id=None):
+        """Queue the outstanding row for ``token``."""
+        jti = token[api_settings.JTI_CLAIM]
+        if user_id is None:
+            user_id = token.get(api_settings.USER_ID_CLAIM)
+        row = {
+            'jti': jti,
+            'user_id': user_id,
+            'token': str(token),
+            'created_at': token.current_time,
+            'expires_at': datetime_from_epoch(token['exp']),
+        }
+        with self._lock:
+            self._outstanding.setdefault(jti, row)
+        _queued.set(True)
+        metrics.token_ledger_rows.inc(table='outstanding')
+        self.timer.ensure_running()
+
+    def is_due(self):
+        config = self.config
+        return len(self) >= config['FLUSH_SIZE'] or (
+            len(self) and time.monotonic() - self._flushed_at >= config['FLUSH_INTERVAL']
+        )
+
+    def flush(self):
+        """Write every queued row. Returns the number of rows written."""
+        if not self._flush_lock.acquire(blocking=False):
+            return 0    # another thread is flushing
+        try:
+            with self._lock:
+                outstanding, self._outstanding = self._outstanding, {}
+                self._flushed_at = time.monotonic()
+            if not outstanding:
+                return 0
+
+            try:
+                self._write(outstanding)
+            except Exception:
+                logger.exception(f"Failed to write {len(outstanding)} outstanding tokens; queued again")
+                metrics.token_ledger_failures.inc(len(outstanding))
+                with self._lock:
+                    # rows queued since keep their place
+                    self._outstanding = {**outstanding, **self._outstanding}
+                return 0
+            return len(outstanding)
+        finally:
+            self._flush_lock.release()
+
+    def _write(self, outstanding):
+        # a user may have deleted their account since the token was issued;
+        # user ids taken from token claims are strings
+        user_ids = {row['user_id'] for row in outstanding.values()} - {None}
+        users = {
+            str(pk): pk for pk in get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True)
+        } if user_ids else {}
+
+        # rows a blacklist() has already created are skipped
+        OutstandingToken.objects.bulk_create(
+            [
+                OutstandingToken(**{**row, 'user_id': users.get(str(row['user_id']))})
+                for row in outstanding.values()
+            ],
+            ignore_conflicts=True,
+        )
+
+    def begin_request(self):
+        """Forget work queued outside a request; only the request's own counts towards flushing."""
+        _queued.set(False)
+
+    def flush_if_due(self):
+        """Flush if the current request queued rows and a batch is due."""
+        if not _queued.get():
+            return False
+        _queued.set(False)
+        if not self.is_due():
+            return False
+        self.flush()
+        return True
+
+
+token_ledger = TokenLedger()
@@ -0,0 +1,74 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken as BaseAccessToken
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from account.jwt_keys import token_backend
+from account.revocation import revocation_index
+from account.token_cache import decoded_tokens
+from account.token_ledger import token_ledger
+
+
+class AccessToken(BaseAccessToken):
+    """
+    Access token signed and verified with the keys in ``account.jwt_keys``.
+    A token seen before by this worker takes its payload from
+    ``account.token_cache`` instead of checking the signature again;
+    ``verify()`` runs either way.
+    """
+
+    def __init__(self, token=None, verify=True):
+        if token is None or not verify:
+            super().__init__(token, verify)
+            return
+
+        backend = self.get_token_backend()
+        payload = decoded_tokens.get(token, backend)
+        if payload is None:
+            super().__init__(token, verify)
+            decoded_tokens.set(token, backend, self.payload)
+            return
+
+        self.token = token
+        self.current_time = aware_utcnow()
+        self.payload = payload
+        self.verify()
+
+    def get_token_backend(self):
+        return token_backend()
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh token whose blacklist check goes through the per-worker
+    revocation index and only queries the database on a possible hit.
+    Outstanding rows are queued in ``account.token_ledger`` instead of being
+    inserted one by one; ``blacklist()`` still writes at once.
+    """
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        if not token_ledger.enabled:
+            return super().for_user(user)
+        # skip BlacklistMixin.for_user, which inserts the outstanding row
+        token = super(BlacklistMixin, cls).for_user(user)
+        token_ledger.outstand(token, user.pk)
+        return token
+
+    def outstand(self):
+        if not token_ledger.enabled:
+            return super().outstand()
+        token_ledger.outstand(self)
+
+    def get_token_backend(self):
+        return token_backend()
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+
+        if revocation_index.is_revoked(jti):
+            raise TokenError(_("Token is blacklisted"))
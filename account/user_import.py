@@ -0,0 +1,189 @@
+"""
+Bulk user import from CSV.
+
+Rows are read and validated one chunk at a time, passwords of a chunk are
+hashed in parallel on every core (account.hashing.bulk_hashing_executor) and
+the chunk is written with one ``bulk_create``, in the same transaction as
+its rejected rows and the job's progress. A job that dies half-way resumes
+after its last committed chunk.
+
+Columns: ``email`` (required), ``first_name``, ``last_name``, ``role``
+(student or teacher, default student) and ``password`` (blank for an
+unusable password, e.g. when users are sent a password reset link).
+
+The addresses come from a superadmin, so imported users are created with
+their email verified: they get no activation mail, can use the password
+reset link, and are never pruned as abandoned registrations
+(account/pruning.py).
+"""
+import csv
+import io
+import logging
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from account.email_index import email_index
+from account.enums import ImportStatus
+from account.export import Echo
+from account.hashing import bulk_hashing_executor, make_passwords
+from account.models import UserImport, UserImportError
+from account.serializers.superadmin import UserImportRowSerializer
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+DEFAULTS = {
+    'CHUNK_SIZE': 1000,     # rows validated, hashed and inserted together
+    'WORKERS': None,        # hashing processes, default one per core
+}
+
+COLUMNS = ['email', 'first_name', 'last_name', 'role', 'password']
+
+
+def import_settings():
+    return {**DEFAULTS, **getattr(settings, 'USER_IMPORT', {})}
+
+
+def create_job(fileobj, name, created_by=None):
+    """Store the uploaded or local CSV file and queue an import for it."""
+    job = UserImport(created_by=created_by)
+    job.file.save(name, File(fileobj), save=True)
+    return job
+
+
+def claim_pending():
+    """Jobs queued through the API, each marked RUNNING by exactly one caller."""
+    for job in UserImport.objects.filter(status=ImportStatus.PENDING).order_by('id'):
+        if UserImport.objects.filter(pk=job.pk, status=ImportStatus.PENDING).update(status=ImportStatus.RUNNING):
+            yield job
+
+
+def error_report(job):
+    """Yield the rejected rows of ``job`` as CSV lines."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(['row', 'email', 'errors'])
+    for error in job.row_errors.iterator():
+        yield writer.writerow([error.row, error.email, '; '.join(
+            f"{field}: {' '.join(messages)}" for field, messages in error.errors.items()
+        )])
+
+
+class UserImporter:
+
+    def __init__(self, job, chunk_size=None, workers=None):
+        config = import_settings()
+        self.job = job
+        self.chunk_size = chunk_size or config['CHUNK_SIZE']
+        self.workers = workers or config['WORKERS']
+        self.seen = set()    # emails accepted earlier in this run
+
+    def read_rows(self):
+        """Yield ``(row_number, row)`` for the rows not imported yet."""
+        with self.job.file.open('rb') as raw:
+            reader = csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8-sig', newline=''), restval='')
+            if 'email' not in (reader.fieldnames or []):
+                raise ValueError("CSV header must contain an 'email' column")
+            rows = enumerate(reader, start=1)
+            yield from islice(rows, self.job.processed_rows, None)
+
+    def run(self):
+        job = self.job
+        job.status = ImportStatus.RUNNING
+        job.save(update_fields=['status'])
+
+        try:
+            rows = self.read_rows()
+            with bulk_hashing_executor(self.workers) as executor:
+                while chunk := list(islice(rows, self.chunk_size)):
+                    self.import_chunk(executor, chunk)
+        except Exception as e:
+            logger.exception(f"User import {job.pk} failed after {job.processed_rows} rows")
+            job.status, job.last_error = ImportStatus.FAILED, str(e)
+            job.save(update_fields=['status', 'last_error'])
+            raise
+
+        job.status, job.finished_at, job.last_error = ImportStatus.DONE, timezone.now(), ''
+        job.save(update_fields=['status', 'finished_at', 'last_error'])
+        logger.info(f"User import {job.pk} done: {job.created_count} created, {job.failed_count} rejected")
+        return job
+
+    def error(self, row_number, row, errors):
+        return UserImportError(
+            job=self.job,
+            row=row_number,
+            email=(row.get('email') or '')[:255],
+            errors={field: [str(message) for message in messages] for field, messages in errors.items()},
+        )
+
+    def validate(self, chunk):
+        valid, errors = [], []
+        for row_number, row in chunk:
+            # blank cells fall back to the serializer defaults
+            serializer = UserImportRowSerializer(data={column: row[column] for column in COLUMNS if row.get(column)})
+            if not serializer.is_valid():
+                errors.append(self.error(row_number, row, serializer.errors))
+                continue
+            data = serializer.validated_data
+            if data['email'] in self.seen:
+                errors.append(self.error(row_number, row, {'email': ["Duplicate email in this file."]}))
+                continue
+            self.seen.add(data['email'])
+            valid.append((row_number, row, data))
+        return valid, errors
+
+    def reject_existing(self, valid, errors):
+        existing = {
+            email.lower() for email in
+            User.objects.filter(email__lower__in=[data['email'] for _, _, data in valid]).values_list('email', flat=True)
+        }
+        if not existing:
+            return valid
+        message = User._meta.get_field('email').error_messages['unique']
+        for row_number, row, data in valid:
+            if data['email'] in existing:
+                errors.append(self.error(row_number, row, {'email': [message]}))
+        return [entry for entry in valid if entry[2]['email'] not in existing]
+
+    def import_chunk(self, executor, chunk):
+        valid, errors = self.validate(chunk)
+        valid = self.reject_existing(valid, errors)
+        passwords = make_passwords(executor, [data['password'] or None for _, _, data in valid])
+
+        users = [
+            User(
+                email=data['email'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                role=data['role'],
+                password=password,
+                is_email_verified=True,
+            )
+            for (_, _, data), password in zip(valid, passwords)
+        ]
+
+        try:
+            self.save_chunk(chunk, users, errors)
+        except IntegrityError:
+            # someone registered one of these emails since reject_existing()
+            kept = {data['email'] for _, _, data in self.reject_existing(valid, errors)}
+            users = [user for user in users if user.email in kept]
+            self.save_chunk(chunk, users, errors)
+
+    def save_chunk(self, chunk, users, errors):
+        job = self.job
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            UserImportError.objects.bulk_create(sorted(errors, key=lambda error: error.row))
+            job.processed_rows = chunk[-1][0]
+            job.created_count += len(users)
+            job.failed_count += len(errors)
+            job.save(update_fields=['processed_rows', 'created_count', 'failed_count'])
+        # bulk_create sends no post_save
+        email_index.add(*[user.email for user in users])
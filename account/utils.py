@@ -1,3 +1,4 @@
+import logging
 from email.utils import formataddr
 from typing import Dict, Optional
 from django.contrib.auth import authenticate
@@ -6,14 +7,18 @@ import os
 
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from account import outbox
 from account.enums import AuthProvider
 from account.models import User
+from account.serializers.auth.token import CustomTokenObtainPairSerializer
+from utils.mail import email_pool
 
 from urllib.parse import urlparse
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
 
 
 class Util:
@@ -21,8 +26,13 @@ class Util:
     @staticmethod
     def send_email(data: Dict[str, str])-> bool:
         """
-        Send an email with the provided data.
-        
+        Queue an email in the outbox (see account/outbox.py), or deliver it
+        right away when EMAIL_OUTBOX['ENABLED'] is off.
+
+        The outbox row is written in the caller's transaction, so the email
+        is only dispatched if the surrounding work commits. If it cannot be
+        queued there, the error is raised so that work rolls back too.
+
         Args:
             data: Dictionary containing email parameters with keys:
                 - subject: Email subject
@@ -33,49 +43,80 @@ class Util:
                 - cc: Optional CC addresses
                 - bcc: Optional BCC addresses
                 - html_body: Optional HTML content
-        
+
         Returns:
-            bool: True if email was sent successfully, False otherwise
+            bool: True if email was queued (or sent) successfully, False otherwise
         """
+        if not outbox.outbox_settings()['ENABLED']:
+            return Util.deliver_email(data)
+
         try:
-            # Validate required fields
-            if not all(key in data for key in ['subject', 'body', 'to_email']):
-                raise ValueError("Missing required email fields")
-            
+            # a savepoint, so a failed INSERT leaves the caller's transaction usable
+            with transaction.atomic():
+                outbox.enqueue(data)
+            return True
+        except Exception as e:
+            if transaction.get_connection().in_atomic_block:
+                raise
+            logger.error(f"Failed to queue email: {str(e)}")
+            return False
 
-            # Prepare email parameters
-            to_emails = [data['to_email']] if isinstance(data['to_email'], str) else data['to_email']
-            from_email = data.get('from_email') or os.environ.get('EMAIL_FROM') or settings.DEFAULT_FROM_EMAIL
-            reply_to = data.get('reply_to')
-            cc = data.get('cc', [])
-            bcc = data.get('bcc', [])
-            html_body = data.get('html_body')
-
-            # Create email message
-            email = EmailMessage(
-                subject=data['subject'],
-                body=data['body'],
-                from_email=formataddr(('', from_email)),  # Proper email formatting
-                to=to_emails,
-                cc=cc,
-                bcc=bcc,
-                reply_to=[reply_to] if reply_to else None
-            )
-
-             # Add HTML alternative if provided
-            if html_body:
-                email.content_subtype = "html"
-                email.alternatives = [(html_body, 'text/html')]
-
-            # Send email
-            sent_count = email.send(fail_silently=False)
-            return sent_count > 0
+    @staticmethod
+    def build_email(data: Dict[str, str], connection=None) -> EmailMessage:
+        """
+        Build an EmailMessage from the ``data`` dict accepted by send_email.
 
-            
+        Raises:
+            ValueError: if a required field is missing
+        """
+        # Validate required fields
+        if not all(key in data for key in ['subject', 'body', 'to_email']):
+            raise ValueError("Missing required email fields")
+
+        # Prepare email parameters
+        to_emails = [data['to_email']] if isinstance(data['to_email'], str) else data['to_email']
+        from_email = data.get('from_email') or os.environ.get('EMAIL_FROM') or settings.DEFAULT_FROM_EMAIL
+        reply_to = data.get('reply_to')
+        cc = data.get('cc') or []
+        bcc = data.get('bcc') or []
+        html_body = data.get('html_body')
+
+        # Create email message
+        email = EmailMessage(
+            subject=data['subject'],
+            body=data['body'],
+            from_email=formataddr(('', from_email)),  # Proper email formatting
+            to=to_emails,
+            cc=cc,
+            bcc=bcc,
+            reply_to=[reply_to] if reply_to else None,
+            connection=connection,
+        )
+
+        # Add HTML alternative if provided
+        if html_body:
+            email.content_subtype = "html"
+            email.alternatives = [(html_body, 'text/html')]
+
+        return email
+
+    @staticmethod
+    def deliver_email(data: Dict[str, str]) -> bool:
+        """
+        Send an email synchronously over a pooled connection, bypassing the
+        outbox.
+
+        Returns:
+            bool: True if email was sent successfully, False otherwise
+        """
+        try:
+            error, = email_pool.send_messages([Util.build_email(data)])
+            if error is not None:
+                raise error
+            return True
 
         except Exception as e:
-            # Log the error (consider using logging framework in production)
-            print(f"Failed to send email: {str(e)}")
+            logger.error(f"Failed to send email: {str(e)}")
             return False
 
     @classmethod
@@ -117,7 +158,7 @@ class Util:
 
     @staticmethod
     def get_tokens_for_user(user):
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
 
         return {
             'refresh': str(refresh),
@@ -135,15 +176,7 @@ class Util:
             print('Email or Password is not Valid')
             return Response({'errors': {'non_field_errors': ['Email or Password is not Valid']}},
                             status=status.HTTP_401_UNAUTHORIZED)
-        
-    @staticmethod
-    def get_tokens_for_user(user):
-        refresh = RefreshToken.for_user(user)
 
-        return {
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-        } 
 
     @staticmethod
     def _validate_frontend_url(url):
@@ -170,7 +203,9 @@ class Util:
         Returns:
             bool: True if user is verified, False otherwise
         """
-        if user is None or isinstance(user, AnonymousUser):
+        # is_authenticated rather than isinstance() so a token-backed
+        # ClaimsUser is not loaded from the database just for this check
+        if user is None or not user.is_authenticated:
             return False
         
         if user.auth_provider == AuthProvider.EMAIL:
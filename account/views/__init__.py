@@ -1,4 +1,4 @@
-from .token_view import TokenObtainPairView, TokenRefreshView, VerifyUserView
+from .token_view import TokenObtainPairView, TokenRefreshView, VerifyUserView, jwks_view
 from .activate_user_email_view import ActivateUserEmailView
 
 from .user_registration_view import UserRegistrationView
@@ -20,7 +20,7 @@ from .resend_verification_email_view import ResendVerificationEmailView
 
 
 __all__ = [
-    'TokenObtainPairView', 'TokenRefreshView', 'VerifyUserView',
+    'TokenObtainPairView', 'TokenRefreshView', 'VerifyUserView', 'jwks_view',
     'ActivateUserEmailView',
      'UserRegistrationView', 'UserLogoutView', 'UserDeleteAccountView', 'UserLoginView', 'UserProfileView',
     'SendPasswordResetEmailView', 'UserPasswordResetConfirmView', 'UserChangePasswordView',
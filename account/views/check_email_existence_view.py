@@ -2,16 +2,15 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from account.email_index import email_index
 from account.renderers import UserRenderer
 from account.serializers.email import EmailCheckSerializer
 
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
-
 
 class CheckEmailExistenceAPIView(APIView):
     renderer_classes = [UserRenderer]
+    throttle_scope = 'check_email'
+    read_replica = True
 
     def get(self, request, *args, **kwargs):
         serializer = EmailCheckSerializer(data=request.data)
@@ -19,7 +18,7 @@ class CheckEmailExistenceAPIView(APIView):
 
         email = serializer.validated_data['email']
 
-        if User.objects.filter(email=email).exists():
+        if email_index.exists(email):
             return Response({'exists': True, 'message': 'An account with this email already exists.'},
                             status=status.HTTP_200_OK)
         else:
@@ -6,6 +6,7 @@ from ..serializers.email import ResendVerificationEmailSerializer
 
 class ResendVerificationEmailView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'resend_verification'
     
     def post(self, request):
         serializer = ResendVerificationEmailSerializer(
@@ -1,30 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import require_safe
+
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
 
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.views import (
     TokenObtainPairView as TokenObtainPairViewJWT,
     TokenRefreshView as TokenRefreshViewJWT,
 )
 
+from account.enums import LoginEvent
+from account.jwt_keys import jwt_keys_settings, key_ring
+from account.lockout import login_lockout
+from account.login_audit import login_audit
 from account.renderers import UserRenderer
-from account.serializers.auth import CustomTokenObtainPairSerializer
+from account.serializers.auth import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 from account.utils import Util
 
 
-class TokenObtainPairView(TokenObtainPairViewJWT):
+class AuditedTokenMixin:
+    """simplejwt's ``post``, recording the outcome in the login audit trail."""
+    audit_event = None
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        except AuthenticationFailed:
+            login_audit.record(LoginEvent.LOGIN_FAILED, request, email=str(request.data.get('email', '')))
+            raise
+
+        user = serializer.user
+        login_audit.record(self.audit_event, request, user_id=user.pk, email=user.email)
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+class TokenObtainPairView(AuditedTokenMixin, TokenObtainPairViewJWT):
     serializer_class = CustomTokenObtainPairSerializer
     renderer_classes = [UserRenderer]
+    audit_event = LoginEvent.LOGIN
+
+    def post(self, request, *args, **kwargs):
+        email = str(request.data.get('email', ''))
+        login_lockout.check(request, email)
+        try:
+            response = super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            login_lockout.record_failure(request, email)
+            raise
+        login_lockout.record_success(request, email)
+        return response
+
 
-class TokenRefreshView(TokenRefreshViewJWT):
-    renderer_classes = [UserRenderer]    
+class TokenRefreshView(AuditedTokenMixin, TokenRefreshViewJWT):
+    serializer_class = CustomTokenRefreshSerializer
+    renderer_classes = [UserRenderer]
+    audit_event = LoginEvent.REFRESH
 
 
 class VerifyUserView(APIView):
+    """
+    GET checks the access token and answers from its claims, without a query
+    or new tokens. POST also issues a fresh token pair.
+    """
     renderer_classes = [UserRenderer]
     permission_classes = [IsAuthenticated]
 
+    def get(self, request, *args, **kwargs):
+        return Response({'user_id': request.user.pk, 'role': request.user.role, 'message': 'User is verified'},
+                        status=status.HTTP_200_OK)
+
     def post(self, request, *args, **kwargs):
-        token = Util.get_tokens_for_user(request.user)
-        return Response({'token': token, "message": "User is verified"}, status=status.HTTP_200_OK)
\ No newline at end of file
+        # the claims may predate a deactivation; new tokens need the current row
+        user = get_user_model().objects.filter(pk=request.user.pk).first()
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(_("No active account found for the given token."), "no_active_account")
+
+        token = Util.get_tokens_for_user(user)
+        return Response({'token': token, "message": "User is verified"}, status=status.HTTP_200_OK)
+
+
+@require_safe
+def jwks_view(request):
+    """Public token signing keys, for services that verify tokens themselves."""
+    ring = key_ring()
+    if ring.etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(ring.jwks, content_type='application/json')
+    response['ETag'] = ring.etag
+    response['Cache-Control'] = f"public, max-age={jwt_keys_settings()['JWKS_MAX_AGE']}"
+    return response
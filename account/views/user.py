@@ -1,19 +1,97 @@
 # SuperAdmin Only Access Views
 
-from rest_framework import viewsets
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 
+from account.export import CONTENT_TYPES, astream_users, stream_users
+from account.models import UserImport
 from account.renderers import UserRenderer
+from account.user_import import create_job, error_report
 from ..permissions import IsSuperAdmin
-from account.serializers.superadmin import UserSerializer
+from account.serializers.superadmin import UserSerializer, UserImportSerializer
+from utils.pagination import KeysetPagination
 
 User = get_user_model()
 
 
 class UserViewSet(viewsets.ModelViewSet):
     # permission_classes=[IsSuperAdmin]
-    pagination_class = None
+    pagination_class = KeysetPagination
     queryset = User.objects.all()
     serializer_class = UserSerializer
     renderer_classes = [UserRenderer]
+    read_replica = True
 
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='export/(?P<export_format>ndjson|csv)',
+        url_name='export',
+        permission_classes=[IsSuperAdmin],
+    )
+    def export(self, request, export_format):
+        """
+        Stream every user as NDJSON or CSV without loading the table in memory.
+        """
+        filename = f"users-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        # under ASGI a sync iterator would be read into memory before sending
+        stream = astream_users if isinstance(request._request, ASGIRequest) else stream_users
+        response = StreamingHttpResponse(
+            stream(export_format, self.filter_queryset(self.get_queryset())),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        url_name='import',
+        permission_classes=[IsSuperAdmin],
+        serializer_class=UserImportSerializer,
+        pagination_class=None,
+    )
+    def import_users(self, request):
+        """
+        Queue a CSV of users for import. The import runs in
+        ``manage.py import_users --pending``; poll the returned job for progress.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        job = create_job(upload, upload.name, created_by=request.user)
+        return Response(UserImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=r'import/(?P<job_id>\d+)',
+        url_name='import-detail',
+        permission_classes=[IsSuperAdmin],
+    )
+    def import_status(self, request, job_id):
+        job = get_object_or_404(UserImport, pk=job_id)
+        return Response(UserImportSerializer(job).data)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=r'import/(?P<job_id>\d+)/errors',
+        url_name='import-errors',
+        permission_classes=[IsSuperAdmin],
+    )
+    def import_errors(self, request, job_id):
+        """Stream every rejected row of an import as CSV."""
+        job = get_object_or_404(UserImport, pk=job_id)
+        response = StreamingHttpResponse(
+            (line.encode('utf-8') for line in error_report(job)), content_type=CONTENT_TYPES['csv']
+        )
+        response['Content-Disposition'] = f'attachment; filename="user-import-{job.pk}-errors.csv"'
+        return response
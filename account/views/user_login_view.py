@@ -5,6 +5,9 @@ from rest_framework.views import APIView
 from django.contrib.auth import authenticate
 
 
+from account.enums import LoginEvent
+from account.lockout import login_lockout
+from account.login_audit import login_audit
 from account.renderers import UserRenderer
 from account.serializers.auth import UserLoginSerializer
 from account.utils import Util
@@ -13,16 +16,22 @@ from account.utils import Util
 
 class UserLoginView(APIView):
     renderer_classes = [UserRenderer]
+    throttle_scope = 'login'
 
     def post(self, request, format=None):
         serializer = UserLoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.data.get('email')
         password = serializer.data.get('password')
+        login_lockout.check(request, email)
         user = authenticate(email=email, password=password)
         if user is not None:
+            login_lockout.record_success(request, email)
+            login_audit.record(LoginEvent.LOGIN, request, user_id=user.pk, email=user.email)
             token = Util.get_tokens_for_user(user)
             return Response({'token': token, 'message': 'Login Success'}, status=status.HTTP_200_OK)
         else:
+            login_lockout.record_failure(request, email)
+            login_audit.record(LoginEvent.LOGIN_FAILED, request, email=email)
             return Response({'errors': {'non_field_errors': ['Email or Password is not Valid']}},
                             status=status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
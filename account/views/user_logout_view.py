@@ -3,7 +3,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from rest_framework_simplejwt.tokens import RefreshToken
+from account.enums import LoginEvent
+from account.login_audit import login_audit
+from account.tokens import RefreshToken
 
 
 from account.renderers import UserRenderer
@@ -22,6 +24,7 @@ class UserLogoutView(APIView):
         try:
             token = RefreshToken(refresh_token)
             token.blacklist()
+            login_audit.record(LoginEvent.LOGOUT, request, user_id=request.user.pk)
 
             return Response({'message': 'Logout successful. Token blacklisted.'},
                             status=status.HTTP_205_RESET_CONTENT)
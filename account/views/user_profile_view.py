@@ -1,8 +1,10 @@
+from django.http import HttpResponse
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from account.profile_cache import profile_cache
 from account.renderers import UserRenderer
 from account.serializers import UserProfileSerializer
 
@@ -10,10 +12,18 @@ from account.serializers import UserProfileSerializer
 class UserProfileView(APIView):
     renderer_classes = [UserRenderer]
     permission_classes = [IsAuthenticated]
+    read_replica = True
 
     def get(self, request, format=None):
+        body = profile_cache.get(request.user.pk)
+        if body is not None:
+            return HttpResponse(body, content_type=f'{UserRenderer.media_type}; charset={UserRenderer.charset}')
+
         serializer = UserProfileSerializer(request.user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        # cache the body exactly as rendered
+        response.add_post_render_callback(lambda response: profile_cache.set(request.user, response.content))
+        return response
 
     def put(self, request, format=None):
         return self.update_profile(request)
@@ -9,6 +9,7 @@ User = get_user_model()
 
 class UserVerificationStatusView(APIView):
     permission_classes = [IsAuthenticated]
+    read_replica = True
 
     def get(self, request):
         user = request.user
@@ -0,0 +1,79 @@
+"""
+Compare the cost of signing and verifying access tokens with each supported
+algorithm, through the same backends account/tokens.py uses.
+
+HS256 is the cheapest on both sides but its key cannot be published; RS256
+verifies fast and signs slowly; EdDSA (Ed25519) signs fast, verifies slower
+than RS256, and keeps tokens and keys short. Keys are generated for the
+run. RS256 and EdDSA need the cryptography package and are skipped without it.
+
+run:
+python benchmarks/jwt_signing.py --tokens 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'uruserver.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from jwt.algorithms import has_crypto  # noqa: E402
+
+from account.tokens import AccessToken  # noqa: E402
+
+
+def generate_key(algorithm):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == 'RS256':
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        key = ed25519.Ed25519PrivateKey.generate()
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+
+
+def run(algorithm, count):
+    keys = [] if algorithm == 'HS256' else [generate_key(algorithm)]
+    with override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, 'ALGORITHM': algorithm}, JWT_KEYS={'PRIVATE_KEYS': keys}):
+        tokens = []
+        started = time.perf_counter()
+        for n in range(count):
+            token = AccessToken()
+            token['user_id'] = str(n)
+            tokens.append(str(token))
+        signed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for raw in tokens:
+            AccessToken(raw)
+        verified = time.perf_counter() - started
+    return signed, verified, len(tokens[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{args.tokens} access tokens per algorithm")
+    for algorithm in ('HS256', 'RS256', 'EdDSA'):
+        if algorithm != 'HS256' and not has_crypto:
+            print(f"  {algorithm:6} skipped: install cryptography")
+            continue
+        signed, verified, size = run(algorithm, args.tokens)
+        print(f"  {algorithm:6} sign {signed / args.tokens * 1e6:8.1f} us/token, "
+              f"verify {verified / args.tokens * 1e6:8.1f} us/token, {size} bytes")
+
+
+if __name__ == '__main__':
+    main()
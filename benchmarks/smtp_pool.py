@@ -0,0 +1,122 @@
+"""
+Compare one SMTP connection per message (the old Util.send_email) against the
+pooled connections in utils/mail.py.
+
+A minimal SMTP sink is started in-process, so no network or extra packages
+are needed; --latency adds a delay to every server reply to mimic the round
+trips to a remote host. Any local SMTP stand-in (e.g. aiosmtpd) works too:
+pass --host/--port and --no-sink.
+
+run:
+python benchmarks/smtp_pool.py --messages 200 --latency 0.005
+"""
+import argparse
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'uruserver.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.mail import EmailMessage, get_connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from utils.mail import EmailConnectionPool  # noqa: E402
+
+
+class SMTPSink(socketserver.StreamRequestHandler):
+    latency = 0.0
+
+    def reply(self, line):
+        if self.latency:
+            time.sleep(self.latency)
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 sink ready')
+        in_data = False
+        for raw in self.rfile:
+            line = raw.decode(errors='replace').rstrip('\r\n')
+            if in_data:
+                if line == '.':
+                    in_data = False
+                    self.reply('250 queued')
+                continue
+            command = line[:4].upper()
+            if command == 'EHLO':
+                self.reply('250 sink')
+            elif command == 'DATA':
+                in_data = True
+                self.reply('354 go ahead')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+def message(n):
+    return EmailMessage(subject=f'Benchmark {n}', body='Hello', from_email='bench@example.com', to=['to@example.com'])
+
+
+def per_message(count):
+    for n in range(count):
+        connection = get_connection()
+        started = time.perf_counter()
+        connection.open()
+        handshake = time.perf_counter() - started
+        connection.send_messages([message(n)])
+        connection.close()
+        yield handshake
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=20, help='messages per pooled send_messages() call')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every sink reply')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--no-sink', action='store_true', help='use an SMTP server that is already running')
+    args = parser.parse_args()
+
+    host, port = args.host, args.port
+    if not args.no_sink:
+        SMTPSink.latency = args.latency
+        server = socketserver.ThreadingTCPServer((host, port), SMTPSink)
+        server.daemon_threads = True
+        host, port = server.server_address
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+        EMAIL_HOST=host, EMAIL_PORT=port, EMAIL_USE_TLS=False,
+        EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+    ):
+        started = time.perf_counter()
+        handshake = sum(per_message(args.messages))
+        fresh_total = time.perf_counter() - started
+
+        pool = EmailConnectionPool()
+        started = time.perf_counter()
+        for offset in range(0, args.messages, args.batch):
+            pool.send_messages(message(n) for n in range(offset, min(offset + args.batch, args.messages)))
+        pooled_total = time.perf_counter() - started
+        pool.close_all()
+
+    print(f"{args.messages} messages, {args.latency * 1000:.1f} ms per reply")
+    print(f"  connection per message: {fresh_total:8.3f}s total, {handshake:8.3f}s in handshakes, "
+          f"{fresh_total / args.messages * 1000:7.2f} ms/message")
+    print(f"  pooled connections:     {pooled_total:8.3f}s total, {pool.stats['handshake_seconds']:8.3f}s in handshakes "
+          f"({pool.stats['connections_opened']} opened), {pooled_total / args.messages * 1000:7.2f} ms/message")
+
+
+if __name__ == '__main__':
+    main()
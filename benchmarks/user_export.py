@@ -0,0 +1,112 @@
+"""
+Time-to-first-byte, total time and peak RSS of exporting every user through
+UserSerializer (what superadmins did before) versus account/export.py.
+
+The users live in a throw-away SQLite file that is filled on first use and
+reused afterwards; every measurement runs in its own process so the peak RSS
+figures do not contaminate each other.
+
+run:
+python benchmarks/user_export.py --rows 100000 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'uruserver.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def setup(database):
+    settings.DATABASES['default']['NAME'] = database
+    django.setup()
+
+
+def populate(rows):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.core.management import call_command
+
+    User = get_user_model()
+    call_command('migrate', verbosity=0)
+    existing = User.objects.count()
+    unusable = make_password(None)
+    batch = 10000
+    for start in range(existing, rows, batch):
+        User.objects.bulk_create(
+            User(email=f'user{n}@example.com', first_name=f'User{n}', last_name='Export', password=unusable)
+            for n in range(start, min(start + batch, rows))
+        )
+
+
+def measure(mode):
+    from django.contrib.auth import get_user_model
+    from rest_framework.renderers import JSONRenderer
+
+    from account.export import stream_users
+    from account.serializers.superadmin import UserSerializer
+
+    started = time.perf_counter()
+    first_byte, size = None, 0
+    if mode == 'serializer':
+        body = JSONRenderer().render(UserSerializer(get_user_model().objects.all(), many=True).data)
+        first_byte, size = time.perf_counter(), len(body)
+    else:
+        for chunk in stream_users(mode):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            size += len(chunk)
+    finished = time.perf_counter()
+
+    # ru_maxrss is in KiB on Linux
+    print(json.dumps({
+        'ttfb': first_byte - started,
+        'total': finished - started,
+        'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'size_mb': size / 2 ** 20,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000])
+    parser.add_argument('--modes', nargs='+', default=['serializer', 'ndjson', 'csv'])
+    parser.add_argument('--dir', default=tempfile.gettempdir(), help='where the SQLite files are kept')
+    parser.add_argument('--populate', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.populate or args.measure:
+        setup(args.database)
+        populate(args.populate) if args.populate else measure(args.measure)
+        return
+
+    print(f"{'rows':>9}  {'mode':<11}{'ttfb s':>9}{'total s':>9}{'peak RSS MB':>13}{'size MB':>9}")
+    for rows in args.rows:
+        database = os.path.join(args.dir, f'uruserver-export-{rows}.sqlite3')
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--populate', str(rows), '--database', database],
+            check=True,
+        )
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--measure', mode, '--database', database],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{rows:>9}  {mode:<11}{result['ttfb']:>9.3f}{result['total']:>9.3f}"
+                  f"{result['rss_mb']:>13.1f}{result['size_mb']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,17 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from account.views import jwks_view
+from utils.views import liveness_view, metrics_view, readiness_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/account/', include('account.urls')),
+    path('.well-known/jwks.json', jwks_view, name='jwks'),
+    path('metrics', metrics_view, name='metrics'),
+    path('health/', liveness_view, name='health'),
+    path('health/live/', liveness_view, name='health-live'),
+    path('health/ready/', readiness_view, name='health-ready'),
     
 ]
 
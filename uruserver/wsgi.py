@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
+import atexit
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,29 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'uruserver.settings')
 
 application = get_wsgi_application()
+
+# write buffered login audit events and token rows in the background and
+# when the worker shuts down
+from account.login_audit import login_audit  # noqa: E402
+from account.token_ledger import token_ledger  # noqa: E402
+
+atexit.register(login_audit.flush)
+atexit.register(token_ledger.flush)
+login_audit.timer.start()
+token_ledger.timer.start()
+
+# build the per-worker filters now; /health/ready/ fails until they are built
+from account.email_index import email_index  # noqa: E402
+from account.revocation import revocation_index  # noqa: E402
+from utils.health import warm_up  # noqa: E402
+
+for name, index in (('revocation-filter', revocation_index), ('email-index', email_index)):
+    if index.is_trusted():
+        warm_up(name, index.rebuild)
+
+# periodic jobs in this worker, if enabled; runs are claimed per job in the database
+from utils.scheduler import scheduler, scheduler_settings  # noqa: E402
+
+if scheduler_settings()['START_IN_WORKERS']:
+    scheduler.start()
+    atexit.register(scheduler.stop)
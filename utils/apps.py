@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class UtilsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'utils'
+
+    def ready(self):
+        from utils.db import collect_pool_stats
+        from utils.metrics import REGISTRY
+        REGISTRY.add_collector(collect_pool_stats)
@@ -0,0 +1,64 @@
+"""
+Background flushing of per-worker write buffers.
+
+Buffers such as the login audit trail (account/login_audit.py) and the token
+ledger (account/token_ledger.py) flush after a response when a batch is
+due. A worker that goes quiet would otherwise keep its buffer until it
+exits, so ``FlushTimer`` also calls ``flush`` from a daemon thread every
+``interval()`` seconds.
+
+Timers are started from uruserver/wsgi.py and uruserver/asgi.py, not at
+import, so management commands and the test runner never get a thread
+writing behind their back. A timer started before a fork (gunicorn
+--preload) is started again in the child by ``ensure_running()``, which
+buffers call whenever they queue work.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class FlushTimer:
+
+    def __init__(self, name, flush, interval):
+        """
+        Args:
+            name: thread name
+            flush: called from the thread; must be cheap when nothing is buffered
+            interval: callable returning the seconds between flushes
+        """
+        self.name = name
+        self.flush = flush
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wanted = False
+        self._pid = None
+
+    def start(self):
+        self._wanted = True
+        self.ensure_running()
+
+    def ensure_running(self):
+        """Start the thread in this process if ``start()`` was called here or before a fork."""
+        if not self._wanted or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(max(self.interval(), 0.1))
+            try:
+                self.flush()
+            except Exception:
+                logger.exception(f"Background flush {self.name} failed")
+            finally:
+                close_old_connections()
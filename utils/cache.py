@@ -0,0 +1,291 @@
+"""
+Two-tier cache backend: a bounded in-process LRU (L1) in front of a cache
+shared by all workers (L2, another CACHES alias: Redis in production, a
+file-based cache otherwise).
+
+Reads are answered from L1 when possible; misses go to L2 and fill L1 for at
+most L1_TIMEOUT seconds. Writes go to L2 first and then to the writing
+worker's L1.
+
+Other workers learn about writes through an invalidation log kept in L2:
+every write increments a generation counter and stores the written keys
+under that generation. Each worker reads the counter at most once every
+SYNC_INTERVAL seconds and drops the logged keys from its L1; if entries
+are missing (expired log, a writer still between its two steps) or L2 has
+been flushed, it drops its whole L1. Another worker's write therefore shows
+up within SYNC_INTERVAL seconds, and a key that was never in a worker's L1
+(e.g. a new revocation marker) is seen at once. The counter relies on L2's ``incr``
+being atomic, which Redis guarantees; the file-based stand-in is meant for
+a single host in development.
+
+Misses are not cached in L1. Hits, misses and L1 evictions are exported as
+cache_* metrics labelled by tier.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'utils.cache.TwoTierCache',
+            'LOCATION': 'shared',       # alias of the L2 cache
+            'OPTIONS': {'L1_MAX_ENTRIES': 10000, 'L1_TIMEOUT': 10, 'SYNC_INTERVAL': 1.0},
+        },
+        'shared': {...},
+    }
+"""
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+GENERATION_KEY = 'l1-invalidation:generation'
+EPOCH_KEY = 'l1-invalidation:epoch'     # changes when L2 is flushed
+LOG_KEY = 'l1-invalidation:{}'
+
+
+class LocalTier:
+    """
+    The L1 store of one process, shared by its threads (Django creates cache
+    backend instances per thread). Values are pickled, like LocMemCache, so
+    callers never share mutable objects.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()    # key -> (expires_at, pickled value)
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.generation = None
+        self.epoch = None
+        self.synced_at = 0.0
+        self.origin = f'{os.getpid()}:{id(self)}'
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                metrics.cache_evictions.inc(tier='l1', reason='expired')
+                return _MISSING
+            self.entries.move_to_end(key)
+        return pickle.loads(entry[1])
+
+    def set(self, key, value, timeout):
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, pickled)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                metrics.cache_evictions.inc(tier='l1', reason='size')
+
+    def delete(self, keys, reason=None):
+        with self.lock:
+            for key in keys:
+                if self.entries.pop(key, None) is not None and reason:
+                    metrics.cache_evictions.inc(tier='l1', reason=reason)
+
+    def clear(self, reason=None):
+        with self.lock:
+            if reason and self.entries:
+                metrics.cache_evictions.inc(len(self.entries), tier='l1', reason=reason)
+            self.entries.clear()
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+class TwoTierCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.l2_alias = location
+        self.l1_timeout = options.get('L1_TIMEOUT', 10)
+        self.sync_interval = options.get('SYNC_INTERVAL', 1.0)
+        self.log_timeout = options.get('LOG_TIMEOUT', 300)
+        self.max_log_gap = options.get('MAX_LOG_GAP', 1000)
+        with _tiers_lock:
+            self.l1 = _tiers.setdefault(location, LocalTier(options.get('L1_MAX_ENTRIES', 10000)))
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias]
+
+    def l1_key(self, key, version):
+        return self.l2.make_and_validate_key(key, version=version)
+
+    def l1_timeout_for(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.l2.default_timeout
+        return self.l1_timeout if timeout is None else min(self.l1_timeout, timeout)
+
+    # invalidation log
+
+    def publish(self, keys):
+        """Tell other workers to drop ``keys`` from their L1."""
+        try:
+            self.l2.add(EPOCH_KEY, uuid.uuid4().hex, timeout=None)
+            self.l2.add(GENERATION_KEY, 0, timeout=None)
+            generation = self.l2.incr(GENERATION_KEY)
+            self.l2.set(LOG_KEY.format(generation), (self.l1.origin, keys), timeout=self.log_timeout)
+        except Exception:
+            # readers will find the gap and drop their whole L1
+            logger.exception("Failed to publish cache invalidation")
+
+    def sync(self):
+        l1 = self.l1
+        if time.monotonic() - l1.synced_at < self.sync_interval or not l1.sync_lock.acquire(blocking=False):
+            return
+        try:
+            state = self.l2.get_many([GENERATION_KEY, EPOCH_KEY])
+            generation, epoch = state.get(GENERATION_KEY, 0), state.get(EPOCH_KEY)
+            last, l1.synced_at = l1.generation, time.monotonic()
+            if last is None or (generation == last and epoch == l1.epoch):
+                l1.generation, l1.epoch = generation, epoch
+                return
+
+            if epoch != l1.epoch or generation < last or generation - last > self.max_log_gap:
+                l1.clear(reason='invalidated')
+            else:
+                log_keys = [LOG_KEY.format(n) for n in range(last + 1, generation + 1)]
+                entries = self.l2.get_many(log_keys)
+                if len(entries) < len(log_keys):
+                    l1.clear(reason='invalidated')
+                else:
+                    for origin, keys in entries.values():
+                        if origin != l1.origin:
+                            l1.delete(keys, reason='invalidated')
+            l1.generation, l1.epoch = generation, epoch
+        except Exception:
+            logger.exception("Failed to sync the L1 cache")
+            l1.clear()
+        finally:
+            l1.sync_lock.release()
+
+    # cache API
+
+    def get(self, key, default=None, version=None):
+        self.sync()
+        l1_key = self.l1_key(key, version)
+        value = self.l1.get(l1_key)
+        if value is not _MISSING:
+            metrics.cache_hits.inc(tier='l1')
+            return value
+        metrics.cache_misses.inc(tier='l1')
+
+        value = self.l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            metrics.cache_misses.inc(tier='l2')
+            return default
+        metrics.cache_hits.inc(tier='l2')
+        self.l1.set(l1_key, value, self.l1_timeout)
+        return value
+
+    def get_many(self, keys, version=None):
+        self.sync()
+        found, missing = {}, []
+        for key in keys:
+            value = self.l1.get(self.l1_key(key, version))
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        metrics.cache_hits.inc(len(found), tier='l1')
+        if not missing:
+            return found
+
+        metrics.cache_misses.inc(len(missing), tier='l1')
+        from_l2 = self.l2.get_many(missing, version=version)
+        metrics.cache_hits.inc(len(from_l2), tier='l2')
+        metrics.cache_misses.inc(len(missing) - len(from_l2), tier='l2')
+        for key, value in from_l2.items():
+            self.l1.set(self.l1_key(key, version), value, self.l1_timeout)
+        return {**found, **from_l2}
+
+    def has_key(self, key, version=None):
+        self.sync()
+        return self.l1.get(self.l1_key(key, version)) is not _MISSING or self.l2.has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version=version)
+        l1_key = self.l1_key(key, version)
+        self.l1.set(l1_key, value, self.l1_timeout_for(timeout))
+        self.publish([l1_key])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version=version)
+        l1_keys = []
+        for key, value in data.items():
+            l1_key = self.l1_key(key, version)
+            l1_keys.append(l1_key)
+            if key not in failed:
+                self.l1.set(l1_key, value, self.l1_timeout_for(timeout))
+        self.publish(l1_keys)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version=version)
+        if added:
+            # another worker may still hold a value that has expired in L2
+            l1_key = self.l1_key(key, version)
+            self.l1.set(l1_key, value, self.l1_timeout_for(timeout))
+            self.publish([l1_key])
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version=version)
+        l1_key = self.l1_key(key, version)
+        self.l1.delete([l1_key])
+        self.publish([l1_key])
+        return value
+
+    def delete(self, key, version=None):
+        deleted = self.l2.delete(key, version=version)
+        l1_key = self.l1_key(key, version)
+        self.l1.delete([l1_key])
+        self.publish([l1_key])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        self.l2.delete_many(keys, version=version)
+        l1_keys = [self.l1_key(key, version) for key in keys]
+        self.l1.delete(l1_keys)
+        self.publish(l1_keys)
+
+    def clear(self):
+        # also drops the invalidation log, which makes every worker clear its L1
+        self.l2.clear()
+        self.l1.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+
+def is_shared(cache):
+    """
+    Whether ``cache`` is seen by every worker on every host. A process
+    (LocMemCache) or a host (FileBasedCache) of its own is not; for a
+    TwoTierCache it is up to the shared tier.
+    """
+    if isinstance(cache, TwoTierCache):
+        cache = cache.l2
+    return not isinstance(cache, (LocMemCache, DummyCache, FileBasedCache))
@@ -0,0 +1,105 @@
+"""
+Database settings from DATABASE_URL, and metrics for the connection pool.
+
+``database_config()`` turns a URL such as
+``postgres://user:pass@db:5432/uruserver?sslmode=require`` into a
+DATABASES entry with persistent connections (CONN_MAX_AGE plus
+CONN_HEALTH_CHECKS), or with psycopg 3's native pool when ``pool`` is
+given. Django does not allow both at once, so the pool sets CONN_MAX_AGE
+to 0; connections are then returned to the pool at the end of each request
+instead of being kept by the worker thread.
+
+This module is imported from settings.py, so it must not import anything
+that needs configured settings at import time.
+"""
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENGINES = {
+    'postgres': 'django.db.backends.postgresql',
+    'postgresql': 'django.db.backends.postgresql',
+    'pgsql': 'django.db.backends.postgresql',
+    'mysql': 'django.db.backends.mysql',
+    'sqlite': 'django.db.backends.sqlite3',
+}
+
+POOL_OPTIONS = {
+    'MIN_SIZE': 'min_size',
+    'MAX_SIZE': 'max_size',
+    'TIMEOUT': 'timeout',           # seconds a request waits for a free connection
+    'MAX_IDLE': 'max_idle',
+    'MAX_LIFETIME': 'max_lifetime',
+}
+
+
+def parse_database_url(url):
+    """
+    Split ``url`` into a DATABASES entry. Query parameters become OPTIONS,
+    e.g. ``?sslmode=require``.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.split('+')[0]
+    if scheme not in ENGINES:
+        raise ImproperlyConfigured(f"Unsupported DATABASE_URL scheme: {parts.scheme!r}")
+
+    if scheme == 'sqlite':
+        # sqlite:///relative.db, sqlite:////absolute.db, sqlite://:memory:
+        name = parts.netloc if parts.netloc == ':memory:' else unquote(parts.path[1:]) or ':memory:'
+        return {'ENGINE': ENGINES[scheme], 'NAME': name}
+
+    return {
+        'ENGINE': ENGINES[scheme],
+        'NAME': unquote(parts.path.lstrip('/')),
+        'USER': unquote(parts.username or ''),
+        'PASSWORD': unquote(parts.password or ''),
+        'HOST': unquote(parts.hostname or ''),
+        'PORT': str(parts.port or ''),
+        'OPTIONS': dict(parse_qsl(parts.query)),
+    }
+
+
+def database_config(url, conn_max_age=60, conn_health_checks=True, pool=None):
+    """
+    Args:
+        url: the DATABASE_URL
+        conn_max_age: seconds a worker keeps its connection (None: forever)
+        conn_health_checks: check a reused connection before the request uses it
+        pool: PostgreSQL only - ``{'ENABLED': True, 'MIN_SIZE': 2, ...}`` with
+            the keys of POOL_OPTIONS; needs the psycopg[pool] package
+    """
+    config = parse_database_url(url)
+    config['CONN_MAX_AGE'] = conn_max_age
+    config['CONN_HEALTH_CHECKS'] = conn_health_checks
+
+    if pool and pool.get('ENABLED'):
+        if config['ENGINE'] != ENGINES['postgresql']:
+            raise ImproperlyConfigured("The database connection pool requires PostgreSQL")
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            option: pool[key] for key, option in POOL_OPTIONS.items() if pool.get(key) is not None
+        }
+    return config
+
+
+def collect_pool_stats():
+    """
+    Copy psycopg pool statistics into the metrics registry. Registered as a
+    collector in UtilsConfig.ready(), so it runs whenever metrics are read.
+    """
+    from django.db import connections
+
+    from utils import metrics
+
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is None:
+            continue
+        # pop_stats() returns the counters accumulated since the last call
+        stats = pool.pop_stats()
+        metrics.db_pool_requests.inc(stats.get('requests_num', 0), alias=alias)
+        metrics.db_pool_wait.inc(stats.get('requests_wait_ms', 0) / 1000, alias=alias)
+        metrics.db_pool_timeouts.inc(stats.get('requests_errors', 0), alias=alias)
+        metrics.db_pool_size.set(stats.get('pool_size', 0), alias=alias)
+        metrics.db_pool_available.set(stats.get('pool_available', 0), alias=alias)
+        metrics.db_pool_waiting.set(stats.get('requests_waiting', 0), alias=alias)
@@ -0,0 +1,175 @@
+"""
+Liveness and readiness checks for /health/live/ and /health/ready/.
+
+Liveness touches nothing but the process. Readiness runs the checks below
+concurrently, each bounded by TIMEOUT, and keeps the result for
+CACHE_SECONDS: probes in between are answered from memory, and concurrent
+probes wait for one run instead of starting their own.
+
+Code that needs time before the worker should take traffic wraps it in
+``warming_up(name)``, or runs it on a background thread with
+``warm_up(name, build)``; readiness fails until every such block has
+finished. uruserver/wsgi.py and asgi.py build the token revocation filter
+(account/revocation.py) and the email index (account/email_index.py) this
+way when a worker starts, so /health/ready/ only answers ready once they are
+warm.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'TIMEOUT': 1.0,             # seconds allowed for all checks together
+    'CACHE_SECONDS': 5,
+    'CACHE_ALIAS': 'default',
+    'OUTBOX_MAX_LAG': 600,      # seconds a due email may wait before the outbox counts as failing
+    'CRITICAL': ['database', 'cache'],  # failing checks that make the worker not ready
+}
+
+
+def health_settings():
+    return {**DEFAULTS, **getattr(settings, 'HEALTH_CHECKS', {})}
+
+
+_warmups = {}     # name: pid of the process warming up; a fork does not inherit the work
+_warmups_lock = threading.Lock()
+
+
+@contextmanager
+def warming_up(name):
+    with _warmups_lock:
+        _warmups[name] = os.getpid()
+    try:
+        yield
+    finally:
+        with _warmups_lock:
+            _warmups.pop(name, None)
+
+
+def warm_up(name, build):
+    """Run ``build`` on a background thread; the worker is not ready from now until it returns."""
+    with _warmups_lock:
+        _warmups[name] = os.getpid()
+
+    def run():
+        try:
+            build()
+        except Exception:
+            logger.exception(f"Warm-up {name} failed")
+        finally:
+            close_old_connections()
+            with _warmups_lock:
+                _warmups.pop(name, None)
+
+    threading.Thread(target=run, name=f'warm-up-{name}', daemon=True).start()
+
+
+def check_database():
+    connection = connections['default']
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    finally:
+        # checks run on a pool thread, whose connection nobody else reuses
+        connection.close()
+
+
+def check_cache():
+    cache = caches[health_settings()['CACHE_ALIAS']]
+    key = 'health-check'
+    value = str(time.time())
+    cache.set(key, value, 10)
+    if cache.get(key) != value:
+        raise RuntimeError('cache did not return the value just written')
+
+
+def check_outbox():
+    from account.enums import EmailStatus
+    from account.models import OutgoingEmail
+
+    try:
+        oldest = (
+            OutgoingEmail.objects
+            .filter(status=EmailStatus.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at')
+            .values_list('next_attempt_at', flat=True)
+            .first()
+        )
+    finally:
+        connections['default'].close()
+    lag = (timezone.now() - oldest).total_seconds() if oldest else 0
+    if lag > health_settings()['OUTBOX_MAX_LAG']:
+        raise RuntimeError(f'oldest due email has waited {lag:.0f}s')
+    return {'lag_seconds': round(lag, 3)}
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'outbox': check_outbox,
+}
+
+
+class ReadinessProbe:
+
+    def __init__(self, checks):
+        self.checks = checks
+        self._executor = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix='health')
+        self._lock = threading.Lock()
+        self._result = None
+        self._checked_at = 0.0
+
+    def run_checks(self):
+        config = health_settings()
+        started = time.perf_counter()
+        futures = {name: self._executor.submit(check) for name, check in self.checks.items()}
+        wait(futures.values(), timeout=config['TIMEOUT'])
+
+        results = {}
+        for name, future in futures.items():
+            if not future.done():
+                results[name] = {'status': 'fail', 'error': 'timed out'}
+            elif future.exception() is not None:
+                results[name] = {'status': 'fail', 'error': str(future.exception())}
+            else:
+                results[name] = {'status': 'ok', **(future.result() or {})}
+
+        ready = all(results[name]['status'] == 'ok' for name in config['CRITICAL'] if name in results)
+        return {
+            'ready': ready,
+            'checks': results,
+            'duration_seconds': round(time.perf_counter() - started, 4),
+        }
+
+    def status(self):
+        """The cached check result, refreshed at most every CACHE_SECONDS."""
+        max_age = health_settings()['CACHE_SECONDS']
+        if self._result is None or time.monotonic() - self._checked_at >= max_age:
+            with self._lock:
+                # another request may have refreshed it while we waited
+                if self._result is None or time.monotonic() - self._checked_at >= max_age:
+                    self._result = self.run_checks()
+                    self._checked_at = time.monotonic()
+
+        with _warmups_lock:
+            warmups = sorted(name for name, pid in _warmups.items() if pid == os.getpid())
+        if warmups:
+            return {**self._result, 'ready': False, 'warming_up': warmups}
+        return self._result
+
+    def reset(self):
+        self._result = None
+
+
+readiness = ReadinessProbe(CHECKS)
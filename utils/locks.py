@@ -0,0 +1,76 @@
+"""
+Advisory locks for jobs that cron starts on every node at once.
+
+``advisory_lock(name)`` tries once and yields whether it got the lock:
+
+    with advisory_lock('prune_expired') as acquired:
+        if not acquired:
+            return      # another node is already running the job
+        ...
+
+On PostgreSQL and MySQL the lock is a session lock on the database
+connection (pg_try_advisory_lock / GET_LOCK). It is released when the block
+exits, or by the server when the connection drops with a crashed process,
+so a job never leaves a stale lock behind. Other databases (SQLite in
+development) fall back to a key in the shared cache, which expires after
+``timeout`` seconds if its holder dies.
+"""
+import hashlib
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.db import connections
+
+CACHE_PREFIX = 'advisory-lock:'
+
+
+def lock_id(name):
+    """The signed 64-bit key PostgreSQL advisory locks take."""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], 'big', signed=True)
+
+
+def _database_lock(connection, name):
+    if connection.vendor == 'postgresql':
+        return ('SELECT pg_try_advisory_lock(%s)', 'SELECT pg_advisory_unlock(%s)', lock_id(name))
+    if connection.vendor == 'mysql':
+        # MySQL lock names are limited to 64 characters
+        return ('SELECT GET_LOCK(%s, 0)', 'SELECT RELEASE_LOCK(%s)', name[:64])
+    return None
+
+
+@contextmanager
+def advisory_lock(name, using='default', timeout=3600, cache_alias='default'):
+    """
+    Args:
+        name: the job's lock name, shared by every node
+        using: database alias holding the session lock
+        timeout: seconds the cache fallback keeps the lock if never released
+        cache_alias: cache used when the database has no advisory locks
+    """
+    connection = connections[using]
+    statements = _database_lock(connection, name)
+
+    if statements is None:
+        cache = caches[cache_alias]
+        key = CACHE_PREFIX + name
+        owner = uuid.uuid4().hex
+        acquired = cache.add(key, owner, timeout)
+        try:
+            yield acquired
+        finally:
+            # after a timeout the key may belong to someone else
+            if acquired and cache.get(key) == owner:
+                cache.delete(key)
+        return
+
+    acquire, release, key = statements
+    with connection.cursor() as cursor:
+        cursor.execute(acquire, [key])
+        acquired = bool(cursor.fetchone()[0])
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute(release, [key])
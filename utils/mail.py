@@ -0,0 +1,148 @@
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+from utils.metrics import email_send_duration, email_send_failures
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'MAX_CONNECTIONS': 2,   # idle connections kept open per process
+    'MAX_AGE': 300,         # seconds before a connection is closed and re-opened
+}
+
+# Errors after which the connection is assumed dead and worth one reconnect.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def pool_settings():
+    return {**DEFAULTS, **getattr(settings, 'EMAIL_CONNECTION_POOL', {})}
+
+
+class EmailConnectionPool:
+    """
+    Keeps a few opened email backend connections per process, so a burst of
+    messages pays the TCP + STARTTLS + AUTH handshake once instead of once per
+    message.
+
+    Works with any EMAIL_BACKEND; for the console/file/locmem backends
+    opening a connection is simply free.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = deque()
+        self.stats = {
+            'connections_opened': 0,
+            'reconnects': 0,
+            'messages_sent': 0,
+            'send_failures': 0,
+            'handshake_seconds': 0.0,
+            'send_seconds': 0.0,
+        }
+
+    def _open(self):
+        connection = get_connection(fail_silently=False)
+        started = time.perf_counter()
+        connection.open()
+        self.stats['handshake_seconds'] += time.perf_counter() - started
+        self.stats['connections_opened'] += 1
+        return connection, time.monotonic()
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        max_age = pool_settings()['MAX_AGE']
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, opened_at = self._idle.pop()
+            if time.monotonic() - opened_at < max_age:
+                return connection, opened_at
+            self._close(connection)
+        return self._open()
+
+    def _checkin(self, connection, opened_at):
+        with self._lock:
+            if len(self._idle) < pool_settings()['MAX_CONNECTIONS']:
+                self._idle.append((connection, opened_at))
+                return
+        self._close(connection)
+
+    def send_messages(self, messages):
+        """
+        Send ``messages`` over one pooled connection.
+
+        A dropped connection is re-opened once and the failed message retried.
+        Other errors are recorded against their message and do not stop the
+        batch; if the connection cannot be re-opened, every remaining message
+        gets that error.
+
+        Returns:
+            list: one entry per message - ``None`` if sent, else the exception
+        """
+        messages = list(messages)
+        results = []
+        connection, opened_at = self._checkout()
+        for message in messages:
+            try:
+                self._send(connection, message)
+            except RECONNECT_ERRORS as e:
+                logger.warning(f"Email connection dropped ({e}), reconnecting")
+                self.stats['reconnects'] += 1
+                self._close(connection)
+                try:
+                    connection, opened_at = self._open()
+                except Exception as open_error:
+                    remaining = len(messages) - len(results)
+                    self.stats['send_failures'] += remaining
+                    results.extend([open_error] * remaining)
+                    return results
+                try:
+                    self._send(connection, message)
+                except Exception as retry_error:
+                    self.stats['send_failures'] += 1
+                    results.append(retry_error)
+                    continue
+            except Exception as e:
+                self.stats['send_failures'] += 1
+                results.append(e)
+                continue
+            results.append(None)
+
+        self._checkin(connection, opened_at)
+        return results
+
+    def _send(self, connection, message):
+        started = time.perf_counter()
+        try:
+            connection.send_messages([message])
+        except Exception:
+            email_send_failures.inc()
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.stats['send_seconds'] += seconds
+            email_send_duration.observe(seconds)
+        self.stats['messages_sent'] += 1
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _ in idle:
+            self._close(connection)
+
+
+email_pool = EmailConnectionPool()
@@ -0,0 +1,49 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from utils.models import ScheduledJob
+from utils.scheduler import scheduler
+
+
+class Command(BaseCommand):
+    """
+    run:
+    python manage.py run_scheduler              # keep running due jobs (one per node is plenty; more are safe)
+    python manage.py run_scheduler --once       # run what is due now, then exit (e.g. from cron)
+    python manage.py run_scheduler --status     # next run and last outcome of every job
+    """
+    help = 'Run the periodic jobs in SCHEDULER["JOBS"], each at most once per slot across all nodes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are due, then exit')
+        parser.add_argument('--status', action='store_true', help='Show every job and exit')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            scheduler.prepare()
+            for job in ScheduledJob.objects.filter(name__in=list(scheduler.jobs)).order_by('name'):
+                duration = f'{job.last_duration:.2f}s' if job.last_duration is not None else '-'
+                self.stdout.write(
+                    f"{job.name}: next {job.next_run_at:%Y-%m-%d %H:%M:%S}, last success "
+                    f"{job.last_success_at or '-'} ({duration}), runs {job.runs}, failures {job.failures}"
+                    + (f", locked by {job.locked_by}" if job.locked_by else "")
+                    + (f"\n    last error: {job.last_error}" if job.last_error else "")
+                )
+            return
+
+        if options['once']:
+            ran = scheduler.run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Ran {ran} job(s)"))
+            return
+
+        stopped = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopped.set())
+
+        scheduler.start()
+        self.stdout.write(f"Scheduler {scheduler.identity} running {', '.join(scheduler.jobs) or 'no jobs'}")
+        stopped.wait()
+        # let running jobs finish so their leases are released
+        scheduler.stop()
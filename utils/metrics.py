@@ -0,0 +1,309 @@
+"""
+Prometheus metrics without extra dependencies.
+
+Metrics are declared once at import time (see the bottom of this module) and
+updated in-process. With METRICS['MULTIPROC_DIR'] set, every worker also
+writes its values to ``<dir>/<pid>.json`` (at most once per FLUSH_INTERVAL,
+at the end of a request), and ``/metrics`` adds up the files of all workers
+so one scrape sees the whole host. Counters and histograms of workers that
+have exited are kept, like prometheus_client's multiprocess mode; gauges
+only count live workers. Empty the directory when the service starts.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MULTIPROC_DIR': None,      # shared directory for multi-worker aggregation
+    'FLUSH_INTERVAL': 1.0,      # seconds between writes of this worker's file
+    'AUTH_TOKEN': None,         # if set, /metrics requires "Authorization: Bearer <token>"
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, 'METRICS', {})}
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def merge(self, current, other):
+        return current + other
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self, values):
+        for key, value in values.items():
+            yield f'{self.name}_total', key, value
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def samples(self, values):
+        for key, value in values.items():
+            yield self.name, key, value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # per-bucket (not cumulative) counts, then sum and count
+            state = self.values.setdefault(key, [0] * (len(self.buckets) + 3))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def merge(self, current, other):
+        return [a + b for a, b in zip(current, other)]
+
+    def samples(self, values):
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        for key, state in values.items():
+            cumulative = 0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                yield f'{self.name}_bucket', key + (('le', bound),), cumulative
+            yield f'{self.name}_sum', key, state[-2]
+            yield f'{self.name}_count', key, state[-1]
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def add_collector(self, collector):
+        """``collector()`` is called to update metrics whenever they are read."""
+        self.collectors.append(collector)
+
+    def snapshot(self):
+        """This process's values, as ``{name: {key: value}}``."""
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception(f"Metrics collector {collector!r} failed")
+        result = {}
+        for name, metric in self.metrics.items():
+            with metric._lock:
+                result[name] = {key: list(value) if isinstance(value, list) else value
+                                for key, value in metric.values.items()}
+        return result
+
+    def flush(self, force=False):
+        """Write this worker's values to the shared directory, if configured."""
+        directory = metrics_settings()['MULTIPROC_DIR']
+        now = time.monotonic()
+        if not directory or (not force and now - self._last_flush < metrics_settings()['FLUSH_INTERVAL']):
+            return
+        self._last_flush = now
+
+        data = {
+            name: [[list(map(list, key)), value] for key, value in values.items()]
+            for name, values in self.snapshot().items()
+        }
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def collect(self):
+        directory = metrics_settings()['MULTIPROC_DIR']
+        if not directory:
+            return self.snapshot()
+
+        self.flush(force=True)
+        merged = {name: {} for name in self.metrics}
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            try:
+                pid = int(os.path.basename(path)[:-len('.json')])
+                with open(path) as f:
+                    data = json.load(f)
+            except (ValueError, OSError):
+                continue
+            alive = self._alive(pid)
+            for name, entries in data.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.kind == 'gauge' and not alive):
+                    continue
+                values = merged[name]
+                for key, value in entries:
+                    key = tuple(map(tuple, key))
+                    values[key] = metric.merge(values[key], value) if key in values else value
+        return merged
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for sample, key, value in metric.samples(values):
+                lines.append(f'{sample}{_format_labels(key)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush, force=True)
+
+
+http_requests = Counter(
+    'http_requests', 'HTTP responses by route, method and status code.', ['method', 'route', 'status'])
+http_request_duration = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response.', ['method', 'route'])
+http_requests_in_flight = Gauge(
+    'http_requests_in_flight', 'Requests being handled right now.')
+http_request_db_queries = Histogram(
+    'http_request_db_queries', 'Database queries run per request.', ['route'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100))
+http_request_db_duration = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request.', ['route'])
+password_hash_duration = Histogram(
+    'password_hash_duration_seconds', 'Password hashing and verification time, queueing included.',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+email_send_duration = Histogram(
+    'email_send_duration_seconds', 'Time to hand one message to the email backend.')
+email_send_failures = Counter(
+    'email_send_failures', 'Messages the email backend did not accept.')
+db_pool_requests = Counter(
+    'db_pool_requests', 'Connections handed out by the database pool.', ['alias'])
+db_pool_wait = Counter(
+    'db_pool_wait_seconds', 'Time requests spent waiting for a pooled database connection.', ['alias'])
+db_pool_timeouts = Counter(
+    'db_pool_timeouts', 'Requests that gave up waiting for a pooled database connection.', ['alias'])
+db_pool_size = Gauge(
+    'db_pool_size', 'Connections currently open in the database pool.', ['alias'])
+db_pool_available = Gauge(
+    'db_pool_available', 'Idle connections in the database pool.', ['alias'])
+db_pool_waiting = Gauge(
+    'db_pool_waiting', 'Requests waiting for a pooled database connection.', ['alias'])
+cache_hits = Counter(
+    'cache_hits', 'Cache lookups answered, by tier (l1: in-process, l2: shared).', ['tier'])
+cache_misses = Counter(
+    'cache_misses', 'Cache lookups not answered, by tier.', ['tier'])
+cache_evictions = Counter(
+    'cache_evictions', 'Entries dropped from the in-process cache (size, expired or invalidated).', ['tier', 'reason'])
+login_audit_events = Counter(
+    'login_audit_events', 'Login audit events buffered, by event.', ['event'])
+login_audit_dropped = Counter(
+    'login_audit_dropped', 'Login audit events lost to a full buffer or a failed flush.')
+login_lockouts = Counter(
+    'login_lockouts', 'Logins locked after repeated failures, by scope (account or ip).', ['scope'])
+login_lockout_rejections = Counter(
+    'login_lockout_rejections', 'Login attempts rejected with 429 while locked, before hashing.')
+token_cache_hits = Counter(
+    'token_cache_hits', 'Access tokens accepted from the decoded-token cache without a signature check.')
+token_cache_misses = Counter(
+    'token_cache_misses', 'Access tokens not in the decoded-token cache.')
+token_cache_evictions = Counter(
+    'token_cache_evictions', 'Decoded tokens dropped (size, expired or rotated).', ['reason'])
+token_ledger_rows = Counter(
+    'token_ledger_rows', 'Token rows queued for a batched write, by table.', ['table'])
+token_ledger_failures = Counter(
+    'token_ledger_failures', 'Queued token rows whose batched write failed; they are queued again.')
+pruned_rows = Counter(
+    'pruned_rows', 'Rows deleted by prune_expired, by target (cascaded rows included).', ['target'])
+scheduler_runs = Counter(
+    'scheduler_runs', 'Scheduled job runs, by job and outcome (success or failure).', ['job', 'outcome'])
+scheduler_run_seconds = Histogram(
+    'scheduler_run_seconds', 'Duration of scheduled job runs.', ['job'],
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600))
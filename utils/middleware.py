@@ -0,0 +1,63 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from utils import metrics
+
+
+class QueryCounter:
+    """``execute_wrapper`` that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status codes, in-flight requests and database usage per
+    route (the URL name, so label values stay bounded). Put it first in
+    MIDDLEWARE so the timings cover the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics.metrics_settings()['ENABLED']:
+            return self.get_response(request)
+
+        queries = QueryCounter()
+        metrics.http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.get_response(request)
+        finally:
+            metrics.http_requests_in_flight.dec()
+
+        route = self.route(request)
+        metrics.http_request_duration.observe(time.perf_counter() - started, method=request.method, route=route)
+        metrics.http_requests.inc(method=request.method, route=route, status=response.status_code)
+        metrics.http_request_db_queries.observe(queries.count, route=route)
+        metrics.http_request_db_duration.observe(queries.seconds, route=route)
+        metrics.REGISTRY.flush()
+        return response
+
+    @staticmethod
+    def route(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match.route
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:31
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utils', '0002_scheduledjob'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='RateLimitBucket',
+        ),
+    ]
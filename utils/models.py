@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class ScheduledJob(models.Model):
+    """
+    Next run and last outcome of one periodic job (see utils/scheduler.py).
+    The row is also the job's lock: a scheduler only runs the job after one
+    conditional UPDATE that moves ``next_run_at`` on and takes the lease,
+    so a single process wins each run.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    next_run_at = models.DateTimeField(db_index=True)
+    locked_by = models.CharField(max_length=255, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    last_duration = models.FloatField(null=True, blank=True)    # seconds
+    last_error = models.TextField(blank=True, default='')
+    runs = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Scheduled Job"
+        verbose_name_plural = "Scheduled Jobs"
+
+    def __str__(self):
+        return self.name
@@ -1,4 +1,8 @@
-from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -8,3 +12,126 @@ class CustomPageNumberPagination(PageNumberPagination):
     max_page_size = 30
     # last_page_strings = 'l'
 
+
+DEFAULTS = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,   # ceiling for ?page_size=
+}
+
+
+def cursor_pagination_settings():
+    return {**DEFAULTS, **getattr(settings, 'CURSOR_PAGINATION', {})}
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over ``(created_at, id)``, newest first.
+
+    DRF's CursorPagination only filters on the first ordering field and falls
+    back to OFFSET to step over rows sharing a timestamp. Here the cursor
+    carries both values and the next page is selected with a row comparison,
+    so every page is a single index range scan (see the matching index on the
+    model) and no COUNT(*) is ever run.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    separator = '|'
+
+    def get_page_size(self, request):
+        config = cursor_pagination_settings()
+        self.page_size = config['PAGE_SIZE']
+        self.max_page_size = config['MAX_PAGE_SIZE']
+        return super().get_page_size(request)
+
+    def get_ordering(self, request, queryset, view):
+        # fixed: the keyset filter below depends on this exact ordering
+        return self.ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [order.lstrip('-') for order in ordering]
+        if isinstance(instance, dict):
+            values = [instance[field] for field in fields]
+        else:
+            values = [getattr(instance, field) for field in fields]
+        created_at, pk = values
+        return f'{created_at.isoformat()}{self.separator}{pk}'
+
+    def parse_position(self, position):
+        created_at, _, pk = position.partition(self.separator)
+        try:
+            created_at, pk = parse_datetime(created_at), int(pk)
+        except ValueError:
+            created_at = None
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def filter_after(self, queryset, position, reverse):
+        created_at, pk = self.parse_position(position)
+        # ordering is descending, so "after" means smaller unless walking backwards
+        lookup = 'gt' if reverse else 'lt'
+        return queryset.filter(
+            # redundant with the OR, but a plain bound the planner can use as a
+            # range scan of user_created_id_idx
+            Q(**{f'created_at__{lookup}e': created_at}),
+            Q(**{f'created_at__{lookup}': created_at}) |
+            Q(created_at=created_at, **{f'id__{lookup}': pk}),
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self.cursor = Cursor(offset=0, reverse=False, position=None)
+        reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by(*(order.lstrip('-') for order in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = self.filter_after(queryset, current_position, reverse)
+
+        # Positions are unique, so the cursor offset is never needed; one
+        # extra row tells whether there is a following page.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(self.page[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = current_position is not None, following_position is not None
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next, self.has_previous = following_position is not None, current_position is not None
+            self.next_position, self.previous_position = following_position, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self.next_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.previous_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
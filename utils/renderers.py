@@ -1,49 +1,121 @@
+from json.encoder import c_make_encoder, encode_basestring, encode_basestring_ascii
+
 from rest_framework.renderers import JSONRenderer
-import json
 from rest_framework.exceptions import ErrorDetail
-from collections import OrderedDict
-from django.core.serializers.json import DjangoJSONEncoder 
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional faster backend
+    orjson = None
+
+
+# Everything orjson does not handle natively (and datetimes, so the format
+# matches DjangoJSONEncoder) is deferred to Django's encoder.
+_orjson_default = DjangoJSONEncoder().default
+
+
+def _make_encoder(ensure_ascii):
+    """
+    Build an ``encode(obj) -> str`` with the output of
+    ``json.dumps(obj, ensure_ascii=..., cls=DjangoJSONEncoder)``.
+
+    The C encoder is built once instead of on every call, and without the
+    circular-reference bookkeeping, which also makes it safe to share between
+    threads.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=ensure_ascii, check_circular=False)
+    if c_make_encoder is None:
+        return encoder.encode
+
+    iterencode = c_make_encoder(
+        None, encoder.default,
+        encode_basestring_ascii if ensure_ascii else encode_basestring,
+        None, encoder.key_separator, encoder.item_separator,
+        encoder.sort_keys, encoder.skipkeys, encoder.allow_nan,
+    )
+    return lambda obj: ''.join(iterencode(obj, 0))
+
+
+_ENCODERS = {True: _make_encoder(True), False: _make_encoder(False)}
+
 
+def json_backend():
+    """
+    'json' (default) produces byte-identical output to the previous renderers.
+    'orjson' is faster but writes compact JSON (no spaces after ',' and ':')
+    and never escapes non-ASCII characters.
+    """
+    backend = getattr(settings, 'JSON_RENDERER_BACKEND', 'json')
+    if backend == 'orjson' and orjson is None:
+        return 'json'
+    return backend
 
-class CustomRenderer(JSONRenderer):
+
+class EnvelopeJSONRenderer(JSONRenderer):
+    """
+    Renders a response, wrapping validation errors as ``{"errors": ...}``.
+
+    Subclasses decide what counts as an error via ``error_value()``, which
+    is called for every top-level value that is an instance of
+    ``error_types``: it returns the value to emit when the response turns out
+    to be an error, or ``None`` if that value does not mark the response as
+    one. Detection and conversion happen in the same pass, and the result is
+    encoded straight to bytes. The defaults wrap nothing.
+    """
     charset = 'utf-8'
+    ensure_ascii = False
+    empty_body = b''    # body for ``None`` data
+    error_types = ()
+
+    def error_value(self, value):
+        """No value marks an error: on its own the renderer emits plain JSON."""
+        return None
+
+    def envelope(self, data):
+        if not isinstance(data, dict):
+            return data
+
+        errors = None
+        error_types = self.error_types
+        for key, value in data.items():
+            if not isinstance(value, error_types):
+                continue
+            converted = self.error_value(value)
+            if converted is not None:
+                if errors is None:
+                    errors = dict(data)     # keeps key order; converted keys are overwritten in place
+                errors[key] = converted
+
+        return data if errors is None else {'errors': errors}
+
+    def encode(self, data):
+        if json_backend() == 'orjson':
+            return orjson.dumps(data, default=_orjson_default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        return _ENCODERS[self.ensure_ascii](data).encode(self.charset)
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         if data is None:
-            return b''
-
-        response_dict = {}
-        if isinstance(data, dict):
-            # Handle validation errors
-            if any(
-                isinstance(value, (ErrorDetail, list)) or 
-                (isinstance(value, dict) and any(isinstance(v, (ErrorDetail, list)) for v in value.values()))
-                for value in data.values()
-            ):
-                # Convert single error strings to list format
-                errors = OrderedDict()
-                for key, value in data.items():
-                    if isinstance(value, ErrorDetail):
-                        errors[key] = [str(value)]
-                    elif isinstance(value, list):
-                        errors[key] = [str(v) if isinstance(v, ErrorDetail) else v for v in value]
-                    elif isinstance(value, dict):
-                        # Handle nested errors
-                        nested_errors = OrderedDict()
-                        for k, v in value.items():
-                            if isinstance(v, ErrorDetail):
-                                nested_errors[k] = [str(v)]
-                            elif isinstance(v, list):
-                                nested_errors[k] = [str(item) if isinstance(item, ErrorDetail) else item for item in v]
-                            else:
-                                nested_errors[k] = v
-                        errors[key] = nested_errors
-                    else:
-                        errors[key] = value
-                response_dict['errors'] = errors
-            else:
-                response_dict = data
-        else:
-            response_dict = data
-
-        return json.dumps(response_dict, ensure_ascii=False, cls=DjangoJSONEncoder).encode(self.charset)
+            return self.empty_body
+        return self.encode(self.envelope(data))
+
+
+class CustomRenderer(EnvelopeJSONRenderer):
+    """
+    Project default. A response is an error if any top-level value is an
+    ErrorDetail or a list, or a dict holding one; bare ErrorDetails (also one
+    level down) are emitted as single-item lists.
+    """
+    error_types = (ErrorDetail, list, dict)
+
+    def error_value(self, value):
+        if isinstance(value, ErrorDetail):
+            return [str(value)]
+        if isinstance(value, list):
+            return value
+        if isinstance(value, dict):
+            if not any(isinstance(v, (ErrorDetail, list)) for v in value.values()):
+                return None
+            return {k: [str(v)] if isinstance(v, ErrorDetail) else v for k, v in value.items()}
+        return None
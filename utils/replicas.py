@@ -0,0 +1,148 @@
+"""
+Read replicas for read-only requests.
+
+``ReplicaMiddleware`` lets the reads of a GET/HEAD/OPTIONS request go to a
+replica (one of READ_REPLICAS['ALIASES'], picked at random per request) when
+the view opts in with ``read_replica = True`` (function views:
+``@read_from_replica()``), or when READ_REPLICAS['DEFAULT']
+is on and the view does not opt out with ``read_replica = False``.
+``ReplicaRouter`` then routes the queries. All writes go to the primary.
+
+Reading your own writes:
+
+- within a request, a model that was written is read from the primary for the
+  rest of the request, and so is everything inside ``transaction.atomic()``
+- after a successful POST/PUT/PATCH/DELETE, the client (its Authorization
+  header and its address) is pinned to the primary for PIN_SECONDS, so a GET
+  right after a profile PATCH sees the change. Pins live in the cache, so
+  they only hold across workers when CACHES[CACHE_ALIAS] is shared.
+
+Streamed response bodies (e.g. the user export) are produced after the
+middleware has returned and read from the primary.
+"""
+import hashlib
+import random
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import Resolver404, resolve
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+DEFAULTS = {
+    'ALIASES': [],              # DATABASES aliases of the replicas
+    'DEFAULT': False,           # use replicas for views that do not set read_replica
+    'PIN_SECONDS': 5,           # after a write, the client reads from the primary this long
+    'CACHE_ALIAS': 'default',
+}
+
+
+def replica_settings():
+    return {**DEFAULTS, **getattr(settings, 'READ_REPLICAS', {})}
+
+
+_replica = ContextVar('replica', default=None)          # alias reads go to, None for the primary
+_written = ContextVar('written_models', default=None)   # labels of models written since
+
+
+@contextmanager
+def use_replica(alias=None):
+    """Send the reads of the block to ``alias`` (default: a random replica)."""
+    aliases = replica_settings()['ALIASES']
+    alias = alias or (random.choice(aliases) if aliases else None)
+    replica_token, written_token = _replica.set(alias), _written.set(set())
+    try:
+        yield alias
+    finally:
+        _replica.reset(replica_token)
+        _written.reset(written_token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block or model._meta.label in _written.get():
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # explicit, or Django would save an instance to the replica it was read from
+        written = _written.get()
+        if written is not None:
+            written.add(model._meta.label)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema from the primary
+        return db not in replica_settings()['ALIASES']
+
+
+def _pin_keys(request):
+    credentials = [BaseThrottle().get_ident(request)]
+    if request.META.get('HTTP_AUTHORIZATION'):
+        credentials.append(request.META['HTTP_AUTHORIZATION'])
+    return [f'replica-pin:{hashlib.sha256(c.encode()).hexdigest()}' for c in credentials]
+
+
+def pin_to_primary(request):
+    config = replica_settings()
+    caches[config['CACHE_ALIAS']].set_many(dict.fromkeys(_pin_keys(request), 1), config['PIN_SECONDS'])
+
+
+def is_pinned(request):
+    return bool(caches[replica_settings()['CACHE_ALIAS']].get_many(_pin_keys(request)))
+
+
+def read_from_replica(enabled=True):
+    """Decorator for function views; class-based views set ``read_replica``."""
+    def decorator(view):
+        view.read_replica = enabled
+        return view
+    return decorator
+
+
+def view_uses_replica(view_func, default):
+    enabled = getattr(view_func, 'read_replica', None)
+    if enabled is None:
+        # DRF's as_view() keeps the view class on the function
+        enabled = getattr(getattr(view_func, 'cls', None), 'read_replica', None)
+    return default if enabled is None else enabled
+
+
+class ReplicaMiddleware:
+    """
+    Chooses the database for the whole request in ``__call__``. Under ASGI
+    the middleware hooks run in different sync_to_async contexts, so the
+    replica is set and reset in this one frame rather than from process_view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with use_replica() if self.uses_replica(request) else nullcontext():
+            response = self.get_response(request)
+
+        if (request.method not in SAFE_METHODS and response.status_code < 400
+                and replica_settings()['ALIASES']):
+            pin_to_primary(request)
+        return response
+
+    def uses_replica(self, request):
+        config = replica_settings()
+        if not config['ALIASES'] or request.method not in SAFE_METHODS:
+            return False
+        try:
+            match = resolve(request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return False
+        return view_uses_replica(match.func, config['DEFAULT']) and not is_pinned(request)
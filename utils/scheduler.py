@@ -0,0 +1,333 @@
+"""
+In-process scheduler for periodic jobs, without Celery beat.
+
+Jobs are listed in SCHEDULER['JOBS']:
+
+    'JOBS': {
+        'prune_expired': {'SCHEDULE': '17 * * * *', 'COMMAND': 'prune_expired'},
+        'dispatch_outbox': {'SCHEDULE': 60, 'COMMAND': 'dispatch_outbox'},
+        'rollup': {'SCHEDULE': 300, 'CALLABLE': 'myapp.jobs.rollup', 'LEASE': 1800},
+    }
+
+SCHEDULE is either a number of seconds (runs at multiples of it since the
+epoch, so every scheduler agrees on the slots) or a five-field cron
+expression in UTC (``*``, ``*/n``, ``a-b``, ``a-b/n`` and lists). A job runs
+a management command (COMMAND, with optional ARGS) or a callable given by
+its dotted path.
+
+Every job has a ``ScheduledJob`` row. The scheduler claims a due run with
+one conditional UPDATE that moves ``next_run_at`` to the next slot and takes
+a lease (locked_by, locked_until); only one process can win it, so any
+number of gunicorn workers and nodes may run a scheduler. Runs go to a
+thread pool of WORKERS threads, and the scheduler renews the leases of its
+running jobs on every tick. If a process dies mid-run its lease runs out
+after LEASE seconds, and the next slot is free again. Duration, last success
+and the last error are written back to the row and exported as scheduler_*
+metrics.
+
+Start it with ``python manage.py run_scheduler``, or in every web worker
+with SCHEDULER['START_IN_WORKERS'] (uruserver/wsgi.py, uruserver/asgi.py;
+not with gunicorn --preload, whose forked workers lose the thread).
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from utils import metrics
+from utils.models import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'START_IN_WORKERS': False,
+    'TICK': 5,              # seconds between checks for due jobs
+    'WORKERS': 2,           # threads running jobs
+    'LEASE': 600,           # seconds a run stays claimed without renewal
+    'JOBS': {},
+}
+
+
+def scheduler_settings():
+    return {**DEFAULTS, **getattr(settings, 'SCHEDULER', {})}
+
+
+class CronSchedule:
+    """A five-field cron expression (minute hour day-of-month month day-of-week), in UTC."""
+
+    FIELDS = (('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 7))
+
+    def __init__(self, expression):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        values = [self._parse(part, low, high) for part, (_, low, high) in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        self.weekdays = {day % 7 for day in weekdays}   # 0 and 7 are both Sunday
+        # as in cron: when both day fields are restricted, either may match
+        self.any_day, self.any_weekday = parts[2] == '*', parts[4] == '*'
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for item in field.split(','):
+            value, _, step = item.partition('/')
+            step = int(step) if step else 1
+            if value == '*':
+                start, end = low, high
+            elif '-' in value:
+                start, end = map(int, value.split('-'))
+            else:
+                start = int(value)
+                end = high if step > 1 else start
+            if not low <= start <= end <= high or step < 1:
+                raise ValueError(f"Invalid cron field {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays     # cron counts from Sunday
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment):
+        moment = moment.astimezone(dt_timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression {self.expression!r} never matches")
+
+
+class IntervalSchedule:
+    """Every ``seconds`` seconds, at multiples of it since the epoch."""
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Schedule interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment):
+        slot = (moment.timestamp() // self.seconds + 1) * self.seconds
+        return datetime.fromtimestamp(slot, tz=dt_timezone.utc)
+
+
+class Job:
+
+    def __init__(self, name, schedule, target, lease):
+        self.name = name
+        self.schedule = schedule
+        self.target = target
+        self.lease = lease
+
+    @classmethod
+    def from_settings(cls, name, options, default_lease):
+        try:
+            schedule = options['SCHEDULE']
+            schedule = CronSchedule(schedule) if isinstance(schedule, str) else IntervalSchedule(schedule)
+            if 'COMMAND' in options:
+                command, args = options['COMMAND'], options.get('ARGS', ())
+                target = lambda: call_command(command, *args, stdout=StringIO(), stderr=StringIO())  # noqa: E731
+            else:
+                target = import_string(options['CALLABLE'])
+        except (KeyError, ValueError, ImportError) as e:
+            raise ImproperlyConfigured(f"Invalid scheduled job {name!r}: {e}") from e
+        return cls(name, schedule, target, options.get('LEASE', default_lease))
+
+    def next_after(self, moment):
+        return self.schedule.next_after(moment)
+
+
+def load_jobs(config=None):
+    config = config or scheduler_settings()
+    return {name: Job.from_settings(name, options, config['LEASE']) for name, options in config['JOBS'].items()}
+
+
+class Scheduler:
+
+    def __init__(self, jobs=None, identity=None):
+        self.identity = identity or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._jobs = jobs
+        self._loaded = (None, {})  # (SCHEDULER['JOBS'], jobs built from it)
+        self._lock = threading.Lock()
+        self._running = set()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+
+    @property
+    def config(self):
+        return scheduler_settings()
+
+    @property
+    def jobs(self):
+        if self._jobs is not None:
+            return self._jobs
+        config = self.config
+        if self._loaded[0] is not config['JOBS']:
+            self._loaded = (config['JOBS'], load_jobs(config))
+        return self._loaded[1]
+
+    def prepare(self, now=None):
+        """Create missing rows, and bring forward runs a shorter schedule now makes due sooner."""
+        now = now or timezone.now()
+        ScheduledJob.objects.bulk_create(
+            [ScheduledJob(name=name, next_run_at=job.next_after(now)) for name, job in self.jobs.items()],
+            ignore_conflicts=True,
+        )
+        for name, job in self.jobs.items():
+            next_run_at = job.next_after(now)
+            ScheduledJob.objects.filter(name=name, next_run_at__gt=next_run_at).update(next_run_at=next_run_at)
+
+    def claim_due(self, now=None):
+        """Claim every due job no other process holds. Returns the claimed jobs."""
+        now = now or timezone.now()
+        due = list(ScheduledJob.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+            name__in=list(self.jobs),
+            next_run_at__lte=now,
+        ).values_list('name', flat=True))
+
+        claimed = []
+        for name in due:
+            job = self.jobs[name]
+            with self._lock:
+                if name in self._running:
+                    continue
+            # the same conditions again: the UPDATE only matches for one process
+            won = ScheduledJob.objects.filter(
+                Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+                name=name,
+                next_run_at__lte=now,
+            ).update(
+                next_run_at=job.next_after(now),
+                locked_by=self.identity,
+                locked_until=now + timedelta(seconds=job.lease),
+                last_started_at=now,
+            )
+            if won:
+                with self._lock:
+                    self._running.add(name)
+                claimed.append(job)
+        return claimed
+
+    def run(self, job):
+        """Run a claimed job here and now, then record the outcome and release the lease."""
+        started = time.monotonic()
+        error = ''
+        try:
+            job.target()
+        except Exception as e:
+            logger.exception(f"Scheduled job {job.name} failed")
+            error = f'{type(e).__name__}: {e}'
+        duration = time.monotonic() - started
+
+        outcome = 'failure' if error else 'success'
+        metrics.scheduler_runs.inc(job=job.name, outcome=outcome)
+        metrics.scheduler_run_seconds.observe(duration, job=job.name)
+        fields = {
+            'locked_by': '',
+            'locked_until': None,
+            'last_duration': duration,
+            'last_error': error,
+            'runs': F('runs') + 1,
+        }
+        if error:
+            fields['failures'] = F('failures') + 1
+        else:
+            fields['last_success_at'] = timezone.now()
+        try:
+            ScheduledJob.objects.filter(name=job.name, locked_by=self.identity).update(**fields)
+        finally:
+            with self._lock:
+                self._running.discard(job.name)
+        return not error
+
+    def run_pending(self):
+        """Claim and run every due job in this thread. Returns the number of jobs run."""
+        self.prepare()
+        jobs = self.claim_due()
+        for job in jobs:
+            self.run(job)
+        return len(jobs)
+
+    def renew(self, now=None):
+        """Extend the leases of the jobs this process is running."""
+        now = now or timezone.now()
+        with self._lock:
+            running = list(self._running)
+        for name in running:
+            ScheduledJob.objects.filter(name=name, locked_by=self.identity).update(
+                locked_until=now + timedelta(seconds=self.jobs[name].lease)
+            )
+
+    def tick(self):
+        self.renew()
+        for job in self.claim_due():
+            self._executor.submit(self._run_in_thread, job)
+
+    def _run_in_thread(self, job):
+        close_old_connections()
+        try:
+            self.run(job)
+        except Exception:
+            logger.exception(f"Could not record the run of scheduled job {job.name}")
+        finally:
+            close_old_connections()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            self._stop.wait(self.config['TICK'])
+
+    def start(self):
+        """Run due jobs in the background until ``stop()``."""
+        if self._thread is not None or not self.config['ENABLED'] or not self.jobs:
+            return
+        self.prepare()
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(self.config['WORKERS'], thread_name_prefix='scheduler')
+        self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Scheduler {self.identity} started with jobs: {', '.join(self.jobs)}")
+
+    def stop(self, wait=True):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._executor.shutdown(wait=wait)
+        self._thread = self._executor = None
+
+
+scheduler = Scheduler()
@@ -0,0 +1,72 @@
+"""
+Test runner for ``python manage.py test`` (settings.TEST_RUNNER).
+
+Besides the usual test database it sets up what the tests need and the
+settings module cannot know about:
+
+- ``replica0``, a second SQLite database for the read replica tests
+  (utils/tests/test_replicas.py). Nothing is migrated into it; the tests copy
+  the primary over it, like a replica catching up.
+- throttle buckets in memory instead of the host-wide
+  RATE_LIMIT['SQLITE_PATH'], which dev servers and other runs also use, and
+  emptied before every test, as if they were rolled back with the database
+- the shared cache tier in a directory of this run instead of CACHE_DIR or
+  Redis
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+from django.test import runner
+
+from utils.throttling import rate_store
+
+
+class FreshThrottlesResult:
+
+    def startTest(self, test):
+        rate_store().clear()
+        super().startTest(test)
+
+
+class RemoteTestRunner(runner.RemoteTestRunner):
+    resultclass = type('RemoteTestResult', (FreshThrottlesResult, runner.RemoteTestResult), {})
+
+
+class ParallelTestSuite(runner.ParallelTestSuite):
+    runner_class = RemoteTestRunner
+
+
+class TestRunner(runner.DiscoverRunner):
+    parallel_test_suite = ParallelTestSuite
+
+    def get_resultclass(self):
+        resultclass = super().get_resultclass() or unittest.TextTestResult
+        return type(resultclass.__name__, (FreshThrottlesResult, resultclass), {})
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.temp_dir = tempfile.mkdtemp(prefix='uruserver-tests-')
+        self.overrides = override_settings(
+            # one database per thread, so parallel workers never share buckets
+            RATE_LIMIT={**settings.RATE_LIMIT, 'BACKEND': 'sqlite', 'SQLITE_PATH': ':memory:'},
+            CACHES={**settings.CACHES, 'shared': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.path.join(self.temp_dir, 'cache'),
+            }},
+        )
+        self.overrides.enable()
+        replica = os.path.join(self.temp_dir, 'replica.sqlite3')
+        connections.settings['replica0'] = connections.configure_settings({
+            **connections.settings,
+            'replica0': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': replica, 'TEST': {'NAME': replica}},
+        })['replica0']
+
+    def teardown_test_environment(self, **kwargs):
+        self.overrides.disable()
+        super().teardown_test_environment(**kwargs)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
@@ -0,0 +1,27 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from utils.background import FlushTimer
+
+
+class FlushTimerTests(SimpleTestCase):
+    """
+    A started timer flushes every interval, and starting it again in the same process is a no-op
+    """
+
+    def test_flushes_periodically(self):
+        flushed = threading.Semaphore(0)
+        timer = FlushTimer('test-flush', flushed.release, lambda: 0.1)
+
+        timer.start()
+        timer.start()
+
+        for _ in range(2):
+            self.assertTrue(flushed.acquire(timeout=2))
+        self.assertEqual(sum(thread.name == 'test-flush' for thread in threading.enumerate()), 1)
+
+    def test_not_running_until_started(self):
+        timer = FlushTimer('test-idle', lambda: None, lambda: 0.1)
+        timer.ensure_running()
+        self.assertNotIn('test-idle', [thread.name for thread in threading.enumerate()])
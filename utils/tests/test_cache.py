@@ -0,0 +1,160 @@
+import time
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from utils import metrics
+from utils.cache import GENERATION_KEY, LOG_KEY, LocalTier, TwoTierCache, is_shared
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'two-tier-default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'two-tier-shared'},
+}
+
+
+@override_settings(CACHES=CACHES)
+class TwoTierCacheTests(SimpleTestCase):
+    """
+    Reads fill the in-process tier, which then answers without the shared tier
+
+    Writes by another worker are seen after SYNC_INTERVAL; a gap in the invalidation log or a flushed shared tier clears L1
+
+    L1 is a bounded LRU whose entries expire after L1_TIMEOUT
+
+    Hits, misses and evictions are counted per tier
+    """
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.worker_a = self.worker()
+        self.worker_b = self.worker()
+
+    def worker(self, **options):
+        # each worker process has its own L1 in front of the same L2
+        cache = TwoTierCache('shared', {'OPTIONS': {'SYNC_INTERVAL': 0, **options}})
+        cache.l1 = LocalTier(options.get('L1_MAX_ENTRIES', 100))
+        return cache
+
+    def counts(self):
+        snapshot = metrics.REGISTRY.snapshot()
+        return {
+            (name, dict(key).get('tier'), dict(key).get('reason')): value
+            for name in ('cache_hits', 'cache_misses', 'cache_evictions')
+            for key, value in snapshot[name].items()
+        }
+
+    def delta(self, before):
+        after = self.counts()
+        return {key: value - before.get(key, 0) for key, value in after.items() if value != before.get(key, 0)}
+
+    def test_read_through(self):
+        caches['shared'].set('greeting', 'hello')
+        before = self.counts()
+
+        self.assertEqual(self.worker_b.get('greeting'), 'hello')
+        caches['shared'].delete('greeting')     # not logged: L1 keeps serving it
+        self.assertEqual(self.worker_b.get('greeting'), 'hello')
+        self.assertIsNone(self.worker_b.get('missing'))
+
+        self.assertEqual(self.delta(before), {
+            ('cache_hits', 'l1', None): 1,
+            ('cache_misses', 'l1', None): 2,
+            ('cache_hits', 'l2', None): 1,
+            ('cache_misses', 'l2', None): 1,
+        })
+
+    def test_get_many(self):
+        self.worker_a.set_many({'a': 1, 'b': 2})
+
+        self.assertEqual(self.worker_b.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2})
+        self.assertEqual(self.worker_b.get_many(['a', 'b']), {'a': 1, 'b': 2})
+
+    def test_cross_worker_invalidation(self):
+        self.worker_a.set('profile', 'v1')
+        self.assertEqual(self.worker_b.get('profile'), 'v1')
+
+        self.worker_a.set('profile', 'v2')
+        self.assertEqual(self.worker_b.get('profile'), 'v2')
+
+        self.worker_a.delete('profile')
+        self.assertIsNone(self.worker_b.get('profile'))
+
+    def test_sync_interval(self):
+        worker_b = self.worker(SYNC_INTERVAL=60)
+        self.worker_a.set('profile', 'v1')
+        self.assertEqual(worker_b.get('profile'), 'v1')
+
+        self.worker_a.set('profile', 'v2')
+
+        self.assertEqual(worker_b.get('profile'), 'v1')
+        worker_b.l1.synced_at = 0
+        self.assertEqual(worker_b.get('profile'), 'v2')
+
+    def test_log_gap_clears_l1(self):
+        self.worker_a.set('profile', 'v1')
+        self.worker_b.get('profile')
+        self.worker_b.get('other')
+
+        self.worker_a.set('unrelated', 1)
+        caches['shared'].delete(LOG_KEY.format(caches['shared'].get(GENERATION_KEY)))
+        caches['shared'].set('profile', 'v2')
+        before = self.counts()
+
+        self.assertEqual(self.worker_b.get('profile'), 'v2')
+        self.assertEqual(self.delta(before)[('cache_evictions', 'l1', 'invalidated')], 1)
+
+    def test_flush_clears_l1(self):
+        self.worker_a.set('profile', 'v1')
+        self.worker_b.get('profile')
+
+        self.worker_a.clear()
+        caches['shared'].set('profile', 'v2')
+
+        self.assertEqual(self.worker_b.get('profile'), 'v2')
+
+    def test_lru_eviction(self):
+        worker = self.worker(L1_MAX_ENTRIES=2)
+        for key in ('a', 'b', 'c'):
+            worker.set(key, key)
+        before = self.counts()
+
+        self.assertEqual(list(worker.l1.entries), [worker.l1_key('b', None), worker.l1_key('c', None)])
+        self.assertEqual(worker.get('a'), 'a')      # still in L2
+        self.assertEqual(self.delta(before)[('cache_hits', 'l2', None)], 1)
+
+    def test_l1_timeout(self):
+        worker = self.worker(L1_TIMEOUT=10)
+        worker.set('short', 1, timeout=2)
+        worker.set('long', 1)
+        short, long = worker.l1_key('short', None), worker.l1_key('long', None)
+
+        with patch('utils.cache.time.monotonic', return_value=time.monotonic() + 5):
+            worker.l1.get(short)
+            worker.l1.get(long)
+
+        self.assertNotIn(short, worker.l1.entries)
+        self.assertIn(long, worker.l1.entries)
+
+    def test_add_and_incr(self):
+        self.assertTrue(self.worker_a.add('counter', 1))
+        self.assertFalse(self.worker_b.add('counter', 5))
+        self.assertEqual(self.worker_b.get('counter'), 1)
+
+        self.assertEqual(self.worker_a.incr('counter'), 2)
+        self.assertEqual(self.worker_b.get('counter'), 2)
+
+
+class IsSharedTests(SimpleTestCase):
+    """Only caches every host sees count as shared; a TwoTierCache is as shared as its L2"""
+
+    def test_backends(self):
+        for backend, shared in (
+            ('django.core.cache.backends.locmem.LocMemCache', False),
+            ('django.core.cache.backends.filebased.FileBasedCache', False),
+            ('django.core.cache.backends.dummy.DummyCache', False),
+            ('django.core.cache.backends.db.DatabaseCache', True),
+        ):
+            with override_settings(CACHES={'default': CACHES['default'], 'l2': {'BACKEND': backend, 'LOCATION': 'l2'}}):
+                self.assertEqual(is_shared(caches['l2']), shared, backend)
+                self.assertEqual(is_shared(TwoTierCache('l2', {})), shared, backend)
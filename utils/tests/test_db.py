@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.test import SimpleTestCase
+
+from utils import metrics
+from utils.db import collect_pool_stats, database_config, parse_database_url
+
+
+class DatabaseUrlTests(SimpleTestCase):
+    """
+    PostgreSQL URLs are split into credentials, host and OPTIONS
+
+    SQLite URLs map to a file path or an in-memory database
+
+    Persistent connections by default; the pool turns them off and is PostgreSQL only
+
+    Unknown schemes are rejected
+    """
+
+    def test_postgres(self):
+        config = parse_database_url('postgres://uru%40ser:p%3Ass@db:6432/uruserver?sslmode=require')
+
+        self.assertEqual(config, {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': 'uruserver',
+            'USER': 'uru@ser',
+            'PASSWORD': 'p:ss',
+            'HOST': 'db',
+            'PORT': '6432',
+            'OPTIONS': {'sslmode': 'require'},
+        })
+
+    def test_sqlite(self):
+        self.assertEqual(parse_database_url('sqlite:////srv/app/db.sqlite3')['NAME'], '/srv/app/db.sqlite3')
+        self.assertEqual(parse_database_url('sqlite:///db.sqlite3')['NAME'], 'db.sqlite3')
+        self.assertEqual(parse_database_url('sqlite://:memory:')['NAME'], ':memory:')
+
+    def test_persistent_connections(self):
+        config = database_config('postgres://u:p@db/uruserver', conn_max_age=120)
+
+        self.assertEqual(config['CONN_MAX_AGE'], 120)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', config['OPTIONS'])
+
+    def test_pool(self):
+        config = database_config(
+            'postgres://u:p@db/uruserver',
+            pool={'ENABLED': True, 'MIN_SIZE': 2, 'MAX_SIZE': 8, 'TIMEOUT': 5, 'MAX_IDLE': None},
+        )
+
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(config['OPTIONS']['pool'], {'min_size': 2, 'max_size': 8, 'timeout': 5})
+
+    def test_disabled_pool(self):
+        config = database_config('sqlite:///db.sqlite3', pool={'ENABLED': False, 'MIN_SIZE': 2})
+
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+
+    def test_pool_requires_postgres(self):
+        with self.assertRaises(ImproperlyConfigured):
+            database_config('sqlite:///db.sqlite3', pool={'ENABLED': True})
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ImproperlyConfigured):
+            parse_database_url('oracle://u:p@db/uruserver')
+
+
+class FakePool:
+
+    def pop_stats(self):
+        return {'requests_num': 5, 'requests_wait_ms': 250, 'pool_size': 4, 'pool_available': 3}
+
+
+class PoolStatsTests(SimpleTestCase):
+    """
+    Pool statistics are copied into the registry when metrics are read
+    """
+
+    def test_collect(self):
+        connection = connections['default']
+        before = metrics.REGISTRY.snapshot()
+
+        with patch.object(type(connection), 'pool', FakePool(), create=True):
+            collect_pool_stats()
+
+        key = (('alias', 'default'),)
+        self.assertEqual(metrics.db_pool_requests.values[key] - before['db_pool_requests'].get(key, 0), 5)
+        self.assertAlmostEqual(metrics.db_pool_wait.values[key] - before['db_pool_wait_seconds'].get(key, 0), 0.25)
+        self.assertEqual(metrics.db_pool_size.values[key], 4)
+        self.assertEqual(metrics.db_pool_available.values[key], 3)
+        self.assertEqual(metrics.db_pool_waiting.values[key], 0)
@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from account import email_index, revocation
+from account.email_index import EmailIndex
+from account.models import OutgoingEmail
+from account.revocation import RevocationIndex
+from utils import health
+from utils.health import ReadinessProbe, readiness, warm_up, warming_up
+
+
+class HealthEndpointTests(TransactionTestCase):
+    """
+    Liveness answers without touching the database
+
+    Readiness checks database, cache and outbox lag, is cached, and fails during warm-up or when a check hangs
+
+    The first build of the revocation filter and of the email index counts as warm-up; later rebuilds do not
+
+    Filters built at worker start on a background thread keep the worker not ready until they are done
+    """
+    # the checks run on other threads, so the data must be committed for them
+
+    def setUp(self):
+        readiness.reset()
+        self.addCleanup(readiness.reset)
+
+    def test_liveness(self):
+        for name in ('health', 'health-live'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(queries), 0)
+
+    def test_ready(self):
+        response = self.client.get(reverse('health-ready'))
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body['ready'])
+        self.assertEqual({name: check['status'] for name, check in body['checks'].items()},
+                         {'database': 'ok', 'cache': 'ok', 'outbox': 'ok'})
+
+    def test_result_is_cached(self):
+        with patch.object(readiness, 'run_checks', wraps=readiness.run_checks) as run_checks:
+            for _ in range(3):
+                self.client.get(reverse('health-ready'))
+        self.assertEqual(run_checks.call_count, 1)
+
+    def test_not_ready_while_warming_up(self):
+        with warming_up('revocation-filter'):
+            response = self.client.get(reverse('health-ready'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['warming_up'], ['revocation-filter'])
+
+        self.assertEqual(self.client.get(reverse('health-ready')).status_code, 200)
+
+    def test_first_index_build_is_warm_up(self):
+        for module, index, name in ((revocation, RevocationIndex(), 'revocation-filter'),
+                                    (email_index, EmailIndex(), 'email-index')):
+            seen = []
+
+            def build(*args, _build=module.BloomFilter, seen=seen):
+                seen.append(sorted(health._warmups))
+                return _build(*args)
+
+            with patch.object(module, 'BloomFilter', side_effect=build):
+                index.rebuild()
+                index.rebuild()
+            self.assertEqual(seen, [[name], []])
+
+    def test_background_warm_up(self):
+        release = threading.Event()
+        warm_up('revocation-filter', release.wait)
+
+        self.assertEqual(self.client.get(reverse('health-ready')).json()['warming_up'], ['revocation-filter'])
+        release.set()
+        for _ in range(100):
+            if not health._warmups:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.client.get(reverse('health-ready')).status_code, 200)
+
+    @override_settings(HEALTH_CHECKS={'TIMEOUT': 0.05})
+    def test_hanging_check_fails_fast(self):
+        probe = ReadinessProbe({'database': lambda: time.sleep(0.5), 'cache': lambda: None})
+        started = time.perf_counter()
+        result = probe.run_checks()
+
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertFalse(result['ready'])
+        self.assertEqual(result['checks']['database'], {'status': 'fail', 'error': 'timed out'})
+
+    @override_settings(HEALTH_CHECKS={'OUTBOX_MAX_LAG': 60})
+    def test_outbox_lag_is_reported_but_not_critical(self):
+        OutgoingEmail.objects.create(subject='s', body='b', to=['a@example.com'],
+                                     next_attempt_at=timezone.now() - timedelta(minutes=5))
+        result = ReadinessProbe({'outbox': health.check_outbox, 'database': health.check_database}).run_checks()
+
+        self.assertTrue(result['ready'])
+        self.assertEqual(result['checks']['outbox']['status'], 'fail')
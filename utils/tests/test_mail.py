@@ -0,0 +1,59 @@
+import smtplib
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import SimpleTestCase, override_settings
+
+from utils.mail import EmailConnectionPool
+
+
+class FlakyBackend(EmailBackend):
+    """Drops the connection once, on the first send."""
+    dropped = False
+
+    def send_messages(self, messages):
+        if not FlakyBackend.dropped:
+            FlakyBackend.dropped = True
+            raise smtplib.SMTPServerDisconnected('connection dropped')
+        return super().send_messages(messages)
+
+
+def message(n):
+    return EmailMessage(subject=f'Message {n}', body='Body', to=['to@example.com'])
+
+
+class EmailConnectionPoolTests(SimpleTestCase):
+    """
+    Consecutive batches reuse one connection
+
+    A dropped connection is re-opened once and the message retried
+
+    Connections older than MAX_AGE are replaced
+    """
+
+    def test_connection_is_reused(self):
+        pool = EmailConnectionPool()
+        for n in range(3):
+            self.assertEqual(pool.send_messages([message(n)]), [None])
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(pool.stats['connections_opened'], 1)
+        self.assertEqual(pool.stats['messages_sent'], 3)
+
+    @override_settings(EMAIL_BACKEND='utils.tests.test_mail.FlakyBackend')
+    def test_reconnects_after_drop(self):
+        pool = EmailConnectionPool()
+        self.assertEqual(pool.send_messages([message(1), message(2)]), [None, None])
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(pool.stats['reconnects'], 1)
+        self.assertEqual(pool.stats['connections_opened'], 2)
+
+    @override_settings(EMAIL_CONNECTION_POOL={'MAX_AGE': 0})
+    def test_expired_connection_is_replaced(self):
+        pool = EmailConnectionPool()
+        pool.send_messages([message(1)])
+        pool.send_messages([message(2)])
+
+        self.assertEqual(pool.stats['connections_opened'], 2)
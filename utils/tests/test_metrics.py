@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from utils.metrics import Counter, Gauge, Histogram, Registry
+
+
+class RegistryTests(TestCase):
+    """
+    Metrics render in the Prometheus text format
+
+    With MULTIPROC_DIR, the files of all workers are added up; gauges only count live workers
+    """
+
+    def setUp(self):
+        self.registry = Registry()
+        self.requests = Counter('requests', 'Requests.', ['status'], registry=self.registry)
+        self.in_flight = Gauge('in_flight', 'In flight.', registry=self.registry)
+        self.latency = Histogram('latency_seconds', 'Latency.', buckets=(0.1, 1), registry=self.registry)
+
+    def test_text_format(self):
+        self.requests.inc(status=200)
+        self.requests.inc(2, status=200)
+        self.in_flight.inc()
+        for value in (0.05, 0.5, 5):
+            self.latency.observe(value)
+
+        text = self.registry.render()
+
+        self.assertIn('# TYPE requests counter\nrequests_total{status="200"} 3\n', text)
+        self.assertIn('in_flight 1\n', text)
+        self.assertIn(
+            'latency_seconds_bucket{le="0.1"} 1\n'
+            'latency_seconds_bucket{le="1"} 2\n'
+            'latency_seconds_bucket{le="+Inf"} 3\n'
+            'latency_seconds_sum 5.55\n'
+            'latency_seconds_count 3\n',
+            text,
+        )
+
+    def test_label_names_are_checked(self):
+        with self.assertRaises(ValueError):
+            self.requests.inc(code=200)
+
+    def test_multiprocess_aggregation(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        dead_pid = 2 ** 22 + 1  # above the default pid_max, so never a live process
+        with open(os.path.join(directory, f'{dead_pid}.json'), 'w') as f:
+            json.dump({
+                'requests': [[[['status', '200']], 4]],
+                'in_flight': [[[], 7]],
+                'latency_seconds': [[[], [1, 0, 0, 0.05, 1]]],
+            }, f)
+
+        self.requests.inc(status=200)
+        self.in_flight.inc()
+        self.latency.observe(0.5)
+        with override_settings(METRICS={'MULTIPROC_DIR': directory}):
+            text = self.registry.render()
+
+        self.assertIn('requests_total{status="200"} 5\n', text)
+        self.assertIn('in_flight 1\n', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 2\n', text)
+        self.assertIn('latency_seconds_count 2\n', text)
+
+
+class MetricsEndpointTests(TestCase):
+    """
+    /metrics exposes request, database and in-flight metrics and can require a token
+    """
+
+    def test_request_metrics(self):
+        self.client.get(reverse('check-email'), {'email': 'someone@example.com'})
+        text = self.client.get(reverse('metrics')).content.decode()
+
+        self.assertIn('http_requests_total{method="GET",route="check-email",status="', text)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="check-email"}', text)
+        self.assertIn('http_request_db_queries_count{route="check-email"}', text)
+        self.assertIn('http_requests_in_flight 1\n', text)
+
+    @override_settings(METRICS={'AUTH_TOKEN': 'secret'})
+    def test_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
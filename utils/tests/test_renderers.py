@@ -0,0 +1,72 @@
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ErrorDetail
+
+from account.renderers import UserRenderer
+from utils.renderers import CustomRenderer, EnvelopeJSONRenderer
+
+
+class CustomRendererTests(SimpleTestCase):
+    def render(self, data):
+        return CustomRenderer().render(data)
+
+    def test_success_payload(self):
+        self.assertEqual(
+            self.render({'id': 1, 'first_name': 'Zoë', 'role': 'student'}),
+            '{"id": 1, "first_name": "Zoë", "role": "student"}'.encode('utf-8'),
+        )
+
+    def test_field_errors_are_wrapped(self):
+        data = {
+            'email': [ErrorDetail('This field is required.', code='required')],
+            'detail': ErrorDetail('Not allowed.', code='denied'),
+            'count': 1,
+        }
+        self.assertEqual(
+            self.render(data),
+            b'{"errors": {"email": ["This field is required."], "detail": ["Not allowed."], "count": 1}}',
+        )
+
+    def test_nested_errors(self):
+        data = {'profile': {'name': ErrorDetail('Too long.', code='max_length'), 'ok': 1}, 'id': 3}
+        self.assertEqual(
+            self.render(data),
+            b'{"errors": {"profile": {"name": ["Too long."], "ok": 1}, "id": 3}}',
+        )
+
+    def test_none_and_non_dict(self):
+        self.assertEqual(self.render(None), b'')
+        self.assertEqual(self.render([1, 'a']), b'[1, "a"]')
+
+
+class EnvelopeJSONRendererTests(SimpleTestCase):
+    def test_base_renderer_wraps_nothing(self):
+        class ListsAreValues(EnvelopeJSONRenderer):
+            error_types = (list,)
+
+        data = {'tags': ['a'], 'detail': ErrorDetail('Not allowed.', code='denied')}
+        self.assertEqual(EnvelopeJSONRenderer().render(data), b'{"tags": ["a"], "detail": "Not allowed."}')
+        self.assertEqual(ListsAreValues().render(data), b'{"tags": ["a"], "detail": "Not allowed."}')
+
+
+class UserRendererTests(SimpleTestCase):
+    def render(self, data):
+        return UserRenderer().render(data)
+
+    def test_success_payload_is_ascii_escaped(self):
+        self.assertEqual(
+            self.render({'first_name': 'Zoë', 'tags': ['a']}),
+            b'{"first_name": "Zo\\u00eb", "tags": ["a"]}',
+        )
+
+    def test_field_errors_are_wrapped(self):
+        data = {'password': [ErrorDetail('Too short.', code='min_length')], 'email': 'x@example.com'}
+        self.assertEqual(
+            self.render(data),
+            b'{"errors": {"password": ["Too short."], "email": "x@example.com"}}',
+        )
+
+    def test_empty_list_is_not_an_error(self):
+        self.assertEqual(self.render({'results': []}), b'{"results": []}')
+
+    def test_none(self):
+        self.assertEqual(self.render(None), b'null')
@@ -0,0 +1,145 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.http import HttpResponse
+from django.test import TransactionTestCase, override_settings
+from django.urls import path
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from utils.replicas import read_from_replica, use_replica
+
+User = get_user_model()
+
+REPLICAS = {'ALIASES': ['replica0'], 'DEFAULT': False, 'PIN_SECONDS': 5, 'CACHE_ALIAS': 'default'}
+
+
+class AliasView(APIView):
+    """Answers with the database reads go to, and on GET the number of users it sees."""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return HttpResponse(f'{router.db_for_read(User)} {User.objects.count()}')
+
+    def patch(self, request):
+        return HttpResponse(router.db_for_read(User))
+
+    post = patch
+
+
+class ReplicaView(AliasView):
+    read_replica = True
+
+
+def read_alias(request):
+    return HttpResponse(router.db_for_read(User))
+
+
+@read_from_replica()
+def replica_function(request):
+    return read_alias(request)
+
+
+@read_from_replica(False)
+def primary_function(request):
+    return read_alias(request)
+
+
+urlpatterns = [
+    path('replica/', ReplicaView.as_view()),
+    path('primary/', AliasView.as_view()),
+    path('function/', replica_function),
+    path('function-primary/', primary_function),
+    path('failed-write/', lambda request: HttpResponse(status=400)),
+]
+
+
+@override_settings(READ_REPLICAS=REPLICAS, ROOT_URLCONF='utils.tests.test_replicas')
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Safe requests to views that opt in read from a replica; other views and unsafe methods use the primary
+
+    Function views opt in with @read_from_replica(); READ_REPLICAS['DEFAULT'] flips the default
+
+    After a write, the client reads from the primary for PIN_SECONDS
+
+    Inside a request, written models and atomic blocks read from the primary; writes always go to the primary
+
+    Requests go through the whole middleware stack, with the test client and the async client, against a
+    replica that is a second SQLite file copied from the primary
+    """
+    # replica0 is set up by utils/test_runner.py
+    databases = {'default', 'replica0'}
+
+    def setUp(self):
+        cache.clear()
+        self.replicate()
+
+    def replicate(self):
+        """Copy the primary to the replica file, like a replica catching up."""
+        primary, replica = connections['default'], connections['replica0']
+        primary.ensure_connection()
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
+
+    def alias(self, method, url, **extra):
+        return getattr(self.client, method)(url, **extra).content.decode().split()[0]
+
+    def test_opted_in_view(self):
+        self.assertEqual(self.alias('get', '/replica/'), 'replica0')
+        self.assertEqual(self.alias('get', '/primary/'), 'default')
+        self.assertEqual(self.alias('post', '/replica/'), 'default')
+
+    def test_function_view(self):
+        self.assertEqual(self.alias('get', '/function/'), 'replica0')
+
+    @override_settings(READ_REPLICAS={**REPLICAS, 'DEFAULT': True})
+    def test_default(self):
+        self.assertEqual(self.alias('get', '/primary/'), 'replica0')
+        self.assertEqual(self.alias('get', '/function-primary/'), 'default')
+        self.assertEqual(self.client.get('/missing/').status_code, 404)
+
+    def test_pinned_after_write(self):
+        token = {'HTTP_AUTHORIZATION': 'Bearer abc', 'REMOTE_ADDR': '10.0.0.1'}
+        self.alias('patch', '/primary/', **token)
+
+        self.assertEqual(self.alias('get', '/replica/', **token), 'default')
+        self.assertEqual(self.alias('get', '/replica/', HTTP_AUTHORIZATION='Bearer abc', REMOTE_ADDR='10.0.0.2'), 'default')
+        self.assertEqual(self.alias('get', '/replica/', HTTP_AUTHORIZATION='Bearer xyz', REMOTE_ADDR='10.0.0.2'), 'replica0')
+
+    def test_failed_write_does_not_pin(self):
+        self.client.post('/failed-write/')
+
+        self.assertEqual(self.alias('get', '/replica/'), 'replica0')
+
+    def test_reads_come_from_the_replica_file(self):
+        User.objects.create_user(email='primary-only@example.com', password='StrongPassword123')
+
+        self.assertEqual(self.client.get('/replica/').content, b'replica0 0')
+        self.assertEqual(self.client.get('/primary/').content, b'default 1')
+
+        self.replicate()
+        self.assertEqual(self.client.get('/replica/').content, b'replica0 1')
+
+    @override_settings(READ_REPLICAS={**REPLICAS, 'DEFAULT': True})
+    async def test_async_client(self):
+        for _ in range(2):     # a second request would fail if the first left the context behind
+            response = await self.async_client.get('/replica/')
+            self.assertEqual(response.content, b'replica0 0')
+        response = await self.async_client.get('/function-primary/')
+        self.assertEqual(response.content, b'default')
+
+    def test_read_your_writes_within_request(self):
+        with use_replica('replica0'):
+            self.assertEqual(router.db_for_read(User), 'replica0')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(User), 'default')
+
+            self.assertEqual(router.db_for_write(User), 'default')
+            self.assertEqual(router.db_for_read(User), 'default')
+        self.assertEqual(router.db_for_read(User), 'default')
+
+    def test_no_migrations_on_replicas(self):
+        self.assertFalse(router.allow_migrate('replica0', 'account'))
+        self.assertTrue(router.allow_migrate('default', 'account'))
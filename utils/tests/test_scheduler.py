@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from utils.models import ScheduledJob
+from utils.scheduler import CronSchedule, IntervalSchedule, Job, Scheduler
+
+CALLS = []
+
+
+def record_call():
+    CALLS.append(timezone.now())
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class ScheduleTests(TestCase):
+    """
+    Cron expressions and intervals give the next slot after a moment
+    """
+
+    def test_cron(self):
+        self.assertEqual(CronSchedule('*/15 * * * *').next_after(utc(2026, 1, 1, 10, 7)), utc(2026, 1, 1, 10, 15))
+        self.assertEqual(CronSchedule('17 * * * *').next_after(utc(2026, 1, 1, 10, 17)), utc(2026, 1, 1, 11, 17))
+        # 2026-01-01 is a Thursday; 1 is Monday
+        self.assertEqual(CronSchedule('0 3 * * 1').next_after(utc(2026, 1, 1)), utc(2026, 1, 5, 3, 0))
+        self.assertEqual(CronSchedule('30 2 29 2 *').next_after(utc(2026, 1, 1)), utc(2028, 2, 29, 2, 30))
+
+    def test_cron_day_fields_either_match(self):
+        # the 15th, or any Sunday
+        self.assertEqual(CronSchedule('0 0 15 * 0').next_after(utc(2026, 1, 1)), utc(2026, 1, 4))
+
+    def test_invalid(self):
+        for expression in ('* * * *', '60 * * * *', '5-1 * * * *', '0 0 30 2 *'):
+            with self.assertRaises(ValueError):
+                CronSchedule(expression).next_after(utc(2026, 1, 1))
+
+        with self.assertRaises(ImproperlyConfigured):
+            Job.from_settings('bad', {'SCHEDULE': 'every minute', 'CALLABLE': 'utils.tests.test_scheduler.record_call'}, 60)
+
+    def test_interval(self):
+        self.assertEqual(IntervalSchedule(300).next_after(utc(2026, 1, 1, 10, 7, 30)), utc(2026, 1, 1, 10, 10))
+
+
+class SchedulerTests(TestCase):
+    """
+    Of several schedulers due at once, exactly one claims and runs the job
+
+    A run records its duration, last success or last error, and releases the lease
+
+    A lease left by a dead process is taken over once it has run out
+    """
+
+    def setUp(self):
+        CALLS.clear()
+        self.now = utc(2026, 1, 1, 10, 0, 30)
+        self.jobs = {'count': Job('count', IntervalSchedule(60), record_call, lease=120)}
+
+    def scheduler(self, identity, jobs=None):
+        scheduler = Scheduler(jobs or self.jobs, identity=identity)
+        scheduler.prepare(self.now - timedelta(minutes=5))     # due since 09:56
+        return scheduler
+
+    def test_one_scheduler_wins(self):
+        first, second = self.scheduler('node-a:1'), self.scheduler('node-b:1')
+
+        claimed = first.claim_due(self.now)
+        self.assertEqual([job.name for job in claimed], ['count'])
+        self.assertEqual(second.claim_due(self.now), [])
+        first.run(claimed[0])
+        # the slot has moved on, so the finished run does not free it for the other node
+        self.assertEqual(second.claim_due(self.now), [])
+
+        row = ScheduledJob.objects.get()
+        self.assertEqual(len(CALLS), 1)
+        self.assertEqual(row.runs, 1)
+        self.assertEqual(row.next_run_at, utc(2026, 1, 1, 10, 1))
+        self.assertEqual((row.locked_by, row.locked_until), ('', None))
+        self.assertIsNotNone(row.last_success_at)
+        self.assertIsNotNone(row.last_duration)
+
+        self.assertEqual(len(second.claim_due(self.now + timedelta(minutes=1))), 1)
+
+    def test_failure_is_recorded(self):
+        def broken():
+            raise RuntimeError('boom')
+        scheduler = self.scheduler('node-a:1', {'count': Job('count', IntervalSchedule(60), broken, lease=120)})
+
+        self.assertFalse(scheduler.run(scheduler.claim_due(self.now)[0]))
+
+        row = ScheduledJob.objects.get()
+        self.assertEqual((row.runs, row.failures), (1, 1))
+        self.assertEqual(row.last_error, 'RuntimeError: boom')
+        self.assertIsNone(row.last_success_at)
+
+    def test_expired_lease_is_taken_over(self):
+        dead, alive = self.scheduler('node-a:1'), self.scheduler('node-b:1')
+        dead.claim_due(self.now)
+        ScheduledJob.objects.update(next_run_at=self.now)
+
+        self.assertEqual(alive.claim_due(self.now + timedelta(seconds=60)), [])
+        self.assertEqual(len(alive.claim_due(self.now + timedelta(seconds=121))), 1)
+        self.assertEqual(ScheduledJob.objects.get().locked_by, 'node-b:1')
+
+    @override_settings(SCHEDULER={'JOBS': {
+        'count': {'SCHEDULE': 60, 'CALLABLE': 'utils.tests.test_scheduler.record_call'},
+    }})
+    def test_run_once_command(self):
+        Scheduler().prepare()
+        ScheduledJob.objects.update(next_run_at=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+
+        call_command('run_scheduler', '--once', stdout=out)
+
+        self.assertIn('Ran 1 job', out.getvalue())
+        self.assertEqual(len(CALLS), 1)
@@ -0,0 +1,100 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from utils.throttling import GCRAThrottle, SQLiteRateStore, rate_store
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SQLiteRateStoreTests(SimpleTestCase):
+    """
+    GCRA allows a burst of the full rate, then one request per emission interval
+
+    Each key keeps a single row whatever the number of requests
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = patch('utils.throttling.time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'ratelimit.sqlite3')
+        self.store = SQLiteRateStore(self.path, prune_probability=0)
+
+    def keys(self):
+        return [key for key, in self.store.connection.execute('SELECT key FROM buckets')]
+
+    def test_burst_then_steady_rate(self):
+        # 3 per 60s: emission interval 20s
+        results = [self.store.hit('k', 20, 60) for _ in range(4)]
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        self.assertAlmostEqual(results[-1][1], 20)
+
+        self.clock.now += 19
+        self.assertFalse(self.store.hit('k', 20, 60)[0])
+        self.clock.now += 1
+        self.assertEqual(self.store.hit('k', 20, 60), (True, 0))
+        self.assertFalse(self.store.hit('k', 20, 60)[0])
+
+        self.assertEqual(self.keys(), ['k'])
+
+    def test_idle_bucket_drains_completely(self):
+        for _ in range(3):
+            self.store.hit('k', 20, 60)
+        self.clock.now += 60
+        self.assertEqual([self.store.hit('k', 20, 60)[0] for _ in range(4)], [True, True, True, False])
+
+    def test_keys_are_independent(self):
+        self.store.hit('a', 60, 60)
+        self.assertFalse(self.store.hit('a', 60, 60)[0])
+        self.assertTrue(self.store.hit('b', 60, 60)[0])
+
+    def test_drained_buckets_are_pruned(self):
+        self.store.hit('old', 20, 60)
+        self.clock.now += 100
+        SQLiteRateStore(self.path, prune_probability=1).hit('new', 20, 60)
+        self.assertEqual(self.keys(), ['new'])
+
+
+class ScopedThrottleTests(APITestCase):
+    """
+    Login and check-email are limited per scope and answer 429 with Retry-After
+    """
+
+    def setUp(self):
+        rate_store().clear()
+
+    def test_login_scope(self):
+        with patch.object(GCRAThrottle, 'THROTTLE_RATES', {'login': '2/minute', 'check_email': '100/minute'}):
+            codes = [
+                self.client.post(reverse('login'), {'email': 'x@example.com', 'password': 'wrong'}).status_code
+                for _ in range(3)
+            ]
+            response = self.client.get(reverse('check-email'), {'email': 'x@example.com'})
+
+        self.assertEqual(codes[:2], [status.HTTP_401_UNAUTHORIZED] * 2)
+        self.assertEqual(codes[2], status.HTTP_429_TOO_MANY_REQUESTS)
+        # another scope from the same client has its own bucket
+        self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_retry_after_header(self):
+        with patch.object(GCRAThrottle, 'THROTTLE_RATES', {'check_email': '1/minute'}):
+            self.client.get(reverse('check-email'))
+            response = self.client.get(reverse('check-email'))
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(0 < int(response['Retry-After']) <= 60)
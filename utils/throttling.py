@@ -0,0 +1,171 @@
+"""
+Scoped rate limiting shared by every worker.
+
+DRF's SimpleRateThrottle keeps a list of request timestamps per client in
+the default cache: O(n) per check, and with LocMemCache each gunicorn worker
+counts on its own. ``GCRAThrottle`` implements the generic cell rate
+algorithm instead: a key stores one number, the time its bucket drains
+("theoretical arrival time"), and a request is allowed if adding one more
+emission interval keeps that time within one period from now. Each check is
+a single atomic operation on a shared store:
+
+- Redis (RATE_LIMIT['REDIS_URL'], when set): one Lua script per check
+- otherwise a SQLite file local to the host (RATE_LIMIT['SQLITE_PATH']), in
+  the same spirit as the file-based cache: one short ``BEGIN IMMEDIATE``
+  transaction per check, shared by the workers of one host and kept off the
+  application database
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import ScopedRateThrottle
+
+try:
+    import redis
+except ImportError:  # optional, only needed for the redis store
+    redis = None
+
+
+DEFAULTS = {
+    'BACKEND': 'sqlite',        # 'redis' or 'sqlite'
+    'REDIS_URL': None,
+    'SQLITE_PATH': os.path.join(tempfile.gettempdir(), 'uruserver-ratelimit.sqlite3'),
+    'KEY_PREFIX': 'ratelimit:',
+    'PRUNE_PROBABILITY': 0.01,  # share of new keys that also delete drained buckets
+}
+
+
+def rate_limit_settings():
+    return {**DEFAULTS, **getattr(settings, 'RATE_LIMIT', {})}
+
+
+class SQLiteRateStore:
+    # tat: unix time the bucket is empty again
+    SCHEMA = 'CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tat REAL NOT NULL)'
+
+    def __init__(self, path, prune_probability=0.01):
+        self.path = path
+        self.prune_probability = prune_probability
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        # sqlite3 connections must stay on their thread
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(self.SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def hit(self, key, interval, period):
+        """
+        Record one request against ``key``.
+
+        Returns:
+            tuple: ``(allowed, wait)`` - ``wait`` is the seconds until the
+            next request would be allowed, 0 when this one was
+        """
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')   # takes the write lock: read and update are atomic
+        try:
+            now = time.time()
+            row = connection.execute('SELECT tat FROM buckets WHERE key = ?', (key,)).fetchone()
+            tat = max(row[0], now) if row else now
+            # allowed iff max(tat, now) + interval <= now + period
+            wait = tat + interval - period - now
+            if wait > 0:
+                connection.execute('COMMIT')
+                return False, wait
+            connection.execute('INSERT OR REPLACE INTO buckets (key, tat) VALUES (?, ?)', (key, tat + interval))
+            if row is None and random.random() < self.prune_probability:
+                connection.execute('DELETE FROM buckets WHERE tat < ?', (now,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return True, 0
+
+    def clear(self):
+        self.connection.execute('DELETE FROM buckets')
+
+
+class RedisRateStore:
+    # Redis clock, so workers on different hosts agree on "now". Returns
+    # {allowed, wait}; the wait is a string as Lua numbers become integers.
+    SCRIPT = """
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local interval, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+    if tat + interval - now > period then
+        return {0, tostring(tat + interval - period - now)}
+    end
+    redis.call('SET', KEYS[1], tostring(tat + interval), 'PX', math.ceil((tat + interval - now) * 1000))
+    return {1, '0'}
+    """
+
+    def __init__(self, url, key_prefix='ratelimit:'):
+        if redis is None:
+            raise ImproperlyConfigured("RATE_LIMIT['BACKEND'] = 'redis' requires the redis package")
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(self.SCRIPT)
+        self.key_prefix = key_prefix
+
+    def hit(self, key, interval, period):
+        allowed, wait = self.script(keys=[self.key_prefix + key], args=[interval, period])
+        return bool(allowed), float(wait)
+
+
+_stores = {}
+
+
+def rate_store():
+    config = rate_limit_settings()
+    backend = config['BACKEND']
+    store_key = (backend, config['REDIS_URL'], config['SQLITE_PATH'], config['KEY_PREFIX'],
+                 config['PRUNE_PROBABILITY'])
+    if store_key not in _stores:
+        if backend == 'redis':
+            _stores[store_key] = RedisRateStore(config['REDIS_URL'], config['KEY_PREFIX'])
+        elif backend == 'sqlite':
+            _stores[store_key] = SQLiteRateStore(config['SQLITE_PATH'], config['PRUNE_PROBABILITY'])
+        else:
+            raise ImproperlyConfigured(f"Unknown RATE_LIMIT['BACKEND']: {backend!r}")
+    return _stores[store_key]
+
+
+class GCRAThrottle(ScopedRateThrottle):
+    """
+    Drop-in for ScopedRateThrottle: same ``throttle_scope`` attribute on the
+    view and the same DEFAULT_THROTTLE_RATES, but an O(1), atomic check on a
+    store shared by all workers.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self._wait = rate_store().hit(self.key, self.duration / self.num_requests, self.duration)
+        return allowed
+
+    def wait(self):
+        return self._wait
@@ -0,0 +1,24 @@
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
+
+from utils import metrics
+from utils.health import readiness
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint."""
+    token = metrics.metrics_settings()['AUTH_TOKEN']
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def liveness_view(request):
+    """The process is up and serving requests; touches no backing service."""
+    return HttpResponse(b'ok', content_type='text/plain')
+
+
+def readiness_view(request):
+    """200 when the database and cache answer in time, 503 otherwise (see utils/health.py)."""
+    result = readiness.status()
+    return JsonResponse(result, status=200 if result['ready'] else 503)